@@ -11,6 +11,7 @@ from collections import defaultdict
 
 from monty.json import MSONable
 
+from pymatgen.analysis.structure_index import StructureIndex
 from pymatgen.analysis.structure_matcher import ElementComparator, StructureMatcher
 from pymatgen.core.periodic_table import get_el_sp
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
@@ -195,6 +196,7 @@ class RemoveDuplicatesFilter(AbstractStructureFilter):
         self,
         structure_matcher=StructureMatcher(comparator=ElementComparator()),
         symprec=None,
+        structure_index=None,
     ):
         """
         Remove duplicate structures based on the structure matcher
@@ -206,6 +208,11 @@ class RemoveDuplicatesFilter(AbstractStructureFilter):
             symprec: The precision in the symmetry finder algorithm if None (
                 default value), no symmetry check is performed and only the
                 structure matcher is used. A recommended value is 1e-5.
+            structure_index (StructureIndex): If given, structures seen so far
+                are looked up in and added to this index instead of being kept
+                in memory, so that duplicates are also removed against previous
+                runs using the same index. The structure matcher and prefilter
+                of the index are used, and symprec is ignored.
         """
         self.symprec = symprec
         self.structure_list = defaultdict(list)
@@ -213,6 +220,9 @@ class RemoveDuplicatesFilter(AbstractStructureFilter):
             self.structure_matcher = StructureMatcher.from_dict(structure_matcher)
         else:
             self.structure_matcher = structure_matcher
+        if isinstance(structure_index, dict):
+            structure_index = StructureIndex.from_dict(structure_index)
+        self.structure_index = structure_index
 
     def test(self, structure):
         """
@@ -221,6 +231,12 @@ class RemoveDuplicatesFilter(AbstractStructureFilter):
 
         Returns: True if structure is not in list.
         """
+        if self.structure_index is not None:
+            if structure in self.structure_index:
+                return False
+            self.structure_index.add(structure)
+            return True
+
         h = self.structure_matcher._comparator.get_hash(structure.composition)
         if not self.structure_list[h]:
             self.structure_list[h].append(structure)
@@ -255,7 +271,12 @@ class RemoveExistingFilter(AbstractStructureFilter):
         and symmetry (if symprec is given).
 
         Args:
-            existing_structures: List of existing structures to compare with
+            existing_structures: List of existing structures to compare with,
+                or a StructureIndex of existing structures. With an index,
+                only the indexed structures sharing the composition (and
+                prefilter fingerprint) of a structure are compared, and the
+                structure matcher of the index is used instead of
+                structure_matcher. symprec is then ignored.
             structure_matcher: Provides a structure matcher to be used for
                 structure comparison.
             symprec: The precision in the symmetry finder algorithm if None (
@@ -279,6 +300,11 @@ class RemoveExistingFilter(AbstractStructureFilter):
 
         Returns: True if structure is not in existing list.
         """
+        if isinstance(self.existing_structures, StructureIndex):
+            if structure in self.existing_structures:
+                return False
+            self.structure_list.append(structure)
+            return True
 
         def get_sg(s):
             finder = SpacegroupAnalyzer(s, symprec=self.symprec)
@@ -16,6 +16,7 @@ from pymatgen.alchemy.filters import (
     SpecieProximityFilter,
 )
 from pymatgen.alchemy.transmuters import StandardTransmuter
+from pymatgen.analysis.structure_index import StructureIndex
 from pymatgen.analysis.structure_matcher import StructureMatcher
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.periodic_table import Species
@@ -98,6 +99,17 @@ class RemoveDuplicatesFilterTest(unittest.TestCase):
         transmuter.apply_filter(fil)
         self.assertEqual(len(transmuter.transformed_structures), 11)
 
+    def test_filter_structure_index(self):
+        index = StructureIndex()
+        transmuter = StandardTransmuter.from_structures(self._struct_list)
+        transmuter.apply_filter(RemoveDuplicatesFilter(structure_index=index))
+        self.assertEqual(len(transmuter.transformed_structures), 11)
+        self.assertEqual(len(index), 11)
+        # Structures already in the index are removed in subsequent runs.
+        transmuter = StandardTransmuter.from_structures(self._struct_list)
+        transmuter.apply_filter(RemoveDuplicatesFilter(structure_index=index))
+        self.assertEqual(len(transmuter.transformed_structures), 0)
+
     def test_to_from_dict(self):
         fil = RemoveDuplicatesFilter()
         d = fil.as_dict()
@@ -124,6 +136,20 @@ class RemoveExistingFilterTest(unittest.TestCase):
             )
         )
 
+    def test_filter_structure_index(self):
+        index = StructureIndex()
+        index.add_structures(self._exisiting_structures)
+        fil = RemoveExistingFilter(index)
+        transmuter = StandardTransmuter.from_structures(self._struct_list)
+        transmuter.apply_filter(fil)
+        self.assertEqual(len(transmuter.transformed_structures), 1)
+        self.assertTrue(
+            self._sm.fit(
+                self._struct_list[-1],
+                transmuter.transformed_structures[-1].final_structure,
+            )
+        )
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
@@ -6,9 +6,12 @@
 import os
 import warnings
 
+from monty.tempfile import ScratchDir
+
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.alchemy.filters import ContainsSpecieFilter
-from pymatgen.alchemy.transmuters import CifTransmuter, PoscarTransmuter
+from pymatgen.alchemy.transmuters import CifTransmuter, PoscarTransmuter, StreamingTransmuter
+from pymatgen.core.structure import Structure
 from pymatgen.transformations.advanced_transformations import SuperTransformation
 from pymatgen.transformations.standard_transformations import (
     OrderDisorderedStructureTransformation,
@@ -98,6 +101,58 @@ class PoscarTransmuterTest(PymatgenTest):
         )
 
 
+class StreamingTransmuterTest(PymatgenTest):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.transformations = [
+            RemoveSpeciesTransformation("O"),
+            SubstitutionTransformation({"Fe": {"Fe2+": 0.25, "Mn3+": 0.75}, "P": "P5+"}),
+            OrderDisorderedStructureTransformation(),
+        ]
+        self.structure = Structure.from_file(os.path.join(self.TEST_FILES_DIR, "POSCAR"))
+
+    def tearDown(self):
+        warnings.simplefilter("default")
+
+    def test_iter_transformed_structures(self):
+        transmuter = StreamingTransmuter(self.transformations, extend_collection=50)
+        tstructs = list(transmuter.iter_transformed_structures([self.structure, self.structure]))
+        self.assertEqual(len(tstructs), 8)
+        for ts in tstructs:
+            self.assertEqual(len(ts.final_structure), 8)
+            self.assertEqual(len(ts), 3)
+        stats = transmuter.get_stats()
+        self.assertEqual([s["inputs"] for s in stats], [2, 2, 2])
+        self.assertEqual([s["outputs"] for s in stats], [2, 2, 8])
+        self.assertEqual(stats[2]["fan_out"], 4)
+        self.assertEqual(stats[2]["transformation"], "OrderDisorderedStructureTransformation")
+
+        transmuter = StreamingTransmuter(self.transformations, extend_collection=50, ncores=2, max_pending=3)
+        tstructs2 = list(transmuter.iter_transformed_structures(iter([self.structure, self.structure])))
+        self.assertEqual(
+            sorted(ts.final_structure.formula for ts in tstructs2),
+            sorted(ts.final_structure.formula for ts in tstructs),
+        )
+        self.assertEqual([s["outputs"] for s in transmuter.get_stats()], [2, 2, 8])
+
+    def test_interleaved_transmuters(self):
+        a = StreamingTransmuter([SubstitutionTransformation({"Fe": "Mn"})])
+        b = StreamingTransmuter([SubstitutionTransformation({"O": "S"})])
+        ga = a.iter_transformed_structures([self.structure, self.structure])
+        gb = b.iter_transformed_structures([self.structure])
+        self.assertEqual(next(ga).final_structure.formula, "Mn4 P4 O16")
+        self.assertEqual(next(gb).final_structure.formula, "Fe4 P4 S16")
+        self.assertEqual(next(ga).final_structure.formula, "Mn4 P4 O16")
+
+    def test_write_jsonl(self):
+        transmuter = StreamingTransmuter(self.transformations, extend_collection=2)
+        with ScratchDir("."):
+            self.assertEqual(transmuter.write_jsonl([self.structure], "transformed.jsonl.gz"), 2)
+            tstructs = list(StreamingTransmuter.iter_jsonl("transformed.jsonl.gz"))
+        self.assertEqual(len(tstructs), 2)
+        self.assertEqual(tstructs[0].history[0]["@class"], "RemoveSpeciesTransformation")
+
+
 if __name__ == "__main__":
     import unittest
 
@@ -20,12 +20,19 @@ __maintainer__ = "Shyue Ping Ong"
 __email__ = "shyuep@gmail.com"
 __date__ = "Mar 4, 2012"
 
+import json
 import os
 import re
+import time
 from multiprocessing import Pool
 
+from monty.io import zopen
+from monty.json import MontyEncoder
+
 from pymatgen.alchemy.materials import TransformedStructure
+from pymatgen.core.structure import Structure
 from pymatgen.io.vasp.sets import MPRelaxSet
+from pymatgen.util.parallel import StatefulPool
 
 
 class StandardTransmuter:
@@ -120,13 +127,13 @@ class StandardTransmuter:
             structure
         """
         if self.ncores and transformation.use_multiprocessing:
-            p = Pool(self.ncores)
             # need to condense arguments into single tuple to use map
             z = map(
                 lambda x: (x, transformation, extend_collection, clear_redo),
                 self.transformed_structures,
             )
-            new_tstructs = p.map(_apply_transformation, z, 1)
+            with Pool(self.ncores) as p:
+                new_tstructs = p.map(_apply_transformation, z, 1)
             self.transformed_structures = []
             for ts in new_tstructs:
                 self.transformed_structures.extend(ts)
@@ -340,6 +347,170 @@ class PoscarTransmuter(StandardTransmuter):
         return StandardTransmuter(tstructs, transformations, extend_collection=extend_collection)
 
 
+class StreamingTransmuter:
+    """
+    Pipelined transmuter, which streams structures through a sequence of
+    transformations without keeping them all in memory. The structures are
+    processed depth-first, i.e., the output of a transformation is passed to
+    the next transformation before new input structures are read, and the
+    transformed structures are yielded as soon as they went through the
+    whole sequence, so that they can be written out incrementally::
+
+        transmuter = StreamingTransmuter(transformations, extend_collection=100, ncores=8)
+        transmuter.write_jsonl(structures, "transformed.jsonl.gz")
+        for ts in StreamingTransmuter.iter_jsonl("transformed.jsonl.gz"):
+            ...
+
+    With ncores, each application of a transformation to a structure is a
+    task of a process pool, and up to max_pending tasks are in flight at
+    any time. The time spent in and the number of structures output by each
+    transformation are available from get_stats.
+    """
+
+    def __init__(self, transformations, extend_collection=0, ncores=None, max_pending=None):
+        """
+        Args:
+            transformations ([Transformation]): Sequence of transformations
+                applied to all structures.
+            extend_collection (int): Whether to use more than one output
+                structure from one-to-many transformations. extend_collection
+                can be an int, which determines the maximum branching for each
+                transformation.
+            ncores (int): Number of processes to apply the transformations
+                with. Default is None, which implies serial.
+            max_pending (int): Maximum number of transformations being
+                applied at once in parallel, which bounds the number of
+                structures held in memory. Defaults to twice ncores.
+        """
+        self.transformations = list(transformations)
+        self.extend_collection = extend_collection
+        self.ncores = ncores
+        self.max_pending = max_pending or 2 * (ncores or 1)
+        self._stats = []
+
+    def iter_transformed_structures(self, structures):
+        """
+        Apply the transformations to structures.
+
+        Args:
+            structures: Iterable of Structures or TransformedStructures. It
+                is only consumed as the transformed structures are.
+
+        Yields:
+            TransformedStructures, in the order of the input structures in
+            serial. In parallel, the order may differ.
+        """
+        self._stats = [
+            {"transformation": t.__class__.__name__, "inputs": 0, "outputs": 0, "time": 0} for t in self.transformations
+        ]
+        structures = (TransformedStructure(s, []) if isinstance(s, Structure) else s for s in structures)
+        # structures waiting for a transformation, as (position of the
+        # transformation, transformed structure), processed last in first out
+        stack = []
+
+        with StatefulPool(
+            _apply_streaming_transformation,
+            (self.transformations, self.extend_collection),
+            ncores=self.ncores,
+            max_pending=self.max_pending,
+        ) as pool:
+            exhausted = False
+            while True:
+                while not pool.full:
+                    if stack:
+                        position, ts = stack.pop()
+                    elif not exhausted:
+                        position, ts = 0, next(structures, None)
+                        if ts is None:
+                            exhausted = True
+                            continue
+                    else:
+                        break
+                    if position == len(self.transformations):
+                        yield ts
+                        continue
+                    pool.submit(position, ts)
+                if not pool:
+                    break
+                self._push(stack, pool.get())
+
+    def _push(self, stack, result):
+        """
+        Records the stats of the application of a transformation and pushes
+        its outputs to the stack, so that they are popped in order.
+        """
+        position, outputs, elapsed = result
+        stats = self._stats[position]
+        stats["inputs"] += 1
+        stats["outputs"] += len(outputs)
+        stats["time"] += elapsed
+        stack.extend((position + 1, ts) for ts in reversed(outputs))
+
+    def get_stats(self):
+        """
+        Returns statistics of the transformations of the last iteration over
+        transformed structures, as a list with a dict for each
+        transformation with the following keys:
+
+            - transformation: Name of the transformation class.
+            - inputs: Number of structures the transformation was applied
+              to.
+            - outputs: Number of structures output by the transformation.
+            - fan_out: Average number of outputs per input.
+            - time: Total time spent applying the transformation, in s.
+        """
+        return [
+            dict(stats, fan_out=stats["outputs"] / stats["inputs"] if stats["inputs"] else 0) for stats in self._stats
+        ]
+
+    def write_jsonl(self, structures, filename):
+        """
+        Apply the transformations to structures and write the transformed
+        structures to a newline-delimited JSON file as they are produced.
+
+        Args:
+            structures: Iterable of Structures or TransformedStructures.
+            filename (str): Filename. If it ends with gz or bz2, the relevant
+                compression is applied.
+
+        Returns:
+            Number of transformed structures written.
+        """
+        count = 0
+        with zopen(filename, "wt") as f:
+            for ts in self.iter_transformed_structures(structures):
+                f.write(json.dumps(ts.as_dict(), cls=MontyEncoder) + "\n")
+                count += 1
+        return count
+
+    def write_vasp_input(self, structures, **kwargs):
+        r"""
+        Apply the transformations to structures and batch write vasp input
+        for the transformed structures as they are produced.
+
+        Args:
+            structures: Iterable of Structures or TransformedStructures.
+            \\*\\*kwargs: All kwargs supported by batch_write_vasp_input.
+        """
+        batch_write_vasp_input(self.iter_transformed_structures(structures), **kwargs)
+
+    @staticmethod
+    def iter_jsonl(filename):
+        """
+        Iterate over the transformed structures of a file written by
+        write_jsonl without loading them all in memory.
+
+        Args:
+            filename (str): Filename.
+
+        Yields:
+            TransformedStructures.
+        """
+        with zopen(filename, "rt") as f:
+            for line in f:
+                yield TransformedStructure.from_dict(json.loads(line))
+
+
 def batch_write_vasp_input(
     transformed_structures,
     vasp_input_set=MPRelaxSet,
@@ -403,3 +574,27 @@ def _apply_transformation(inputs):
     if new:
         o.extend(new)
     return o
+
+
+def _apply_streaming_transformation(state, position, ts):
+    """
+    Helper method of StreamingTransmuter to apply a transformation to a
+    structure.
+
+    Args:
+        state: Tuple containing the sequence of transformations and
+            extend_collection.
+        position (int): Position of the transformation in the sequence.
+        ts (TransformedStructure): Structure to transform.
+
+    Returns:
+        Position of the transformation, list of output
+        TransformedStructures and the time taken.
+    """
+    transformations, extend_collection = state
+    start = time.time()
+    new = ts.append_transformation(transformations[position], extend_collection)
+    outputs = [ts]
+    if new:
+        outputs.extend(new)
+    return position, outputs, time.time() - start
@@ -8,8 +8,7 @@ This module implements core classes for calculation of diffraction patterns.
 
 import abc
 import collections
-
-import numpy as np
+from multiprocessing import Pool
 
 from pymatgen.core.spectrum import Spectrum
 from pymatgen.util.plotting import add_fig_kwargs
@@ -75,6 +74,30 @@ class AbstractDiffractionPatternCalculator(abc.ABC):
         """
         pass
 
+    def get_patterns(self, structures, scaled=True, two_theta_range=(0, 90), ncpus=None, chunksize=100):
+        """
+        Calculates the diffraction patterns of many structures, e.g., all the
+        entries of a database for phase identification.
+
+        Args:
+            structures ([Structure]): Input structures
+            scaled (bool): Whether to return scaled intensities. See
+                get_pattern.
+            two_theta_range ([float of length 2]): Tuple for range of
+                two_thetas to calculate in degrees. See get_pattern.
+            ncpus (int): Number of processes to calculate the patterns with.
+                Defaults to None, i.e., serial.
+            chunksize (int): Number of structures sent to a process at once.
+
+        Returns:
+            ([DiffractionPattern]) in the order of the structures.
+        """
+        args = ((self, s, scaled, two_theta_range) for s in structures)
+        if not ncpus:
+            return [_get_pattern(a) for a in args]
+        with Pool(ncpus) as pool:
+            return pool.map(_get_pattern, args, chunksize=chunksize)
+
     def get_plot(
         self,
         structure,
@@ -177,6 +200,15 @@ class AbstractDiffractionPatternCalculator(abc.ABC):
         return fig
 
 
+def _get_pattern(args):
+    """
+    Internal helper method for AbstractDiffractionPatternCalculator to
+    calculate a pattern in a process pool.
+    """
+    calculator, structure, scaled, two_theta_range = args
+    return calculator.get_pattern(structure, scaled=scaled, two_theta_range=two_theta_range)
+
+
 def get_unique_families(hkls):
     """
     Returns unique families of Miller indices. Families must be permutations
@@ -189,22 +221,11 @@ def get_unique_families(hkls):
         {hkl: multiplicity}: A dict with unique hkl and multiplicity.
     """
 
-    # TODO: Definitely can be sped up.
-    def is_perm(hkl1, hkl2):
-        h1 = np.abs(hkl1)
-        h2 = np.abs(hkl2)
-        return all([i == j for i, j in zip(sorted(h1), sorted(h2))])
-
+    # Families are grouped by their sorted absolute indices, which is
+    # equivalent to comparing every pair of Miller indices for permutations.
     unique = collections.defaultdict(list)
-    for hkl1 in hkls:
-        found = False
-        for hkl2 in unique.keys():
-            if is_perm(hkl1, hkl2):
-                found = True
-                unique[hkl2].append(hkl1)
-                break
-        if not found:
-            unique[hkl1].append(hkl1)
+    for hkl in hkls:
+        unique[tuple(sorted(abs(i) for i in hkl))].append(hkl)
 
     pretty_unique = {}
     for k, v in unique.items():
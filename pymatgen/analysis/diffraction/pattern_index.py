@@ -0,0 +1,232 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+This module implements an index of diffraction patterns for fast phase
+identification, i.e., ranking a library of reference patterns by their
+similarity to a (measured) pattern.
+"""
+
+import json
+
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+
+from pymatgen.analysis.diffraction.xrd import XRDCalculator
+
+
+class DiffractionPatternIndex:
+    """
+    Library of reference diffraction patterns stored as a compact float32
+    matrix. Each pattern is binned on a regular two theta grid, broadened
+    with a Gaussian, optionally transformed for the weighted
+    cross-correlation metric, and normalized, so that the similarities of a
+    query to all references are computed with a single matrix-vector
+    product.
+
+    Two similarity metrics are supported:
+
+    i. "cosine": Cosine similarity of the broadened patterns.
+    ii. "wcc": Weighted cross-correlation of de Gelder et al., J. Comput.
+        Chem. 22, 273 (2001), with a triangular weight function of width
+        wcc_width. It is more tolerant to small peak shifts, e.g., from
+        lattice strain. The triangular weight is the autocorrelation of a box
+        function, so the weighted cross-correlation is the cosine similarity
+        of the patterns convolved with that box, which is what is stored.
+
+    Usage::
+
+        index = DiffractionPatternIndex(two_theta_range=(10, 80))
+        index.add_structures(structures, structure_ids=mp_ids, ncpus=8)
+        index.to_file("patterns.npz")
+        ...
+        index = DiffractionPatternIndex.from_file("patterns.npz")
+        for pattern_id, score in index.query(measured_pattern, k=5):
+            ...
+    """
+
+    def __init__(self, two_theta_range=(10, 90), step=0.1, sigma=0.1, metric="cosine", wcc_width=1.0):
+        """
+        Args:
+            two_theta_range ([float of length 2]): Range of two thetas in
+                degrees over which patterns are compared.
+            step (float): Width of the two theta bins in degrees.
+            sigma (float): Standard deviation of the Gaussian broadening of
+                the peaks in degrees. Use 0 for no broadening.
+            metric (str): Similarity metric, "cosine" or "wcc".
+            wcc_width (float): Width of the triangular weight function of the
+                "wcc" metric in degrees.
+        """
+        if metric not in ("cosine", "wcc"):
+            raise ValueError("Unsupported metric {}".format(metric))
+        self.two_theta_range = tuple(two_theta_range)
+        self.step = step
+        self.sigma = sigma
+        self.metric = metric
+        self.wcc_width = wcc_width
+        self.nbins = int(round((two_theta_range[1] - two_theta_range[0]) / step))
+        self.ids = []
+        self._blocks = []
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+
+    @property
+    def dim(self):
+        """
+        Returns:
+            Length of the stored pattern vectors.
+        """
+        if self.metric == "wcc":
+            return self.nbins + self._get_wcc_bins() - 1
+        return self.nbins
+
+    def _get_wcc_bins(self):
+        return max(1, int(round(self.wcc_width / self.step)))
+
+    @property
+    def matrix(self):
+        """
+        Returns:
+            float32 matrix of the normalized pattern vectors, one row per
+            reference pattern, in the order of ids.
+        """
+        if self._blocks:
+            self._matrix = np.concatenate([self._matrix] + self._blocks)
+            self._blocks = []
+        return self._matrix
+
+    def get_vectors(self, patterns):
+        """
+        Args:
+            patterns ([DiffractionPattern]): Patterns, either as peaks, e.g.,
+                from XRDCalculator.get_pattern, or as measured profiles. Peaks
+                outside two_theta_range are ignored.
+
+        Returns:
+            float32 matrix of the normalized pattern vectors, one row per
+            pattern.
+        """
+        edges = np.linspace(self.two_theta_range[0], self.two_theta_range[1], self.nbins + 1)
+        vectors = np.array([np.histogram(p.x, bins=edges, weights=p.y)[0] for p in patterns], dtype=float)
+        vectors = vectors.reshape((-1, self.nbins))
+        if self.sigma:
+            vectors = gaussian_filter1d(vectors, self.sigma / self.step, axis=1, mode="constant")
+        if self.metric == "wcc":
+            box = np.ones(self._get_wcc_bins())
+            vectors = np.array([np.convolve(v, box) for v in vectors]).reshape((-1, self.dim))
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1
+        return (vectors / norms[:, None]).astype(np.float32)
+
+    def add_patterns(self, patterns, pattern_ids=None):
+        """
+        Add reference patterns to the index.
+
+        Args:
+            patterns ([DiffractionPattern]): Patterns to add.
+            pattern_ids ([str]): Ids of the patterns. Defaults to the row
+                numbers in the index.
+
+        Returns:
+            List of the ids of the added patterns.
+        """
+        vectors = self.get_vectors(patterns)
+        if pattern_ids is None:
+            pattern_ids = range(len(self), len(self) + len(vectors))
+        pattern_ids = [str(i) for i in pattern_ids]
+        if len(pattern_ids) != len(vectors):
+            raise ValueError("The number of ids differs from the number of patterns.")
+        self._blocks.append(vectors)
+        self.ids.extend(pattern_ids)
+        return pattern_ids
+
+    def add_structures(self, structures, structure_ids=None, calculator=None, ncpus=None):
+        """
+        Calculate the patterns of structures and add them to the index.
+
+        Args:
+            structures ([Structure]): Structures to add.
+            structure_ids ([str]): Ids of the structures. Defaults to the row
+                numbers in the index.
+            calculator (AbstractDiffractionPatternCalculator): Calculator of
+                the patterns. Defaults to XRDCalculator().
+            ncpus (int): Number of processes to calculate the patterns with.
+                Defaults to None, i.e., serial.
+
+        Returns:
+            List of the ids of the added structures.
+        """
+        calculator = calculator or XRDCalculator()
+        patterns = calculator.get_patterns(structures, two_theta_range=self.two_theta_range, ncpus=ncpus)
+        return self.add_patterns(patterns, structure_ids)
+
+    def query(self, pattern, k=10):
+        """
+        Find the reference patterns most similar to a pattern.
+
+        Args:
+            pattern (DiffractionPattern): Pattern to look up.
+            k (int): Number of references to return.
+
+        Returns:
+            List of (id, similarity) of the k most similar references, by
+            decreasing similarity. Similarities are between 0 and 1 for
+            non-negative intensities.
+        """
+        return self.query_many([pattern], k=k)[0]
+
+    def query_many(self, patterns, k=10):
+        """
+        Find the reference patterns most similar to many patterns at once.
+
+        Args:
+            patterns ([DiffractionPattern]): Patterns to look up.
+            k (int): Number of references to return per pattern.
+
+        Returns:
+            List of the results of query for each pattern.
+        """
+        scores = np.dot(self.get_vectors(patterns), self.matrix.T)
+        k = min(k, scores.shape[1])
+        results = []
+        for s in scores:
+            top = np.argpartition(-s, k - 1)[:k] if k else np.zeros(0, dtype=int)
+            top = top[np.argsort(-s[top], kind="stable")]
+            results.append([(self.ids[i], float(s[i])) for i in top])
+        return results
+
+    def __len__(self):
+        return len(self.ids)
+
+    def to_file(self, filename):
+        """
+        Save the index to a .npz file.
+
+        Args:
+            filename (str): Filename.
+        """
+        settings = {
+            "two_theta_range": self.two_theta_range,
+            "step": self.step,
+            "sigma": self.sigma,
+            "metric": self.metric,
+            "wcc_width": self.wcc_width,
+        }
+        np.savez(filename, matrix=self.matrix, ids=np.array(self.ids, dtype=str), settings=json.dumps(settings))
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Load an index saved with to_file.
+
+        Args:
+            filename (str): Filename.
+
+        Returns:
+            DiffractionPatternIndex
+        """
+        with np.load(filename) as data:
+            index = cls(**json.loads(str(data["settings"])))
+            index._matrix = data["matrix"]
+            index.ids = data["ids"].tolist()
+        return index
@@ -0,0 +1,80 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+import unittest
+
+import numpy as np
+from monty.tempfile import ScratchDir
+
+from pymatgen.analysis.diffraction.core import DiffractionPattern
+from pymatgen.analysis.diffraction.pattern_index import DiffractionPatternIndex
+from pymatgen.analysis.diffraction.xrd import XRDCalculator
+from pymatgen.util.testing import PymatgenTest
+
+
+class DiffractionPatternIndexTest(PymatgenTest):
+    def setUp(self):
+        self.names = ["CsCl", "LiFePO4", "Graphite", "Si", "Li2O", "SrTiO3", "TiO2", "BaNiO3"]
+        self.structures = [self.get_structure(name) for name in self.names]
+        self.calculator = XRDCalculator()
+
+    def test_query(self):
+        index = DiffractionPatternIndex(two_theta_range=(10, 80))
+        self.assertEqual(index.add_structures(self.structures[:2]), ["0", "1"])
+        index.add_structures(self.structures[2:], structure_ids=self.names[2:])
+        self.assertEqual(len(index), len(self.names))
+        self.assertEqual(index.matrix.shape, (len(self.names), 700))
+        self.assertEqual(index.matrix.dtype, np.float32)
+
+        for i, s in enumerate(self.structures):
+            results = index.query(self.calculator.get_pattern(s), k=3)
+            self.assertEqual(len(results), 3)
+            self.assertEqual(results[0][0], str(i) if i < 2 else self.names[i])
+            self.assertAlmostEqual(results[0][1], 1, 5)
+            self.assertGreaterEqual(results[0][1], results[1][1])
+            self.assertGreaterEqual(results[1][1], results[2][1])
+
+        self.assertEqual(len(index.query(self.calculator.get_pattern(self.structures[0]), k=100)), len(self.names))
+        pattern = DiffractionPattern([5, 85], [1, 1], [[], []], [1, 1])
+        self.assertEqual(index.query(pattern, k=1)[0][1], 0)
+
+    def test_wcc(self):
+        strained = []
+        for s in self.structures:
+            s = s.copy()
+            s.scale_lattice(s.volume * 1.01)
+            strained.append(s)
+        patterns = self.calculator.get_patterns(strained)
+        for metric in ["cosine", "wcc"]:
+            index = DiffractionPatternIndex(two_theta_range=(10, 80), sigma=0.05, metric=metric, wcc_width=2)
+            index.add_structures(self.structures, structure_ids=self.names)
+            results = index.query_many(patterns, k=1)
+            scores = [r[0][1] for r in results]
+            if metric == "cosine":
+                cosine_scores = scores
+            else:
+                self.assertEqual([r[0][0] for r in results], self.names)
+                self.assertTrue(np.all(np.array(scores) > np.array(cosine_scores)))
+
+    def test_to_from_file(self):
+        index = DiffractionPatternIndex(two_theta_range=(10, 80), metric="wcc")
+        index.add_structures(self.structures, structure_ids=self.names, ncpus=2)
+        pattern = self.calculator.get_pattern(self.structures[1])
+        with ScratchDir("."):
+            index.to_file("index.npz")
+            loaded = DiffractionPatternIndex.from_file("index.npz")
+        self.assertEqual(loaded.ids, self.names)
+        self.assertEqual(loaded.metric, "wcc")
+        self.assertArrayEqual(loaded.matrix, index.matrix)
+        self.assertEqual(loaded.query(pattern, k=2), index.query(pattern, k=2))
+        loaded.add_structures(self.structures[:1], structure_ids=["new"])
+        results = loaded.query(self.calculator.get_pattern(self.structures[0]), k=2)
+        self.assertEqual({r[0] for r in results}, {"CsCl", "new"})
+
+        self.assertRaises(ValueError, DiffractionPatternIndex, metric="euclidean")
+        self.assertRaises(ValueError, index.add_patterns, [pattern], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
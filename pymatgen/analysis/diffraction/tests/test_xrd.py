@@ -5,8 +5,9 @@
 import unittest
 
 import matplotlib as mpl
+import numpy as np
 
-from pymatgen.analysis.diffraction.xrd import XRDCalculator
+from pymatgen.analysis.diffraction.xrd import ATOMIC_SCATTERING_PARAMS, XRDCalculator
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Structure
 from pymatgen.util.testing import PymatgenTest
@@ -89,6 +90,29 @@ class XRDCalculatorTest(PymatgenTest):
         self.assertAlmostEqual(xrd.y[0], 2377745.2296686019)
         self.assertAlmostEqual(xrd.d_hkls[0], 2.2382050944897789)
 
+    def test_get_scattering_factors(self):
+        c = XRDCalculator(debye_waller_factors={"W": 0.1526})
+        fs = c.get_scattering_factors(["W", "Cs"], [0, 0.1])
+        self.assertArrayAlmostEqual(fs[:, 0], [74, 55])
+        coeffs = np.array(ATOMIC_SCATTERING_PARAMS["W"])
+        f_w = 74 - 41.78214 * 0.1 * np.sum(coeffs[:, 0] * np.exp(-coeffs[:, 1] * 0.1))
+        self.assertAlmostEqual(fs[0, 1], f_w * np.exp(-0.1526 * 0.1))
+
+    def test_get_patterns(self):
+        c = XRDCalculator()
+        structures = [self.get_structure(name) for name in ["CsCl", "LiFePO4", "Graphite"]]
+        patterns = c.get_patterns(structures, two_theta_range=(10, 80))
+        self.assertEqual(len(patterns), 3)
+        self.assertEqual(len(c.get_patterns(iter(structures))), 3)
+        for s, p, pp in zip(
+            structures, patterns, c.get_patterns(structures, two_theta_range=(10, 80), ncpus=2, chunksize=1)
+        ):
+            ref = c.get_pattern(s, two_theta_range=(10, 80))
+            for xrd in [p, pp]:
+                self.assertArrayAlmostEqual(xrd.x, ref.x)
+                self.assertArrayAlmostEqual(xrd.y, ref.y)
+                self.assertEqual(xrd.hkls, ref.hkls)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,10 +8,12 @@ This module implements an XRD pattern calculator.
 
 import json
 import os
-from math import asin, cos, degrees, pi, radians, sin
+from bisect import bisect_left
+from math import pi, radians, sin
 
 import numpy as np
 
+from pymatgen.core.periodic_table import Element
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 
 from .core import (
@@ -135,6 +137,48 @@ class XRDCalculator(AbstractDiffractionPatternCalculator):
             self.wavelength = WAVELENGTHS[wavelength]
         self.symprec = symprec
         self.debye_waller_factors = debye_waller_factors or {}
+        self._scattering_params = {}
+
+    def get_scattering_factors(self, symbols, s2):
+        """
+        Computes the atomic scattering factors, with Debye-Waller corrections,
+        of elements for many values of s^2 at once. The fitted parameters of
+        the elements are converted to arrays only once per calculator.
+
+        Args:
+            symbols ([str]): Element symbols.
+            s2 (np.ndarray): Values of s^2 = (sin(theta) / wavelength)^2.
+
+        Returns:
+            np.ndarray of shape (len(symbols), len(s2)).
+        """
+        zs, coeffs, dwfactors = [], [], []
+        for symbol in symbols:
+            if symbol not in self._scattering_params:
+                self._scattering_params[symbol] = (
+                    Element(symbol).Z,
+                    np.array(ATOMIC_SCATTERING_PARAMS[symbol]),
+                    self.debye_waller_factors.get(symbol, 0),
+                )
+            z, c, dw = self._scattering_params[symbol]
+            zs.append(z)
+            coeffs.append(c)
+            dwfactors.append(dw)
+        zs = np.array(zs, dtype=float)[:, None]
+        coeffs = np.array(coeffs).reshape((len(symbols), -1, 2))
+        dwfactors = np.array(dwfactors, dtype=float)[:, None]
+        s2 = np.array(s2, dtype=float)[None, :]
+
+        # Highly vectorized computation of atomic scattering factors.
+        # Equivalent non-vectorized code is::
+        #
+        #   for site in structure:
+        #      el = site.specie
+        #      coeff = ATOMIC_SCATTERING_PARAMS[el.symbol]
+        #      fs = el.Z - 41.78214 * s2 * sum(
+        #          [d[0] * exp(-d[1] * s2) for d in coeff])
+        fs = zs - 41.78214 * s2 * np.sum(coeffs[:, :, 0, None] * np.exp(-coeffs[:, :, 1, None] * s2), axis=1)
+        return fs * np.exp(-dwfactors * s2)
 
     def get_pattern(self, structure, scaled=True, two_theta_range=(0, 90)):
         """
@@ -171,119 +215,104 @@ class XRDCalculator(AbstractDiffractionPatternCalculator):
 
         # Obtain crystallographic reciprocal lattice points within range
         recip_latt = latt.reciprocal_lattice_crystallographic
-        recip_pts = recip_latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0], max_r)
-        if min_r:
-            recip_pts = [pt for pt in recip_pts if pt[1] >= min_r]
-
-        # Create a flattened array of zs, coeffs, fcoords and occus. This is
-        # used to perform vectorized computation of atomic scattering factors
-        # later. Note that these are not necessarily the same size as the
+        recip_pts, g_hkls, _, _ = recip_latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0], max_r, zip_results=False)
+        # Force miller indices to be integers.
+        hkls = np.rint(np.reshape(recip_pts, (-1, 3))).astype(int)
+        g_hkls = np.array(g_hkls, dtype=float)
+        cond = (g_hkls != 0) & (g_hkls >= min_r)
+        hkls, g_hkls = hkls[cond], g_hkls[cond]
+        order = np.lexsort((-hkls[:, 2], -hkls[:, 1], -hkls[:, 0], g_hkls))
+        hkls, g_hkls = hkls[order], g_hkls[order]
+
+        # Create a flattened array of species indices, fcoords and occus.
+        # Note that these are not necessarily the same size as the
         # structure as each partially occupied specie occupies its own
         # position in the flattened array.
-        zs = []
-        coeffs = []
+        symbols = []
+        species_indices = []
         fcoords = []
         occus = []
-        dwfactors = []
 
         for site in structure:
             for sp, occu in site.species.items():
-                zs.append(sp.Z)
-                try:
-                    c = ATOMIC_SCATTERING_PARAMS[sp.symbol]
-                except KeyError:
-                    raise ValueError(
-                        "Unable to calculate XRD pattern as "
-                        "there is no scattering coefficients for"
-                        " %s." % sp.symbol
-                    )
-                coeffs.append(c)
-                dwfactors.append(self.debye_waller_factors.get(sp.symbol, 0))
+                if sp.symbol not in symbols:
+                    if sp.symbol not in ATOMIC_SCATTERING_PARAMS:
+                        raise ValueError(
+                            "Unable to calculate XRD pattern as "
+                            "there is no scattering coefficients for"
+                            " %s." % sp.symbol
+                        )
+                    symbols.append(sp.symbol)
+                species_indices.append(symbols.index(sp.symbol))
                 fcoords.append(site.frac_coords)
                 occus.append(occu)
 
-        zs = np.array(zs)
-        coeffs = np.array(coeffs)
         fcoords = np.array(fcoords)
         occus = np.array(occus)
-        dwfactors = np.array(dwfactors)
-        peaks = {}
-        two_thetas = []
-
-        for hkl, g_hkl, ind, _ in sorted(recip_pts, key=lambda i: (i[1], -i[0][0], -i[0][1], -i[0][2])):
-            # Force miller indices to be integers.
-            hkl = [int(round(i)) for i in hkl]
-            if g_hkl != 0:
-
-                d_hkl = 1 / g_hkl
-
-                # Bragg condition
-                theta = asin(wavelength * g_hkl / 2)
-
-                # s = sin(theta) / wavelength = 1 / 2d = |ghkl| / 2 (d =
-                # 1/|ghkl|)
-                s = g_hkl / 2
-
-                # Store s^2 since we are using it a few times.
-                s2 = s ** 2
-
-                # Vectorized computation of g.r for all fractional coords and
-                # hkl.
-                g_dot_r = np.dot(fcoords, np.transpose([hkl])).T[0]
-
-                # Highly vectorized computation of atomic scattering factors.
-                # Equivalent non-vectorized code is::
-                #
-                #   for site in structure:
-                #      el = site.specie
-                #      coeff = ATOMIC_SCATTERING_PARAMS[el.symbol]
-                #      fs = el.Z - 41.78214 * s2 * sum(
-                #          [d[0] * exp(-d[1] * s2) for d in coeff])
-                fs = zs - 41.78214 * s2 * np.sum(coeffs[:, :, 0] * np.exp(-coeffs[:, :, 1] * s2), axis=1)
-
-                dw_correction = np.exp(-dwfactors * s2)
-
-                # Structure factor = sum of atomic scattering factors (with
-                # position factor exp(2j * pi * g.r and occupancies).
-                # Vectorized computation.
-                f_hkl = np.sum(fs * occus * np.exp(2j * pi * g_dot_r) * dw_correction)
-
-                # Lorentz polarization correction for hkl
-                lorentz_factor = (1 + cos(2 * theta) ** 2) / (sin(theta) ** 2 * cos(theta))
-
-                # Intensity for hkl is modulus square of structure factor.
-                i_hkl = (f_hkl * f_hkl.conjugate()).real
-
-                two_theta = degrees(2 * theta)
-
-                if is_hex:
-                    # Use Miller-Bravais indices for hexagonal lattices.
-                    hkl = (hkl[0], hkl[1], -hkl[0] - hkl[1], hkl[2])
-                # Deal with floating point precision issues.
-                ind = np.where(
-                    np.abs(np.subtract(two_thetas, two_theta)) < AbstractDiffractionPatternCalculator.TWO_THETA_TOL
-                )
-                if len(ind[0]) > 0:
-                    peaks[two_thetas[ind[0][0]]][0] += i_hkl * lorentz_factor
-                    peaks[two_thetas[ind[0][0]]][1].append(tuple(hkl))
-                else:
-                    peaks[two_theta] = [i_hkl * lorentz_factor, [tuple(hkl)], d_hkl]
-                    two_thetas.append(two_theta)
+
+        # s = sin(theta) / wavelength = 1 / 2d = |ghkl| / 2 (d =
+        # 1/|ghkl|)
+        s2 = (g_hkls / 2) ** 2
+
+        # Atomic scattering factors with Debye-Waller corrections of each
+        # species for all hkl, with shape (nspecies, nhkl). These are computed
+        # once per species rather than per site. See get_scattering_factors.
+        fs = self.get_scattering_factors(symbols, s2)
+
+        # Structure factor = sum of atomic scattering factors (with
+        # position factor exp(2j * pi * g.r and occupancies). The
+        # reflections are processed in chunks to bound the size of the
+        # (nhkl, nsites) arrays.
+        weights = fs[species_indices] * occus[:, None]
+        f_hkl = np.zeros(len(hkls), dtype=complex)
+        chunk_size = max(1, 2 ** 20 // max(len(fcoords), 1))
+        for i in range(0, len(hkls), chunk_size):
+            g_dot_r = np.dot(hkls[i : i + chunk_size], fcoords.T)
+            f_hkl[i : i + chunk_size] = np.sum(weights[:, i : i + chunk_size].T * np.exp(2j * pi * g_dot_r), axis=1)
+
+        # Bragg condition
+        thetas = np.arcsin(wavelength * g_hkls / 2)
+
+        # Lorentz polarization correction for hkl
+        lorentz_factors = (1 + np.cos(2 * thetas) ** 2) / (np.sin(thetas) ** 2 * np.cos(thetas))
+
+        # Intensity for hkl is modulus square of structure factor.
+        intensities = (f_hkl.real ** 2 + f_hkl.imag ** 2) * lorentz_factors
+        two_thetas = np.degrees(2 * thetas)
+
+        # Deal with floating point precision issues. The two thetas are
+        # sorted, so reflections within TWO_THETA_TOL of the first one of a
+        # peak belong to that peak.
+        starts = []
+        two_thetas_list = two_thetas.tolist()
+        i = 0
+        while i < len(two_thetas_list):
+            starts.append(i)
+            i = max(
+                i + 1,
+                bisect_left(two_thetas_list, two_thetas_list[i] + AbstractDiffractionPatternCalculator.TWO_THETA_TOL),
+            )
+        peak_intensities = np.add.reduceat(intensities, starts) if starts else np.zeros(0)
+
+        if is_hex:
+            # Use Miller-Bravais indices for hexagonal lattices.
+            hkls = np.column_stack([hkls[:, 0], hkls[:, 1], -hkls[:, 0] - hkls[:, 1], hkls[:, 2]])
+        hkls = [tuple(hkl) for hkl in hkls.tolist()]
 
         # Scale intensities so that the max intensity is 100.
-        max_intensity = max([v[0] for v in peaks.values()])
+        max_intensity = max(peak_intensities)
         x = []
         y = []
-        hkls = []
+        hkls_list = []
         d_hkls = []
-        for k in sorted(peaks.keys()):
-            v = peaks[k]
-            fam = get_unique_families(v[1])
-            if v[0] / max_intensity * 100 > AbstractDiffractionPatternCalculator.SCALED_INTENSITY_TOL:
-                x.append(k)
-                y.append(v[0])
-                hkls.append([{"hkl": hkl, "multiplicity": mult} for hkl, mult in fam.items()])
-                d_hkls.append(v[2])
+        for j, (i, intensity) in enumerate(zip(starts, peak_intensities)):
+            if intensity / max_intensity * 100 > AbstractDiffractionPatternCalculator.SCALED_INTENSITY_TOL:
+                fam = get_unique_families(hkls[i : starts[j + 1] if j + 1 < len(starts) else len(hkls)])
+                x.append(two_thetas[i])
+                y.append(intensity)
+                hkls_list.append([{"hkl": hkl, "multiplicity": mult} for hkl, mult in fam.items()])
+                d_hkls.append(1 / g_hkls[i])
+        hkls = hkls_list
         xrd = DiffractionPattern(x, y, hkls, d_hkls)
         if scaled:
             xrd.normalize(mode="max", value=100)
@@ -19,12 +19,18 @@ citing the following papers::
 """
 
 
+import glob
+import itertools
 import multiprocessing
+import os
+import re
+import time
 import warnings
 
 import numpy as np
 import scipy.constants as const
 from monty.json import MSONable
+from scipy.fft import next_fast_len
 
 from pymatgen.analysis.structure_matcher import (
     OrderDisorderElementComparator,
@@ -32,7 +38,8 @@ from pymatgen.analysis.structure_matcher import (
 )
 from pymatgen.core.periodic_table import get_el_sp
 from pymatgen.core.structure import Structure
-from pymatgen.io.vasp.outputs import Vasprun
+from pymatgen.core.trajectory import Trajectory
+from pymatgen.io.vasp.outputs import Vasprun, Xdatcar
 from pymatgen.util.coord import pbc_diff
 
 __author__ = "Will Richards, Shyue Ping Ong"
@@ -147,7 +154,7 @@ class DiffusionAnalyzer(MSONable):
         """
         This constructor is meant to be used with pre-processed data.
         Other convenient constructors are provided as class methods (see
-        from_vaspruns and from_files).
+        from_vaspruns, from_files, from_frac_coords and from_trajectory).
 
         Given a matrix of displacements (see arguments below for expected
         format), the diffusivity is given by::
@@ -258,27 +265,32 @@ class DiffusionAnalyzer(MSONable):
             # calculate mean square charge displacement
             mscd = np.zeros_like(msd, dtype=np.double)
 
-            for i, n in enumerate(timesteps):
-                if not smoothed:
-                    dx = dc[:, i : i + 1, :]
-                    dcomponents = dc[:, i : i + 1, :]
-                elif smoothed == "constant":
-                    dx = dc[:, i : i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
-                    dcomponents = dc[:, i : i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
-                else:
-                    dx = dc[:, n:, :] - dc[:, :-n, :]
-                    dcomponents = dc[:, n:, :] - dc[:, :-n, :]
+            if smoothed == "max":
+                # Average over all time origins, computed with FFTs for all
+                # the timesteps at once.
+                sq_disp_components = get_msd_fft(dc, timesteps)
+                sq_disp_ions = np.sum(sq_disp_components, axis=2)
+                msd = np.average(sq_disp_ions[indices], axis=0)
+                msd_components = np.average(sq_disp_components[indices], axis=0)
+                chg_disp = np.sum(dc[indices], axis=0)[None, :, :]
+                mscd = np.sum(get_msd_fft(chg_disp, timesteps)[0], axis=1) / len(indices)
+            else:
+                for i in range(len(timesteps)):
+                    if not smoothed:
+                        dx = dc[:, i : i + 1, :]
+                    else:
+                        dx = dc[:, i : i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
 
-                # Get msd
-                sq_disp = dx ** 2
-                sq_disp_ions[:, i] = np.average(np.sum(sq_disp, axis=2), axis=1)
-                msd[i] = np.average(sq_disp_ions[:, i][indices])
+                    # Get msd
+                    sq_disp = dx ** 2
+                    sq_disp_ions[:, i] = np.average(np.sum(sq_disp, axis=2), axis=1)
+                    msd[i] = np.average(sq_disp_ions[:, i][indices])
 
-                msd_components[i] = np.average(dcomponents[indices] ** 2, axis=(0, 1))
+                    msd_components[i] = np.average(sq_disp[indices], axis=(0, 1))
 
-                # Get mscd
-                sq_chg_disp = np.sum(dx[indices, :, :], axis=0) ** 2
-                mscd[i] = np.average(np.sum(sq_chg_disp, axis=1), axis=0) / len(indices)
+                    # Get mscd
+                    sq_chg_disp = np.sum(dx[indices, :, :], axis=0) ** 2
+                    mscd[i] = np.average(np.sum(sq_chg_disp, axis=1), axis=0) / len(indices)
 
             def weighted_lstsq(a, b):
                 if smoothed == "max":
@@ -586,37 +598,141 @@ class DiffusionAnalyzer(MSONable):
             \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
                 Examples include smoothed, min_obs, avg_nsteps.
         """
-        p, l = [], []
-        for i, s in enumerate(structures):
-            if i == 0:
-                structure = s
-            p.append(np.array(s.frac_coords)[:, None])
-            l.append(s.lattice.matrix)
+        structures = list(structures)
+        return cls.from_frac_coords(
+            structures[0],
+            np.array([s.frac_coords for s in structures]),
+            specie,
+            temperature,
+            time_step,
+            step_skip,
+            lattices=np.array([s.lattice.matrix for s in structures]),
+            initial_disp=initial_disp,
+            initial_structure=initial_structure,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_frac_coords(
+        cls,
+        structure,
+        frac_coords,
+        specie,
+        temperature,
+        time_step,
+        step_skip,
+        lattices=None,
+        initial_disp=None,
+        initial_structure=None,
+        chunk_size=1000,
+        **kwargs,
+    ):
+        r"""
+        Convenient constructor that takes in the fractional coordinates of
+        all sites at every step as a single array, e.g., parsed directly from
+        an MD output or a memory-mapped file, without creating a Structure
+        per step.
+
+        Args:
+            structure (Structure): Structure of the first step, which gives
+                the species of the sites.
+            frac_coords (np.ndarray): Fractional coordinates with shape
+                [time step, site, axis]. The coordinates may be wrapped in the
+                unit cell.
+            specie (Element/Species): Species to calculate diffusivity for as a
+                String. E.g., "Li".
+            temperature (float): Temperature of the diffusion run in Kelvin.
+            time_step (int): Time step between measurements.
+            step_skip (int): Sampling frequency of the displacements (
+                time_step is multiplied by this number to get the real time
+                between measurements)
+            lattices (np.ndarray): Lattice matrices of every step with shape
+                [time step, 3, 3], for NPT-AIMD. Defaults to the lattice of
+                structure for all steps.
+            initial_disp (np.ndarray): Initial displacements. See
+                from_structures.
+            initial_structure (Structure): Structure from which the
+                displacements are computed. See from_structures.
+            chunk_size (int): Number of steps converted to displacements at
+                once. Only bounds the memory used by temporary arrays.
+            \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
+                Examples include smoothed, min_obs, avg_nsteps.
+        """
+        blocks = (
+            (
+                frac_coords[i : i + chunk_size],
+                structure.lattice.matrix if lattices is None else lattices[i : i + chunk_size],
+            )
+            for i in range(0, len(frac_coords), chunk_size)
+        )
         if initial_structure is not None:
-            p.insert(0, np.array(initial_structure.frac_coords)[:, None])
-            l.insert(0, initial_structure.lattice.matrix)
-        else:
-            p.insert(0, p[0])
-            l.insert(0, l[0])
-
-        p = np.concatenate(p, axis=1)
-        dp = p[:, 1:] - p[:, :-1]
-        dp = dp - np.round(dp)
-        f_disp = np.cumsum(dp, axis=1)
-        c_disp = []
-        for i in f_disp:
-            c_disp.append([np.dot(d, m) for d, m in zip(i, l[1:])])
-        disp = np.array(c_disp)
-
-        # If is NVT-AIMD, clear lattice data.
-        if np.array_equal(l[0], l[-1]):
-            l = np.array([l[0]])
+            initial_frac_coords, initial_lattice = initial_structure.frac_coords, initial_structure.lattice.matrix
         else:
-            l = np.array(l)
+            initial_frac_coords = frac_coords[0]
+            initial_lattice = structure.lattice.matrix if lattices is None else lattices[0]
+        disp, lattices = _get_displacements(blocks, initial_frac_coords, initial_lattice)
+        if initial_disp is not None:
+            disp += initial_disp[:, None, :]
+
+        return cls(structure, disp, specie, temperature, time_step, step_skip=step_skip, lattices=lattices, **kwargs)
+
+    @classmethod
+    def from_trajectory(
+        cls, trajectory, specie, temperature, step_skip=1, initial_disp=None, initial_structure=None, **kwargs
+    ):
+        r"""
+        Convenient constructor that takes in a Trajectory, e.g., a
+        DiskTrajectory, or an iterable of consecutive Trajectory blocks, e.g.,
+        from Xdatcar.iter_trajectories or iter_lammps_dump_trajectories. The
+        trajectories are converted to displacements one block at a time, so
+        that only the displacements are held in memory.
+
+        Args:
+            trajectory (Trajectory): Trajectory, or iterable of Trajectory
+                blocks (must be ordered in sequence of run). The time step is
+                taken from the (first) trajectory.
+            specie (Element/Species): Species to calculate diffusivity for as a
+                String. E.g., "Li".
+            temperature (float): Temperature of the diffusion run in Kelvin.
+            step_skip (int): Sampling frequency of the frames (the time step
+                of the trajectory is multiplied by this number to get the real
+                time between frames)
+            initial_disp (np.ndarray): Initial displacements. See
+                from_structures.
+            initial_structure (Structure): Structure from which the
+                displacements are computed. See from_structures.
+            \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
+                Examples include smoothed, min_obs, avg_nsteps.
+        """
+        if isinstance(trajectory, Trajectory):
+            trajectory = [trajectory]
+        blocks = _iter_trajectory_blocks(trajectory)
+        first_traj, frac_coords, lattice = next(blocks)
+        if first_traj.time_step is None:
+            raise ValueError("The time step of the trajectory is required.")
+        lattice_0 = lattice if np.ndim(lattice) == 2 else lattice[0]
+        structure = Structure(lattice_0, first_traj.species, frac_coords[0])
+        if initial_structure is None:
+            initial_structure = structure
+
+        disp, lattices = _get_displacements(
+            itertools.chain([(frac_coords, lattice)], (block[1:] for block in blocks)),
+            initial_structure.frac_coords,
+            initial_structure.lattice.matrix,
+        )
         if initial_disp is not None:
             disp += initial_disp[:, None, :]
 
-        return cls(structure, disp, specie, temperature, time_step, step_skip=step_skip, lattices=l, **kwargs)
+        return cls(
+            structure,
+            disp,
+            specie,
+            temperature,
+            first_traj.time_step,
+            step_skip=step_skip,
+            lattices=lattices,
+            **kwargs,
+        )
 
     @classmethod
     def from_vaspruns(cls, vaspruns, specie, initial_disp=None, initial_structure=None, **kwargs):
@@ -725,16 +841,12 @@ class DiffusionAnalyzer(MSONable):
             p.join()
             return analyzer
 
-        def vr(filepaths):
-            offset = 0
-            for p in filepaths:
-                v = Vasprun(p, ionic_step_offset=offset, ionic_step_skip=step_skip)
-                yield v
-                # Recompute offset.
-                offset = (-(v.nionic_steps - offset)) % step_skip
-
         return cls.from_vaspruns(
-            vr(filepaths), specie=specie, initial_disp=initial_disp, initial_structure=initial_structure, **kwargs
+            _iter_vaspruns(filepaths, step_skip),
+            specie=specie,
+            initial_disp=initial_disp,
+            initial_structure=initial_structure,
+            **kwargs,
         )
 
     def as_dict(self):
@@ -808,6 +920,98 @@ def get_conversion_factor(structure, species, temperature):
     return 1000 * n / (vol * const.N_A) * z ** 2 * (const.N_A * const.e) ** 2 / (const.R * temperature)
 
 
+def get_msd_fft(displacements, timesteps, chunk_size=None):
+    """
+    Computes the mean square displacements averaged over all time origins,
+    i.e., <(x(t + n) - x(t)) ** 2>_t for every site and axis, using FFTs.
+    The cost is O(nsteps log(nsteps)) per site instead of O(nsteps) per site
+    and timestep n.
+
+    Args:
+        displacements (np.ndarray): Displacements with shape [site, time step,
+            axis].
+        timesteps ([int]): Timesteps n to compute the MSD for. Must be
+            smaller than the number of time steps.
+        chunk_size (int): Number of sites processed at once. Defaults to a
+            chunk size keeping the FFT arrays around 256 MB.
+
+    Returns:
+        Mean square displacements with shape [site, timestep, axis].
+    """
+    nsites, nsteps, dim = np.shape(displacements)
+    timesteps = np.array(timesteps, dtype=int)
+    nfft = next_fast_len(2 * nsteps)
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 24 // (dim * nfft))
+    msd = np.zeros((nsites, len(timesteps), dim))
+    for start in range(0, nsites, chunk_size):
+        x = np.moveaxis(np.array(displacements[start : start + chunk_size], dtype=float), 1, -1)
+        # The MSD does not depend on the origin of x. Centering x reduces the
+        # round-off errors of the FFTs.
+        x -= np.average(x, axis=-1)[..., None]
+        f = np.fft.rfft(x, n=nfft)
+        # sum_t x(t) x(t + n), for t < nsteps - n thanks to the zero padding
+        autocorr = np.fft.irfft(f.real ** 2 + f.imag ** 2, n=nfft)[..., timesteps]
+        sq_sum = np.concatenate([np.zeros(x.shape[:-1] + (1,)), np.cumsum(x ** 2, axis=-1)], axis=-1)
+        sq_disp = sq_sum[..., nsteps - timesteps] + sq_sum[..., -1:] - sq_sum[..., timesteps] - 2 * autocorr
+        msd[start : start + chunk_size] = np.moveaxis(np.maximum(sq_disp, 0) / (nsteps - timesteps), -1, 1)
+    return msd
+
+
+def _get_displacements(blocks, frac_coords, lattice):
+    """
+    Returns the Cartesian displacements with shape [site, time step, axis] of
+    a run, and its lattices in the format of DiffusionAnalyzer (a single
+    lattice for NVT runs, the initial lattice followed by those of every step
+    for NPT runs). The run is given as blocks of (frac_coords, lattices) of
+    consecutive steps, with lattices either a single matrix or one per step,
+    which are processed one at a time.
+    """
+    frac_coords = np.array(frac_coords, dtype=float)
+    lattice = np.array(lattice, dtype=float)
+    f_disp = np.zeros_like(frac_coords)
+    disp, lattices = [], []
+    constant_lattice = True
+    for fcoords, lattice_block in blocks:
+        fcoords = np.array(fcoords, dtype=float)
+        lattice_block = np.array(lattice_block, dtype=float)
+        dp = np.diff(np.concatenate([frac_coords[None, :, :], fcoords]), axis=0)
+        dp -= np.round(dp)
+        f_block = f_disp + np.cumsum(dp, axis=0)
+        f_disp, frac_coords = f_block[-1], fcoords[-1]
+        if lattice_block.ndim == 2:
+            disp.append(np.dot(f_block, lattice_block))
+            lattice_block = np.broadcast_to(lattice_block, (len(fcoords), 3, 3))
+        else:
+            disp.append(np.einsum("tij,tjk->tik", f_block, lattice_block))
+        constant_lattice = constant_lattice and bool(np.all(lattice_block == lattice))
+        lattices.append(lattice_block)
+    disp = np.concatenate(disp, axis=0).transpose((1, 0, 2))
+
+    # If is NVT-AIMD, clear lattice data.
+    if constant_lattice:
+        return np.array(disp), np.array([lattice])
+    return np.array(disp), np.concatenate([lattice[None, :, :]] + lattices)
+
+
+def _iter_trajectory_blocks(trajectories, chunk_size=1000):
+    """
+    Yields (trajectory, frac_coords, lattices) blocks of at most chunk_size
+    frames of consecutive trajectories, with the positions of trajectories
+    in displacement mode reconstructed on the fly.
+    """
+    for traj in trajectories:
+        frac_coords = traj.base_positions
+        for i in range(0, len(traj), chunk_size):
+            if traj.coords_are_displacement:
+                frac_coords = frac_coords + np.cumsum(traj.frac_coords[i : i + chunk_size], axis=0)
+            else:
+                frac_coords = traj.frac_coords[i : i + chunk_size]
+            lattice = traj.lattice if traj.constant_lattice else traj.lattice[i : i + chunk_size]
+            yield traj, frac_coords, lattice
+            frac_coords = frac_coords[-1]
+
+
 def _get_vasprun(args):
     """
     Internal method to support multiprocessing.
@@ -876,6 +1080,191 @@ def get_extrapolated_conductivity(temps, diffusivities, new_temp, structure, spe
     )
 
 
+def _iter_vaspruns(filepaths, step_skip):
+    """
+    Yields the Vaspruns of consecutive runs, parsing every step_skip-th ionic
+    step across runs.
+    """
+    offset = 0
+    for p in filepaths:
+        v = Vasprun(p, ionic_step_offset=offset, ionic_step_skip=step_skip)
+        yield v
+        # Recompute offset.
+        offset = (-(v.nionic_steps - offset)) % step_skip
+
+
+def _iter_xdatcar_trajectories(filepaths, step_skip, time_step):
+    """
+    Yields the Trajectory blocks of consecutive XDATCAR files, parsing every
+    step_skip-th frame across files.
+    """
+    offset = 0
+    for p in filepaths:
+        nframes = yield from Xdatcar.iter_trajectories(p, start=offset, step=step_skip, time_step=time_step)
+        # Recompute offset.
+        offset = (-(nframes - offset)) % step_skip
+
+
+def _iter_timed(iterable, timer):
+    """
+    Yields the items of iterable, adding the time spent producing them to
+    timer[0].
+    """
+    iterator = iter(iterable)
+    while True:
+        start = time.time()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timer[0] += time.time() - start
+        yield item
+
+
+def _get_run_files(run):
+    """
+    Returns the vasprun.xml or XDATCAR files of a run, which is either a list
+    of files, a file or a directory. The files of a directory and of its
+    subdirectories are sorted in natural order, e.g., run2 before run10.
+    """
+    if not isinstance(run, str):
+        return list(run)
+    if not os.path.isdir(run):
+        return [run]
+    for pattern in ["vasprun.xml*", "XDATCAR*"]:
+        files = glob.glob(os.path.join(run, pattern)) + glob.glob(os.path.join(run, "*", pattern))
+        if files:
+            return sorted(files, key=lambda f: [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", f)])
+    raise ValueError("No vasprun.xml or XDATCAR files found in {}".format(run))
+
+
+def _analyze_run(args):
+    """
+    Internal helper method for get_arrhenius_analysis to parse and analyze
+    the run at one temperature, timing both stages. Only the results of the
+    analyzer are returned, and the analyzer itself if return_analyzers, so
+    that the displacements are not sent back to the parent process.
+    """
+    temperature, run, specie, step_skip, time_step, return_analyzers, kwargs = args
+    filepaths = _get_run_files(run)
+    # The runs are parsed lazily while being analyzed, so the parse time is
+    # the time spent in their iterator.
+    parse_time = [0.0]
+    start = time.time()
+    if "XDATCAR" in os.path.basename(filepaths[0]):
+        if time_step is None:
+            raise ValueError("time_step is required to analyze XDATCAR files.")
+        # The time step of the trajectories is already multiplied by step_skip.
+        runs = _iter_timed(_iter_xdatcar_trajectories(filepaths, step_skip, time_step), parse_time)
+        analyzer = DiffusionAnalyzer.from_trajectory(runs, specie, temperature, **kwargs)
+    else:
+        runs = _iter_timed(_iter_vaspruns(filepaths, step_skip), parse_time)
+        analyzer = DiffusionAnalyzer.from_vaspruns(runs, specie, **kwargs)
+    result = {
+        "diffusivity": analyzer.diffusivity,
+        "diffusivity_std_dev": analyzer.diffusivity_std_dev,
+        "conductivity": analyzer.conductivity,
+        "conductivity_std_dev": analyzer.conductivity_std_dev,
+        "summary": analyzer.get_summary_dict(),
+        "structure": analyzer.structure,
+    }
+    if return_analyzers:
+        result["analyzer"] = analyzer
+    return temperature, result, parse_time[0], time.time() - start - parse_time[0]
+
+
+def get_arrhenius_analysis(
+    runs, specie, step_skip=10, time_step=None, ncores=None, new_temp=None, return_analyzers=False, **kwargs
+):
+    r"""
+    Parses and analyzes MD runs at several temperatures, in parallel, and
+    fits the diffusivities to the Arrhenius relation. This performs in a
+    single call the analysis of a conductor usually done by creating
+    DiffusionAnalyzers one temperature at a time and calling fit_arrhenius.
+
+    Args:
+        runs (dict): {temperature: run}, where a run is a directory or a list
+            of paths to the vasprun.xml or XDATCAR files of consecutive runs,
+            e.g., {600: "600K", 800: "800K"}. A directory is searched for
+            vasprun.xml files, or XDATCAR files if none are found, in itself
+            and its subdirectories. The temperatures are those of the fit. For
+            vasprun.xml files, the analyzers take the temperature from the
+            runs, for XDATCAR files from the keys.
+        specie (Element/Species): Species to calculate diffusivity for as a
+            String. E.g., "Li".
+        step_skip (int): Sampling frequency of the displacements (
+            time_step is multiplied by this number to get the real time
+            between measurements)
+        time_step (float): Time step between the frames of XDATCAR files, in
+            fs. Required for XDATCAR files only.
+        ncores (int): Number of processes analyzing temperatures at once.
+            Defaults to None, which means serial.
+        new_temp (float): Temperature to extrapolate the diffusivity and
+            conductivity to, e.g., 300 K.
+        return_analyzers (bool): Whether to return the DiffusionAnalyzers.
+            They hold the displacements of all steps, so only their summary
+            dicts are returned by default.
+        \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
+            Examples include smoothed, min_obs, avg_nsteps.
+
+    Returns:
+        A dict with the following keys:
+
+            - temperatures, diffusivities, diffusivity_std_devs,
+              conductivities, conductivity_std_devs: Lists sorted by
+              temperature.
+            - Ea, c, Ea_std_dev: Results of fit_arrhenius.
+            - extrapolated_diffusivity, extrapolated_conductivity: At
+              new_temp, if given.
+            - summaries: {temperature: summary dict of the analyzer}.
+            - analyzers: {temperature: DiffusionAnalyzer}, if
+              return_analyzers.
+            - timing: {"parse": {temperature: t}, "analysis": {temperature:
+              t}, "fit": t, "total": t}, in s. The total time is the wall
+              time, shorter than the sum of the stages with ncores.
+    """
+    start = time.time()
+    args = [(t, run, specie, step_skip, time_step, return_analyzers, kwargs) for t, run in runs.items()]
+    if ncores is not None and len(args) > 1:
+        with multiprocessing.Pool(min(ncores, len(args))) as p:
+            results = list(p.imap_unordered(_analyze_run, args))
+    else:
+        results = [_analyze_run(a) for a in args]
+    results = sorted(results, key=lambda r: r[0])
+
+    fit_start = time.time()
+    temperatures = [r[0] for r in results]
+    analyses = [r[1] for r in results]
+    diffusivities = [a["diffusivity"] for a in analyses]
+    ea, c, ea_std_dev = fit_arrhenius(temperatures, diffusivities)
+    d = {
+        "temperatures": temperatures,
+        "diffusivities": diffusivities,
+        "diffusivity_std_devs": [a["diffusivity_std_dev"] for a in analyses],
+        "conductivities": [a["conductivity"] for a in analyses],
+        "conductivity_std_devs": [a["conductivity_std_dev"] for a in analyses],
+        "Ea": ea,
+        "c": c,
+        "Ea_std_dev": ea_std_dev,
+        "summaries": {t: a["summary"] for t, a in zip(temperatures, analyses)},
+    }
+    if new_temp is not None:
+        d["extrapolated_diffusivity"] = get_extrapolated_diffusivity(temperatures, diffusivities, new_temp)
+        d["extrapolated_conductivity"] = get_extrapolated_conductivity(
+            temperatures, diffusivities, new_temp, analyses[0]["structure"], specie
+        )
+    if return_analyzers:
+        d["analyzers"] = {t: a["analyzer"] for t, a in zip(temperatures, analyses)}
+    d["timing"] = {
+        "parse": {r[0]: r[2] for r in results},
+        "analysis": {r[0]: r[3] for r in results},
+        "fit": time.time() - fit_start,
+        "total": time.time() - start,
+    }
+    return d
+
+
 def get_arrhenius_plot(temps, diffusivities, diffusivity_errors=None, **kwargs):
     r"""
     Returns an Arrhenius plot.
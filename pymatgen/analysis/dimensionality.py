@@ -27,7 +27,7 @@ from collections import defaultdict
 import numpy as np
 from networkx.readwrite import json_graph
 
-from pymatgen.analysis.graphs import MoleculeGraph, StructureGraph
+from pymatgen.analysis.graphs import MoleculeGraph, SparseStructureGraph, StructureGraph
 from pymatgen.analysis.local_env import JmolNN
 from pymatgen.analysis.structure_analyzer import get_max_bond_lengths
 from pymatgen.core.lattice import get_integer_index
@@ -62,11 +62,14 @@ def get_dimensionality_larsen(bonded_structure):
     Args:
         bonded_structure (StructureGraph): A structure with bonds, represented
             as a pymatgen structure graph. For example, generated using the
-            CrystalNN.get_bonded_structure() method.
+            CrystalNN.get_bonded_structure() method. A SparseStructureGraph
+            can also be used, which is much faster for large structures.
 
     Returns:
         (int): The dimensionality of the structure.
     """
+    if isinstance(bonded_structure, SparseStructureGraph):
+        return bonded_structure.get_dimensionality()
     return max([c["dimensionality"] for c in get_structure_components(bonded_structure)])
 
 
@@ -7,7 +7,9 @@ This module provides classes for calculating the ewald sum of a structure.
 """
 
 import bisect
-from copy import copy, deepcopy
+import copy
+import itertools
+import time
 from datetime import datetime
 from math import log, pi, sqrt
 from typing import Dict
@@ -19,6 +21,7 @@ from monty.json import MSONable
 from scipy.special import comb, erfc
 
 from pymatgen.core.structure import Structure
+from pymatgen.util.parallel import StatefulPool
 
 __author__ = "Shyue Ping Ong, William Davidson Richard"
 __copyright__ = "Copyright 2011, The Materials Project"
@@ -62,6 +65,9 @@ class EwaldSummation(MSONable):
         acc_factor=12.0,
         w=1 / sqrt(2),
         compute_forces=False,
+        energy_only=False,
+        block_size=1000,
+        nthreads=None,
     ):
         """
         Initializes and calculates the Ewald sum. Default convergence
@@ -91,11 +97,23 @@ class EwaldSummation(MSONable):
                 cutoffs are set to None.
             compute_forces (bool): Whether to compute forces. False by
                 default since it is usually not needed.
+            energy_only (bool): Whether to only compute the energies, without
+                the N x N energy matrices, which are then unavailable. This
+                is much cheaper in memory for large structures, e.g., to rank
+                orderings of supercells with thousands of sites.
+            block_size (int): Number of sites, or of reciprocal lattice
+                vectors, processed at once. Memory usage scales with
+                block_size times the number of sites.
+            nthreads (int): Number of threads used in the real space sum.
+                Defaults to None, i.e., serial.
         """
         self._s = structure
         self._charged = abs(structure.charge) > 1e-8
         self._vol = structure.volume
         self._compute_forces = compute_forces
+        self._energy_only = energy_only
+        self._block_size = block_size
+        self._nthreads = nthreads
 
         self._acc_factor = acc_factor
         # set screening length
@@ -133,11 +151,14 @@ class EwaldSummation(MSONable):
         Gives total ewald energy for certain sites being removed, i.e. zeroed
         out.
         """
-        total_energy_matrix = self.total_energy_matrix.copy()
-        for i in removed_indices:
-            total_energy_matrix[i, :] = 0
-            total_energy_matrix[:, i] = 0
-        return sum(sum(total_energy_matrix))
+        total_energy_matrix = self.total_energy_matrix
+        removed_indices = np.unique(np.array(removed_indices, dtype=int))
+        return (
+            np.sum(total_energy_matrix)
+            - np.sum(total_energy_matrix[removed_indices])
+            - np.sum(total_energy_matrix[:, removed_indices])
+            + np.sum(total_energy_matrix[np.ix_(removed_indices, removed_indices)])
+        )
 
     def compute_sub_structure(self, sub_structure, tol=1e-3):
         """
@@ -192,6 +213,8 @@ class EwaldSummation(MSONable):
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
+        if self._energy_only:
+            return self._recip
         return sum(sum(self._recip))
 
     @property
@@ -201,6 +224,7 @@ class EwaldSummation(MSONable):
         corresponds to the interaction energy between site i and site j in
         reciprocal space.
         """
+        self._check_matrices_available()
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
@@ -214,6 +238,8 @@ class EwaldSummation(MSONable):
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
+        if self._energy_only:
+            return self._real
         return sum(sum(self._real))
 
     @property
@@ -222,6 +248,7 @@ class EwaldSummation(MSONable):
         The real space energy matrix. Each matrix element (i, j) corresponds to
         the interaction energy between site i and site j in real space.
         """
+        self._check_matrices_available()
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
@@ -256,6 +283,8 @@ class EwaldSummation(MSONable):
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
+        if self._energy_only:
+            return self._recip + self._real + sum(self._point) + self._charged_cell_energy
         return sum(sum(self._recip)) + sum(sum(self._real)) + sum(self._point) + self._charged_cell_energy
 
     @property
@@ -267,6 +296,7 @@ class EwaldSummation(MSONable):
         Note that this does not include the charged-cell energy, which is only important
         when the simulation cell is not charge balanced.
         """
+        self._check_matrices_available()
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
@@ -297,6 +327,7 @@ class EwaldSummation(MSONable):
             site_index (int): Index of site
         ReturnS:
             (float) - Energy of that site"""
+        self._check_matrices_available()
         if not self._initialized:
             self._calc_ewald_terms()
             self._initialized = True
@@ -305,6 +336,10 @@ class EwaldSummation(MSONable):
             warn("Per atom energies for charged structures not supported in EwaldSummation")
         return np.sum(self._recip[:, site_index]) + np.sum(self._real[:, site_index]) + self._point[site_index]
 
+    def _check_matrices_available(self):
+        if self._energy_only:
+            raise AttributeError("Energy matrices are not available with energy_only=True!")
+
     def _calc_ewald_terms(self):
         """
         Calculates and sets all ewald terms (point, real and reciprocal)
@@ -322,61 +357,75 @@ class EwaldSummation(MSONable):
         S(G) = sum_{k=1,N} q_k exp(-i G.r_k)
         S(G)S(-G) = |S(G)|**2
 
-        This method is heavily vectorized to utilize numpy's C backend for
-        speed.
+        The G vectors are processed in blocks, each contributing
+        C^T W C + S^T W S to the energy matrix, where C and S are the cosines
+        and sines of G.r for the block and W the diagonal matrix of the
+        weights exp(-(G.G/4/eta))/(G.G), so that the summation is done with
+        matrix products. The antisymmetric sin(G.(r_j - r_i)) terms cancel
+        between G and -G and are omitted. In energy only mode, only the
+        structure factors are computed.
         """
         numsites = self._s.num_sites
         prefactor = 2 * pi / self._vol
-        erecip = np.zeros((numsites, numsites), dtype=np.float_)
+        erecip = None if self._energy_only else np.zeros((numsites, numsites), dtype=np.float_)
+        energy = 0
         forces = np.zeros((numsites, 3), dtype=np.float_)
         coords = self._coords
         rcp_latt = self._s.lattice.reciprocal_lattice
-        recip_nn = rcp_latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0], self._gmax)
-
-        frac_coords = [fcoords for (fcoords, dist, i, img) in recip_nn if dist != 0]
+        recip_fcoords, dists, _, _ = rcp_latt.get_points_in_sphere(
+            [[0, 0, 0]], [0, 0, 0], self._gmax, zip_results=False
+        )
 
-        gs = rcp_latt.get_cartesian_coords(frac_coords)
+        gs = rcp_latt.get_cartesian_coords(np.reshape(recip_fcoords, (-1, 3))[np.array(dists) != 0])
         g2s = np.sum(gs ** 2, 1)
         expvals = np.exp(-g2s / (4 * self._eta))
-        grs = np.sum(gs[:, None] * coords[None, :], 2)
+        weights = expvals / g2s
 
         oxistates = np.array(self._oxi_states)
 
-        # create array where q_2[i,j] is qi * qj
-        qiqj = oxistates[None, :] * oxistates[:, None]
+        for i in range(0, len(gs), self._block_size):
+            grs = np.dot(gs[i : i + self._block_size], coords.T)
+            coss, sins = np.cos(grs), np.sin(grs)
+            w = weights[i : i + self._block_size, None]
 
-        # calculate the structure factor
-        sreals = np.sum(oxistates[None, :] * np.cos(grs), 1)
-        simags = np.sum(oxistates[None, :] * np.sin(grs), 1)
+            # calculate the structure factor
+            sreals = np.dot(coss, oxistates)
+            simags = np.dot(sins, oxistates)
 
-        for g, g2, gr, expval, sreal, simag in zip(gs, g2s, grs, expvals, sreals, simags):
-
-            # Uses the identity sin(x)+cos(x) = 2**0.5 sin(x + pi/4)
-            m = (gr[None, :] + pi / 4) - gr[:, None]
-            np.sin(m, m)
-            m *= expval / g2
-
-            erecip += m
+            if erecip is not None:
+                erecip += np.dot((coss * w).T, coss) + np.dot((sins * w).T, sins)
+            else:
+                energy += np.sum(w[:, 0] * (sreals ** 2 + simags ** 2))
 
             if self._compute_forces:
-                pref = 2 * expval / g2 * oxistates
-                factor = prefactor * pref * (sreal * np.sin(gr) - simag * np.cos(gr))
-
-                forces += factor[:, None] * g[None, :]
+                factor = 2 * prefactor * w * oxistates[None, :] * (sreals[:, None] * sins - simags[:, None] * coss)
+                forces += np.dot(factor.T, gs[i : i + self._block_size])
 
         forces *= EwaldSummation.CONV_FACT
-        erecip *= prefactor * EwaldSummation.CONV_FACT * qiqj * 2 ** 0.5
+        if erecip is None:
+            return energy * prefactor * EwaldSummation.CONV_FACT, forces
+
+        # create array where q_2[i,j] is qi * qj
+        qiqj = oxistates[None, :] * oxistates[:, None]
+        erecip *= prefactor * EwaldSummation.CONV_FACT * qiqj
         return erecip, forces
 
     def _calc_real_and_point(self):
         """
         Determines the self energy -(eta/pi)**(1/2) * sum_{i=1}^{N} q_i**2
+
+        The real space pairs are found with a linked-cell search, one block of
+        sites at a time.
         """
+        # pylint: disable=C0415
+        from pymatgen.optimization.neighbor_list import find_points_in_cells
+
         fcoords = self._s.frac_coords
         forcepf = 2.0 * self._sqrt_eta / sqrt(pi)
         coords = self._coords
         numsites = self._s.num_sites
-        ereal = np.empty((numsites, numsites), dtype=np.float_)
+        ereal = None if self._energy_only else np.zeros((numsites, numsites), dtype=np.float_)
+        energy = 0
 
         forces = np.zeros((numsites, 3), dtype=np.float_)
 
@@ -384,38 +433,53 @@ class EwaldSummation(MSONable):
 
         epoint = -(qs ** 2) * sqrt(self._eta / pi)
 
-        for i in range(numsites):
-            nfcoords, rij, js, _ = self._s.lattice.get_points_in_sphere(
-                fcoords, coords[i], self._rmax, zip_results=False
+        for start in range(0, numsites, self._block_size):
+            centers = np.arange(start, min(start + self._block_size, numsites))
+            cinds, js, images, rij = find_points_in_cells(
+                self._s.lattice.matrix,
+                fcoords,
+                self._rmax,
+                center_frac_coords=fcoords[centers],
+                exclude_self=False,
+                nthreads=self._nthreads,
             )
 
             # remove the rii term
             inds = rij > 1e-8
+            cinds = cinds[inds]
             js = js[inds]
             rij = rij[inds]
-            nfcoords = nfcoords[inds]
+            images = images[inds]
 
-            qi = qs[i]
+            qi = qs[centers][cinds]
             qj = qs[js]
 
             erfcval = erfc(self._sqrt_eta * rij)
             new_ereals = erfcval * qi * qj / rij
 
-            # insert new_ereals
-            for k in range(numsites):
-                ereal[k, i] = np.sum(new_ereals[js == k])
+            # insert new_ereals, ereal[k, i] being the sum over the images
+            # of site k around site i
+            if ereal is not None:
+                ereal[:, centers] = (
+                    np.bincount(cinds * numsites + js, weights=new_ereals, minlength=len(centers) * numsites)
+                    .reshape((len(centers), numsites))
+                    .T
+                )
+            else:
+                energy += np.sum(new_ereals)
 
             if self._compute_forces:
-                nccoords = self._s.lattice.get_cartesian_coords(nfcoords)
+                nccoords = self._s.lattice.get_cartesian_coords(fcoords[js] + images)
 
                 fijpf = qj / rij ** 3 * (erfcval + forcepf * rij * np.exp(-self._eta * rij ** 2))
-                forces[i] += np.sum(
-                    np.expand_dims(fijpf, 1) * (np.array([coords[i]]) - nccoords) * qi * EwaldSummation.CONV_FACT,
-                    axis=0,
-                )
+                fij = np.expand_dims(fijpf * qi, 1) * (coords[centers][cinds] - nccoords) * EwaldSummation.CONV_FACT
+                for k in range(3):
+                    forces[centers, k] += np.bincount(cinds, weights=fij[:, k], minlength=len(centers))
 
-        ereal *= 0.5 * EwaldSummation.CONV_FACT
         epoint *= EwaldSummation.CONV_FACT
+        if ereal is None:
+            return 0.5 * EwaldSummation.CONV_FACT * energy, epoint, forces
+        ereal *= 0.5 * EwaldSummation.CONV_FACT
         return ereal, epoint, forces
 
     @property
@@ -458,12 +522,13 @@ class EwaldSummation(MSONable):
             "@class": self.__class__.__name__,
             "structure": self._s.as_dict(),
             "compute_forces": self._compute_forces,
+            "energy_only": self._energy_only,
             "eta": self._eta,
             "acc_factor": self._acc_factor,
             "real_space_cut": self._rmax,
             "recip_space_cut": self._gmax,
-            "_recip": None if self._recip is None else self._recip.tolist(),
-            "_real": None if self._real is None else self._real.tolist(),
+            "_recip": None if self._recip is None else np.array(self._recip).tolist(),
+            "_real": None if self._real is None else np.array(self._real).tolist(),
             "_point": None if self._point is None else self._point.tolist(),
             "_forces": None if self._forces is None else self._forces.tolist(),
         }
@@ -482,12 +547,16 @@ class EwaldSummation(MSONable):
             eta=d["eta"],
             acc_factor=d["acc_factor"],
             compute_forces=d["compute_forces"],
+            energy_only=d.get("energy_only", False),
         )
 
         # set previously computed private attributes
         if d["_recip"] is not None:
-            summation._recip = np.array(d["_recip"])
-            summation._real = np.array(d["_real"])
+            if summation._energy_only:
+                summation._recip, summation._real = d["_recip"], d["_real"]
+            else:
+                summation._recip = np.array(d["_recip"])
+                summation._real = np.array(d["_real"])
             summation._point = np.array(d["_point"])
             summation._forces = np.array(d["_forces"])
             summation._initialized = True
@@ -495,6 +564,157 @@ class EwaldSummation(MSONable):
         return summation
 
 
+class EwaldEnergyUpdater:
+    """
+    Incremental Ewald energies of the orderings of a structure, i.e., of the
+    structure with the charges of its sites scaled by factors, e.g., 0 for
+    removed sites or the ratio of the oxidation states for substituted sites.
+
+    The energy is the quadratic form E = s.M.s of the scale factors s and
+    the Ewald energy matrix M. Keeping the potentials M.s up to date, the
+    change of energy for a move of k sites, e.g., a swap or a removal, is
+    computed in O(k**2) without touching the rest of the matrix, and a move
+    is applied in O(kN). This makes it suitable as the kernel of Monte Carlo
+    simulations or of rankings of many candidate orderings::
+
+        updater = EwaldEnergyUpdater(EwaldSummation(s).total_energy_matrix)
+        de = updater.get_swap_energies(i, j)
+        if accept(de):
+            updater.apply_move([i, j], updater.scales[[j, i]])
+
+    As with EwaldMinimizer, the energies do not include the charged cell
+    energy of non charge-balanced orderings.
+    """
+
+    def __init__(self, matrix, scales=None):
+        """
+        Args:
+            matrix (np.ndarray): Ewald energy matrix of the structure with all
+                sites at full charge, e.g., total_energy_matrix of an
+                EwaldSummation. It is symmetrized.
+            scales ([float]): Initial scale factors of the charges of the
+                sites. Defaults to 1 for all sites.
+        """
+        matrix = np.array(matrix, dtype=np.float_)
+        self._matrix = (matrix + matrix.T) / 2
+        self._diag = np.diag(self._matrix).copy()
+        self._scales = np.ones(len(matrix)) if scales is None else np.array(scales, dtype=np.float_)
+        self._potentials = np.dot(self._matrix, self._scales)
+        self._energy = np.dot(self._scales, self._potentials)
+
+    @property
+    def energy(self):
+        """
+        Ewald energy of the current ordering.
+        """
+        return self._energy
+
+    @property
+    def scales(self):
+        """
+        Scale factors of the charges of the sites in the current ordering.
+        """
+        return self._scales.copy()
+
+    def get_move_energies(self, indices, scales):
+        """
+        Changes of energy for moves of the current ordering, each setting the
+        scale factors of some sites to new values.
+
+        Args:
+            indices (np.ndarray): Indices of the sites changed by a move, of
+                shape (k,), or by many moves, of shape (nmoves, k). The
+                indices of a move must be distinct.
+            scales (np.ndarray): New scale factors of these sites, with the
+                same shape as indices.
+
+        Returns:
+            Change of energy of the move, or array of the changes of energy
+            of the moves.
+        """
+        indices = np.array(indices, dtype=int)
+        single = indices.ndim == 1
+        indices = np.reshape(indices, (-1, indices.shape[-1]))
+        deltas = np.reshape(np.array(scales, dtype=np.float_), indices.shape) - self._scales[indices]
+        energies = 2 * np.sum(deltas * self._potentials[indices], 1) + np.einsum(
+            "ni,nij,nj->n", deltas, self._matrix[indices[:, :, None], indices[:, None, :]], deltas
+        )
+        return energies[0] if single else energies
+
+    def get_swap_energies(self, i, j):
+        """
+        Changes of energy for swapping the scale factors of pairs of sites.
+
+        Args:
+            i (int or np.ndarray): Indices of the first sites.
+            j (int or np.ndarray): Indices of the second sites.
+
+        Returns:
+            Change(s) of energy, with the shape of i and j.
+        """
+        i, j = np.array(i, dtype=int), np.array(j, dtype=int)
+        deltas = self._scales[j] - self._scales[i]
+        return 2 * deltas * (self._potentials[i] - self._potentials[j]) + deltas ** 2 * (
+            self._diag[i] + self._diag[j] - 2 * self._matrix[i, j]
+        )
+
+    def get_removal_energies(self, indices):
+        """
+        Changes of energy for removing sites, i.e., setting their scale
+        factors to 0.
+
+        Args:
+            indices (np.ndarray): Indices of the sites removed by a move, of
+                shape (k,), or by many moves, of shape (nmoves, k).
+
+        Returns:
+            Change of energy of the move, or array of the changes of energy
+            of the moves.
+        """
+        indices = np.array(indices, dtype=int)
+        return self.get_move_energies(indices, np.zeros(indices.shape))
+
+    def apply_move(self, indices, scales):
+        """
+        Set the scale factors of some sites, updating the energy and the
+        potentials in O(kN).
+
+        Args:
+            indices ([int]): Distinct indices of the k sites to change.
+            scales ([float]): New scale factors of these sites.
+
+        Returns:
+            Change of energy.
+        """
+        indices = np.array(indices, dtype=int)
+        scales = np.array(scales, dtype=np.float_)
+        energy = self.get_move_energies(indices, scales)
+        self._potentials += np.dot(self._matrix[:, indices], scales - self._scales[indices])
+        self._scales[indices] = scales
+        self._energy += energy
+        return energy
+
+    def get_energies(self, scales, chunk_size=1000):
+        """
+        Energies of many orderings at once.
+
+        Args:
+            scales (np.ndarray): Scale factors of the sites of the orderings,
+                of shape (norderings, nsites).
+            chunk_size (int): Number of orderings evaluated at once. Memory
+                usage scales with chunk_size times the number of sites.
+
+        Returns:
+            Array of the energies of the orderings.
+        """
+        scales = np.reshape(np.array(scales, dtype=np.float_), (-1, len(self._matrix)))
+        energies = np.empty(len(scales))
+        for i in range(0, len(scales), chunk_size):
+            chunk = scales[i : i + chunk_size]
+            energies[i : i + chunk_size] = np.sum(np.dot(chunk, self._matrix) * chunk, 1)
+        return energies
+
+
 class EwaldMinimizer:
     """
     This class determines the manipulations that will minimize an ewald matrix,
@@ -510,6 +730,17 @@ class EwaldMinimizer:
     An alternative (possibly more intuitive) interface to this class is the
     order disordered structure transformation.
 
+    The search is a depth-first branch and bound over the sites, done with an
+    explicit stack so that it is not limited by the recursion depth. The
+    matrix is manipulated in place, with the rows overwritten by a
+    manipulation saved to undo it when backtracking, so that memory scales
+    with the depth of the search times the number of sites instead of the
+    size of the matrix. With ncpus, the top levels of the search tree are
+    expanded with increasing depth until there are enough subtrees, which
+    are then searched in parallel processes sharing the best bound found so
+    far. The search can be limited in time and number of nodes, in which case
+    the best orderings found within the budget are returned.
+
     Author - Will Richards
     """
 
@@ -520,11 +751,16 @@ class EwaldMinimizer:
     """
     ALGO_TIME_LIMIT: Slowly increases the speed (with the cost of decreasing
     accuracy) as the minimizer runs. Attempts to limit the run time to
-    approximately 30 minutes.
+    approximately 30 minutes, or time_limit if it is set.
     """
     ALGO_TIME_LIMIT = 3
 
-    def __init__(self, matrix, m_list, num_to_return=1, algo=ALGO_FAST):
+    # Operations of the search stack
+    _VISIT = 0
+    _UNDO = 1
+    _RESTORE = 2
+
+    def __init__(self, matrix, m_list, num_to_return=1, algo=ALGO_FAST, ncpus=None, time_limit=None, max_nodes=None):
         """
         Args:
             matrix: A matrix of the ewald sum interaction energies. This is stored
@@ -534,21 +770,29 @@ class EwaldMinimizer:
                 (multiplication fraction, number_of_indices, indices, species)
                 These are sorted such that the first manipulation contains the
                 most permutations. this is actually evaluated last in the
-                recursion since I'm using pop.
+                search.
             num_to_return: The minimizer will find the number_returned lowest
                 energy structures. This is likely to return a number of duplicate
                 structures so it may be necessary to overestimate and then
                 remove the duplicates later. (duplicate checking in this
                 process is extremely expensive)
+            algo: Algorithm to use, one of the EwaldMinimizer.ALGO_*. ALGO_FAST
+                and ALGO_COMPLETE are exact, ALGO_COMPLETE checking the lower
+                bound of the energy at every node of the search tree.
+                ALGO_BEST_FIRST stops as soon as num_to_return orderings are
+                found.
+            ncpus (int): Number of processes to search with. Defaults to None,
+                i.e., serial.
+            time_limit (float): Maximum time of the search in seconds.
+                Defaults to None, i.e., no limit.
+            max_nodes (int): Maximum number of nodes of the search tree to
+                visit. In parallel, it is approximate. Defaults to None, i.e.,
+                no limit.
         """
         # Setup and checking of inputs
-        self._matrix = copy(matrix)
+        matrix = np.array(matrix, dtype=np.float_)
         # Make the matrix diagonally symmetric (so matrix[i,:] == matrix[:,j])
-        for i in range(len(self._matrix)):
-            for j in range(i, len(self._matrix)):
-                value = (self._matrix[i, j] + self._matrix[j, i]) / 2
-                self._matrix[i, j] = value
-                self._matrix[j, i] = value
+        self._matrix = (matrix + matrix.T) / 2
 
         # sort the m_list based on number of permutations
         self._m_list = sorted(m_list, key=lambda x: comb(len(x[2]), x[1]), reverse=True)
@@ -559,29 +803,66 @@ class EwaldMinimizer:
         self._current_minimum = float("inf")
         self._num_to_return = num_to_return
         self._algo = algo
-        if algo == EwaldMinimizer.ALGO_COMPLETE:
-            raise NotImplementedError("Complete algo not yet implemented for " "EwaldMinimizer")
+        self._ncpus = ncpus
+        self._time_limit = time_limit
+        self._max_nodes = max_nodes
 
         self._output_lists = []
-        # Tag that the recurse function looks at at each level. If a method
-        # sets this to true it breaks the recursion and stops the search.
+        # Tag that the search looks at at each node. If a method sets this to
+        # true it stops the search.
         self._finished = False
+        self._nodes = 0
+        self._complete = True
 
         self._start_time = datetime.utcnow()
+        self._deadline = None if time_limit is None else time.time() + time_limit
 
         self.minimize_matrix()
 
-        self._best_m_list = self._output_lists[0][1]
-        self._minimized_sum = self._output_lists[0][0]
+        if self._output_lists:
+            self._best_m_list = self._output_lists[0][1]
+            self._minimized_sum = self._output_lists[0][0]
+        else:
+            self._best_m_list = None
+            self._minimized_sum = float("inf")
 
     def minimize_matrix(self):
         """
         This method finds and returns the permutations that produce the lowest
-        ewald sum calls recursive function to iterate through permutations
+        ewald sum, searching the tree of permutations serially or in parallel.
         """
-        if self._algo == EwaldMinimizer.ALGO_FAST or self._algo == EwaldMinimizer.ALGO_BEST_FIRST:
-            return self._recurse(self._matrix, self._m_list, set(range(len(self._matrix))))
-        return None
+        if not self._ncpus or self._ncpus <= 1:
+            self._search()
+            return
+
+        # Iterative deepening of the top levels of the tree until there are
+        # enough subtrees to balance the load between the processes.
+        # Only the nodes of the last pass are counted.
+        for split_depth in itertools.count(1):
+            self._output_lists = []
+            self._current_minimum = float("inf")
+            self._finished = False
+            self._nodes = 0
+            paths = self._search(split_depth=split_depth)
+            if not paths or len(paths) >= 4 * self._ncpus or self._finished or not self._complete:
+                break
+
+        paths.reverse()
+        with StatefulPool(_search_minimizer_subtree, self, ncores=self._ncpus, max_pending=self._ncpus) as pool:
+            while paths or pool:
+                while paths and not pool.full and not self._finished and self._complete:
+                    max_nodes = None if self._max_nodes is None else self._max_nodes - self._nodes
+                    pool.submit(paths.pop(), self._current_minimum, max_nodes)
+                if not pool:
+                    break
+                output_lists, nodes, complete = pool.get()
+                for matrix_sum, m_list in output_lists:
+                    if matrix_sum < self._current_minimum:
+                        self.add_m_list(matrix_sum, m_list)
+                self._nodes += nodes
+                self._complete &= complete
+        if paths and not self._finished:
+            self._complete = False
 
     def add_m_list(self, matrix_sum, m_list):
         """
@@ -599,7 +880,7 @@ class EwaldMinimizer:
         if len(self._output_lists) == self._num_to_return:
             self._current_minimum = self._output_lists[-1][0]
 
-    def best_case(self, matrix, m_list, indices_left):
+    def best_case(self, matrix, m_list, indices_left, matrix_sum=None, row_sums=None):
         """
         Computes a best case given a matrix and manipulation list.
 
@@ -610,6 +891,8 @@ class EwaldMinimizer:
                 species)] describing the manipulation
             indices: Set of indices which haven't had a permutation
                 performed on them.
+            matrix_sum: Sum of the matrix, if already known.
+            row_sums: Sums of the rows of the matrix, if already known.
         """
         m_indices = []
         fraction_list = []
@@ -619,7 +902,7 @@ class EwaldMinimizer:
 
         indices = list(indices_left.intersection(m_indices))
 
-        interaction_matrix = matrix[indices, :][:, indices]
+        interaction_matrix = matrix[np.ix_(indices, indices)]
 
         fractions = np.zeros(len(interaction_matrix)) + 1
         fractions[: len(fraction_list)] = fraction_list
@@ -627,7 +910,7 @@ class EwaldMinimizer:
 
         # Sum associated with each index (disregarding interactions between
         # indices)
-        sums = 2 * np.sum(matrix[indices], axis=1)
+        sums = 2 * (np.sum(matrix[indices], axis=1) if row_sums is None else row_sums[indices])
         sums = np.sort(sums)
 
         # Interaction corrections. Can be reduced to (1-x)(1-y) for x,y in
@@ -641,7 +924,7 @@ class EwaldMinimizer:
 
         if self._algo == self.ALGO_TIME_LIMIT:
             elapsed_time = datetime.utcnow() - self._start_time
-            speedup_parameter = elapsed_time.total_seconds() / 1800
+            speedup_parameter = min(elapsed_time.total_seconds() / (self._time_limit or 1800), 1)
             avg_int = np.sum(interaction_matrix, axis=None)
             avg_frac = np.average(np.outer(1 - fractions, 1 - fractions))
             average_correction = avg_int * avg_frac
@@ -650,12 +933,14 @@ class EwaldMinimizer:
                 1 - speedup_parameter
             )
 
-        best_case = np.sum(matrix) + np.inner(sums[::-1], fractions - 1) + interaction_correction
+        if matrix_sum is None:
+            matrix_sum = np.sum(matrix)
+        best_case = matrix_sum + np.inner(sums[::-1], fractions - 1) + interaction_correction
 
         return best_case
 
     @classmethod
-    def get_next_index(cls, matrix, manipulation, indices_left):
+    def get_next_index(cls, matrix, manipulation, indices_left, row_sums=None):
         """
         Returns an index that should have the most negative effect on the
         matrix sum
@@ -663,7 +948,7 @@ class EwaldMinimizer:
         # pylint: disable=E1126
         f = manipulation[0]
         indices = list(indices_left.intersection(manipulation[2]))
-        sums = np.sum(matrix[indices], axis=1)
+        sums = np.sum(matrix[indices], axis=1) if row_sums is None else row_sums[indices]
         if f < 1:
             next_index = indices[sums.argmax(axis=0)]
         else:
@@ -671,62 +956,136 @@ class EwaldMinimizer:
 
         return next_index
 
-    def _recurse(self, matrix, m_list, indices, output_m_list=[]):
+    def _get_state(self, path):
         """
-        This method recursively finds the minimal permutations using a binary
-        tree search strategy.
+        Returns the state of the search at a node of the tree, i.e., the
+        matrix, its row sums and sum, the manipulations with their remaining
+        numbers and candidate indices, and the indices left, given the path
+        from the root, a list of ("apply" or "exclude", index, manipulation
+        position) decisions.
+        """
+        m_list = [[m[0], m[1], set(m[2]), m[3]] for m in self._m_list]
+        matrix = self._matrix.copy()
+        row_sums = np.sum(matrix, axis=1)
+        matrix_sum = np.sum(row_sums)
+        indices = set(range(len(matrix)))
+        for decision, index, position in path:
+            if decision == "exclude":
+                m_list[position][2].remove(index)
+            else:
+                matrix_sum = self._apply(matrix, row_sums, matrix_sum, index, m_list[position][0])
+                m_list[position][1] -= 1
+                indices.remove(index)
+        return matrix, row_sums, matrix_sum, m_list, indices
 
-        Args:
-            matrix: The current matrix (with some permutations already
-                performed).
-            m_list: The list of permutations still to be performed
-            indices: Set of indices which haven't had a permutation
-                performed on them.
+    @staticmethod
+    def _apply(matrix, row_sums, matrix_sum, index, fraction):
         """
-        # check to see if we've found all the solutions that we need
-        if self._finished:
-            return
+        Multiplies the row and column of an index by a fraction in place,
+        updating the row sums, and returns the new sum of the matrix.
+        """
+        row = matrix[index].copy()
+        off_diagonal = row_sums[index] - row[index]
+        matrix[index, :] *= fraction
+        matrix[:, index] *= fraction
+        row_sums += (fraction - 1) * row
+        row_sums[index] = fraction * off_diagonal + fraction ** 2 * row[index]
+        return matrix_sum + 2 * (fraction - 1) * off_diagonal + (fraction ** 2 - 1) * row[index]
+
+    def _out_of_budget(self):
+        if self._max_nodes is not None and self._nodes >= self._max_nodes:
+            return True
+        return self._deadline is not None and time.time() > self._deadline
+
+    def _search(self, path=(), split_depth=None):
+        """
+        This method finds the minimal permutations below a node of the tree
+        using a binary tree search strategy.
 
-        # if we're done with the current manipulation, pop it off.
-        while m_list[-1][1] == 0:
-            m_list = copy(m_list)
-            m_list.pop()
+        Args:
+            path: Decisions from the root to the node. See _get_state.
+            split_depth (int): If not None, the nodes split_depth branchings
+                below the node are not searched, but their paths returned.
+
+        Returns:
+            Paths of the nodes at split_depth.
+        """
+        matrix, row_sums, matrix_sum, m_list, indices = self._get_state(path)
+        path = list(path)
+        output_m_list = [[index, m_list[position][3]] for decision, index, position in path if decision == "apply"]
+        split_paths = []
+        depth = 0
+
+        stack = [(self._VISIT,)]
+        while stack and not self._finished:
+            operation = stack.pop()
+            if operation[0] == self._UNDO:
+                _, index, position, row, old_row_sums, matrix_sum = operation
+                matrix[index, :] = row
+                matrix[:, index] = row
+                row_sums[:] = old_row_sums
+                m_list[position][1] += 1
+                indices.add(index)
+                output_m_list.pop()
+                path.pop()
+                continue
+            if operation[0] == self._RESTORE:
+                m_list[operation[2]][2].add(operation[1])
+                path.pop()
+                depth -= 1
+                continue
+
+            if self._out_of_budget():
+                self._complete = False
+                break
+            self._nodes += 1
+
+            # the current manipulation is the last one not done yet
+            position = len(m_list) - 1
+            while position >= 0 and m_list[position][1] == 0:
+                position -= 1
             # if there are no more manipulations left to do check the value
-            if not m_list:
-                matrix_sum = np.sum(matrix)
+            if position < 0:
                 if matrix_sum < self._current_minimum:
-                    self.add_m_list(matrix_sum, output_m_list)
-                return
-
-        # if we wont have enough indices left, return
-        if m_list[-1][1] > len(indices.intersection(m_list[-1][2])):
-            return
-
-        if len(m_list) == 1 or m_list[-1][1] > 1:
-            if self.best_case(matrix, m_list, indices) > self._current_minimum:
-                return
-
-        index = self.get_next_index(matrix, m_list[-1], indices)
-
-        m_list[-1][2].remove(index)
-
-        # Make the matrix and new m_list where we do the manipulation to the
-        # index that we just got
-        matrix2 = np.copy(matrix)
-        m_list2 = deepcopy(m_list)
-        output_m_list2 = copy(output_m_list)
-
-        matrix2[index, :] *= m_list[-1][0]
-        matrix2[:, index] *= m_list[-1][0]
-        output_m_list2.append([index, m_list[-1][3]])
-        indices2 = copy(indices)
-        indices2.remove(index)
-        m_list2[-1][1] -= 1
-
-        # recurse through both the modified and unmodified matrices
-
-        self._recurse(matrix2, m_list2, indices2, output_m_list2)
-        self._recurse(matrix, m_list, indices, output_m_list)
+                    self.add_m_list(matrix_sum, list(output_m_list))
+                continue
+
+            fraction, num, candidates, species = m_list[position]
+            # if we wont have enough indices left, return
+            if num > len(indices.intersection(candidates)):
+                continue
+
+            if split_depth is not None and depth == split_depth:
+                split_paths.append(list(path))
+                continue
+
+            if position == 0 or num > 1 or self._algo == self.ALGO_COMPLETE:
+                if (
+                    self.best_case(matrix, m_list[: position + 1], indices, matrix_sum, row_sums)
+                    > self._current_minimum
+                ):
+                    continue
+
+            index = self.get_next_index(matrix, m_list[position], indices, row_sums)
+
+            # Search the tree where we do the manipulation to the index that
+            # we just got, then the one where we do not, and restore the index
+            # as a candidate of the manipulation.
+            candidates.remove(index)
+            path.append(("exclude", index, position))
+            depth += 1
+            stack.append((self._RESTORE, index, position))
+            stack.append((self._VISIT,))
+            stack.append((self._UNDO, index, position, matrix[index].copy(), row_sums.copy(), matrix_sum))
+            stack.append((self._VISIT,))
+
+            matrix_sum = self._apply(matrix, row_sums, matrix_sum, index, fraction)
+            m_list[position][1] -= 1
+            indices.remove(index)
+            output_m_list.append([index, species])
+            path.append(("apply", index, position))
+
+        return split_paths
 
     @property
     def best_m_list(self):
@@ -749,6 +1108,39 @@ class EwaldMinimizer:
         """
         return self._output_lists
 
+    @property
+    def nodes(self):
+        """
+        Returns: Number of nodes of the search tree visited.
+        """
+        return self._nodes
+
+    @property
+    def complete(self):
+        """
+        Returns: Whether the search ran to completion, i.e., the output lists
+        are not only the best found within the time or node budget.
+        """
+        return self._complete
+
+
+def _search_minimizer_subtree(minimizer, path, current_minimum, max_nodes):
+    """
+    Internal helper method for EwaldMinimizer to search a subtree in a worker
+    process, given its path, the current minimum and the node budget. The
+    search is done by a copy of the minimizer, which shares its matrix and
+    manipulations, as the state of the search is rebuilt from the path.
+    """
+    minimizer = copy.copy(minimizer)
+    minimizer._output_lists = []
+    minimizer._current_minimum = current_minimum
+    minimizer._max_nodes = max_nodes
+    minimizer._nodes = 0
+    minimizer._complete = True
+    minimizer._finished = False
+    minimizer._search(path)
+    return minimizer._output_lists, minimizer._nodes, minimizer._complete
+
 
 def compute_average_oxidation_state(site):
     """
@@ -1565,6 +1565,712 @@ class StructureGraph(MSONable):
         return molecules
 
 
+class SparseStructureGraph(MSONable):
+    """
+    A compact alternative to StructureGraph for large structures, which
+    stores the edges as arrays of (from_index, to_index, to_jimage, weight)
+    rather than in a networkx MultiDiGraph with a dict per edge. Edges are
+    normalized in the same way as in StructureGraph, i.e., from_index <=
+    to_index and from_jimage is (0, 0, 0), and only edge weights are kept
+    as edge properties.
+
+    The adjacency of the sites is indexed in compressed sparse row (CSR)
+    form, so that supercells, connected components, the dimensionality of
+    the components and the molecules in a structure are obtained with array
+    operations, which scale to structures of ~10^5 sites. Use
+    from_structure_graph and to_structure_graph to convert from and to a
+    StructureGraph, e.g., to draw a graph or edit its nodes.
+    """
+
+    def __init__(
+        self,
+        structure,
+        from_index=None,
+        to_index=None,
+        to_jimage=None,
+        weight=None,
+        name="bonds",
+        edge_weight_name=None,
+        edge_weight_units=None,
+    ):
+        """
+        If constructing this class manually, use the `with_empty_graph`,
+        `with_edges` or `with_local_env_strategy` methods.
+
+        :param structure: a Structure object
+        :param from_index: indices of the sites edges connect from
+        :param to_index: indices of the sites edges connect to
+        :param to_jimage: lattice vectors of the periodic images of the
+            sites edges connect to, as an (n_edges, 3) array
+        :param weight: weights of edges, NaN if not defined
+        :param name (str): name of graph, e.g. "bonds"
+        :param edge_weight_name (str): name of edge weights
+        :param edge_weight_units (str): name of edge weight units
+        """
+        self.structure = structure
+        self._name = name
+        self._edge_weight_name = edge_weight_name
+        self._edge_weight_units = edge_weight_units
+        self.from_index = np.zeros(0, dtype=int)
+        self.to_index = np.zeros(0, dtype=int)
+        self.to_jimage = np.zeros((0, 3), dtype=int)
+        self.weight = np.zeros(0)
+        self._csr = None
+        if from_index is not None:
+            self.add_edges(from_index, to_index, to_jimage, weight=weight, warn_duplicates=False)
+
+    @classmethod
+    def with_empty_graph(cls, structure, name="bonds", edge_weight_name=None, edge_weight_units=None):
+        """
+        Constructor for SparseStructureGraph, returns a graph without
+        edges, see StructureGraph.with_empty_graph.
+
+        :param structure (Structure):
+        :param name (str): name of graph, e.g. "bonds"
+        :param edge_weight_name (str): name of edge weights,
+            e.g. "bond_length" or "exchange_constant"
+        :param edge_weight_units (str): name of edge weight units
+            e.g. "Å" or "eV"
+        :return (SparseStructureGraph):
+        """
+        if edge_weight_name and (edge_weight_units is None):
+            raise ValueError(
+                "Please specify units associated "
+                "with your edge weights. Can be "
+                "empty string if arbitrary or "
+                "dimensionless."
+            )
+        return cls(structure, name=name, edge_weight_name=edge_weight_name, edge_weight_units=edge_weight_units)
+
+    @classmethod
+    def with_edges(cls, structure, edges):
+        """
+        Constructor for SparseStructureGraph, using pre-defined edges, see
+        StructureGraph.with_edges. Edge properties other than the weight
+        are not stored.
+
+        :param structure: Structure object
+        :param edges: dict representing the edges (format:
+            {(from_index, to_index, from_image, to_image): props}, where
+            props is a dict that may include the weight, or None)
+        :return: SparseStructureGraph
+        """
+        sg = cls.with_empty_graph(structure, name="bonds", edge_weight_name="weight", edge_weight_units="")
+        try:
+            from_index, to_index, from_jimage, to_jimage = zip(*edges) if edges else ([], [], [], [])
+        except (TypeError, ValueError):
+            raise ValueError("Edges must be given as (from_index, to_index, from_image, to_image) tuples")
+        weight = [(props or {}).get("weight", np.nan) for props in edges.values()]
+        to_jimage = np.subtract(to_jimage, from_jimage).reshape(-1, 3)
+        sg.add_edges(from_index, to_index, to_jimage, weight=weight, warn_duplicates=False)
+        return sg
+
+    @classmethod
+    def with_local_env_strategy(cls, structure, strategy, weights=False):
+        """
+        Constructor for SparseStructureGraph, using a strategy from
+        :Class: `pymatgen.analysis.local_env`.
+
+        :param structure: Structure object
+        :param strategy: an instance of a
+            :Class: `pymatgen.analysis.local_env.NearNeighbors` object
+        :param weights: if True, use weights from local_env class
+            (consult relevant class for their meaning)
+        :return: SparseStructureGraph
+        """
+        if not strategy.structures_allowed:
+            raise ValueError(
+                "Chosen strategy is not designed for use with structures! " "Please choose another strategy."
+            )
+
+        all_nn_info = strategy.get_all_nn_info(structure)
+        from_index = np.repeat(np.arange(len(structure)), [len(nn_info) for nn_info in all_nn_info])
+        neighbors = [neighbor for nn_info in all_nn_info for neighbor in nn_info]
+        # local_env adds an edge in both directions for any one bond, only
+        # one of which is kept
+        return cls(
+            structure,
+            from_index,
+            [neighbor["site_index"] for neighbor in neighbors],
+            np.reshape([neighbor["image"] for neighbor in neighbors], (-1, 3)),
+            weight=[neighbor["weight"] for neighbor in neighbors] if weights else None,
+        )
+
+    @classmethod
+    def from_structure_graph(cls, structure_graph):
+        """
+        Converts a StructureGraph, keeping the edge weights only.
+
+        :param structure_graph: StructureGraph
+        :return: SparseStructureGraph
+        """
+        edges = list(structure_graph.graph.edges(data=True))
+        return cls(
+            structure_graph.structure,
+            [u for u, v, d in edges],
+            [v for u, v, d in edges],
+            np.reshape([d["to_jimage"] for u, v, d in edges], (-1, 3)),
+            weight=[d.get("weight", np.nan) for u, v, d in edges],
+            name=structure_graph.name,
+            edge_weight_name=structure_graph.edge_weight_name,
+            edge_weight_units=structure_graph.edge_weight_unit,
+        )
+
+    def to_structure_graph(self):
+        """
+        :return: StructureGraph with the same edges and edge weights
+        """
+        sg = StructureGraph.with_empty_graph(
+            self.structure,
+            name=self.name,
+            edge_weight_name=self.edge_weight_name,
+            edge_weight_units=self.edge_weight_unit,
+        )
+        for u, v, image, weight in zip(self.from_index, self.to_index, self.to_jimage, self.weight):
+            sg.add_edge(u, v, to_jimage=image, weight=None if np.isnan(weight) else weight, warn_duplicates=False)
+        return sg
+
+    @property
+    def name(self):
+        """
+        :return: Name of graph
+        """
+        return self._name
+
+    @property
+    def edge_weight_name(self):
+        """
+        :return: Name of the edge weight property of graph
+        """
+        return self._edge_weight_name
+
+    @property
+    def edge_weight_unit(self):
+        """
+        :return: Units of the edge weight property of graph
+        """
+        return self._edge_weight_units
+
+    @property
+    def num_edges(self):
+        """
+        :return: Number of edges of graph
+        """
+        return len(self.from_index)
+
+    def add_edges(self, from_index, to_index, to_jimage, weight=None, warn_duplicates=True):
+        """
+        Add edges to graph, with the from_jimages being (0, 0, 0).
+        Duplicates of existing edges or of one another are not added.
+
+        :param from_index: indices of sites connecting from
+        :param to_index: indices of sites connecting to
+        :param to_jimage: lattice vectors of periodic images of the sites
+            connecting to, as an (n_edges, 3) array
+        :param weight: weights of edges, NaN or None if not defined
+        :param warn_duplicates (bool): if True, will warn if trying to add
+            duplicate edges
+        :return:
+        """
+        from_index = np.asarray(from_index, dtype=int).reshape(-1)
+        to_index = np.asarray(to_index, dtype=int).reshape(-1)
+        to_jimage = np.asarray(to_jimage, dtype=int).reshape(-1, 3)
+        if weight is None:
+            weight = np.full(len(from_index), np.nan)
+        else:
+            # None becomes NaN
+            weight = np.array(weight, dtype=float).reshape(-1)
+        if not len(from_index) == len(to_index) == len(to_jimage) == len(weight):
+            raise ValueError("Indices, images and weights of edges must have the same length.")
+        if len(from_index) and (
+            min(from_index.min(), to_index.min()) < 0 or max(from_index.max(), to_index.max()) >= len(self.structure)
+        ):
+            raise ValueError(
+                "Edges cannot be added if nodes are not" " present in the graph. Please check your" " indices."
+            )
+
+        # normalize so that from_index <= to_index, as in StructureGraph
+        swap = to_index < from_index
+        from_index, to_index = np.where(swap, to_index, from_index), np.where(swap, from_index, to_index)
+        to_jimage = np.where(swap[:, None], -to_jimage, to_jimage)
+
+        from_index = np.concatenate([self.from_index, from_index])
+        to_index = np.concatenate([self.to_index, to_index])
+        to_jimage = np.concatenate([self.to_jimage, to_jimage])
+        weight = np.concatenate([self.weight, weight])
+
+        # keep the first of duplicate edges, in the order of addition
+        keys = np.column_stack([from_index, to_index, to_jimage])
+        _, unique = np.unique(keys, axis=0, return_index=True)
+        unique.sort()
+        if warn_duplicates and len(unique) < len(keys):
+            warnings.warn("Trying to add {} edges that already exist.".format(len(keys) - len(unique)))
+
+        self.from_index = from_index[unique]
+        self.to_index = to_index[unique]
+        self.to_jimage = to_jimage[unique]
+        self.weight = weight[unique]
+        self._csr = None
+
+    def add_edge(self, from_index, to_index, from_jimage=(0, 0, 0), to_jimage=None, weight=None, warn_duplicates=True):
+        """
+        Add edge to graph, see StructureGraph.add_edge. Unlike
+        StructureGraph, to_jimage must be given. Use add_edges to add many
+        edges at once.
+
+        :param from_index: index of site connecting from
+        :param to_index: index of site connecting to
+        :param from_jimage (tuple of ints): lattice vector of periodic
+            image, e.g. (1, 0, 0) for periodic image in +x direction
+        :param to_jimage (tuple of ints): lattice vector of image
+        :param weight (float): e.g. bond length
+        :param warn_duplicates (bool): if True, will warn if
+            trying to add duplicate edges (duplicate edges will not
+            be added in either case)
+        :return:
+        """
+        if to_jimage is None:
+            raise ValueError("Image must be supplied, to avoid ambiguity.")
+        self.add_edges(
+            [from_index],
+            [to_index],
+            [np.subtract(to_jimage, from_jimage)],
+            weight=[weight],
+            warn_duplicates=warn_duplicates,
+        )
+
+    def break_edge(self, from_index, to_index, to_jimage=None, allow_reverse=False):
+        """
+        Remove an edge from the graph, see StructureGraph.break_edge.
+
+        :param from_index: int
+        :param to_index: int
+        :param to_jimage: tuple
+        :param allow_reverse: If allow_reverse is True, the edge from
+            to_index to from_index is also considered.
+        :return:
+        """
+        if to_jimage is None:
+            raise ValueError("Image must be supplied, to avoid ambiguity.")
+        match = (self.from_index == from_index) & (self.to_index == to_index)
+        match &= np.all(self.to_jimage == to_jimage, axis=1)
+        if allow_reverse and not match.any():
+            match = (self.from_index == to_index) & (self.to_index == from_index)
+            match &= np.all(self.to_jimage == to_jimage, axis=1)
+        if not match.any():
+            raise ValueError(
+                "Edge cannot be broken between {} and {}; "
+                "no edge exists between those sites.".format(from_index, to_index)
+            )
+        keep = ~match
+        self.from_index = self.from_index[keep]
+        self.to_index = self.to_index[keep]
+        self.to_jimage = self.to_jimage[keep]
+        self.weight = self.weight[keep]
+        self._csr = None
+
+    def _get_csr(self):
+        """
+        Returns the adjacency of the sites in CSR form, as the row pointers
+        and, for both directions of every edge, the sites connected to, the
+        images of these sites and the edge indices.
+        """
+        if self._csr is None:
+            edges = np.arange(self.num_edges)
+            rows = np.concatenate([self.from_index, self.to_index])
+            cols = np.concatenate([self.to_index, self.from_index])
+            images = np.concatenate([self.to_jimage, -self.to_jimage])
+            order = np.argsort(rows, kind="stable")
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(self.structure)))])
+            self._csr = indptr, cols[order], images[order], np.concatenate([edges, edges])[order]
+        return self._csr
+
+    def get_connected_sites(self, n, jimage=(0, 0, 0)):
+        """
+        Returns a named tuple of neighbors of site n:
+        periodic_site, jimage, index, weight.
+        Index is the index of the corresponding site
+        in the original structure, weight can be
+        None if not defined.
+        :param n: index of Site in Structure
+        :param jimage: lattice vector of site
+        :return: list of ConnectedSite tuples,
+            sorted by closest first
+        """
+        indptr, cols, images, edges = self._get_csr()
+        connected_sites = {}
+        for v, image, edge in zip(*(a[indptr[n] : indptr[n + 1]] for a in (cols, images, edges))):
+            to_jimage = tuple(int(i) for i in image + jimage)
+            if (v, to_jimage) in connected_sites:
+                continue
+            site = PeriodicSite(
+                self.structure[v].species,
+                self.structure[v].frac_coords + to_jimage,
+                self.structure.lattice,
+                properties=self.structure[v].properties,
+            )
+            dist = self.structure[n].distance(self.structure[v], jimage=image)
+            weight = None if np.isnan(self.weight[edge]) else self.weight[edge]
+            connected_sites[(v, to_jimage)] = ConnectedSite(
+                site=site, jimage=to_jimage, index=v, weight=weight, dist=dist
+            )
+        return sorted(connected_sites.values(), key=lambda x: x.dist)
+
+    def get_coordination_of_site(self, n):
+        """
+        Returns the number of neighbors of site n, i.e., the number of
+        edges of site n, as in StructureGraph.
+        :param n: index of site
+        :return (int):
+        """
+        indptr = self._get_csr()[0]
+        number_of_self_loops = np.count_nonzero((self.from_index == n) & (self.to_index == n))
+        return int(indptr[n + 1] - indptr[n]) - number_of_self_loops
+
+    def get_coordination_numbers(self):
+        """
+        :return: array of the coordination numbers of all sites, see
+            get_coordination_of_site
+        """
+        nsites = len(self.structure)
+        loops = self.from_index == self.to_index
+        return (
+            np.bincount(self.from_index[~loops], minlength=nsites)
+            + np.bincount(self.to_index[~loops], minlength=nsites)
+            + np.bincount(self.from_index[loops], minlength=nsites)
+        )
+
+    def _get_components(self):
+        """
+        Finds the connected components of the graph and, for every site,
+        the image it is connected to the first site of its component in,
+        by propagating images along a breadth-first spanning forest.
+        Edges outside the forest close cycles, whose images span the
+        periodicity of the components (Larsen et al., Phys. Rev. Materials
+        3, 034003 (2019)).
+
+        :return: tuple of component labels of the sites, images of the
+            sites and dimensionalities of the components
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+        nsites = len(self.structure)
+        adjacency = coo_matrix(
+            (np.ones(self.num_edges), (self.from_index, self.to_index)), shape=(nsites, nsites)
+        ).tocsr()
+        ncomponents, labels = connected_components(adjacency, directed=False)
+
+        # a virtual root connected to the first site of every component
+        # turns the spanning forest into a single tree
+        roots = np.unique(labels, return_index=True)[1]
+        rows = np.concatenate([self.from_index, np.full(len(roots), nsites)])
+        cols = np.concatenate([self.to_index, roots])
+        tree = coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(nsites + 1, nsites + 1)).tocsr()
+        _, parents = breadth_first_order(tree, nsites, directed=False, return_predecessors=True)
+        parents = parents[:nsites]
+
+        # image of a site relative to its parent, via any edge joining them
+        keys = np.minimum(self.from_index, self.to_index) * nsites + np.maximum(self.from_index, self.to_index)
+        order = np.argsort(keys, kind="stable")
+        offsets = np.zeros((nsites, 3), dtype=int)
+        children = np.nonzero(parents != nsites)[0]
+        child_keys = np.minimum(children, parents[children]) * nsites + np.maximum(children, parents[children])
+        edges = order[np.searchsorted(keys[order], child_keys)]
+        forward = self.from_index[edges] == parents[children]
+        offsets[children] = np.where(forward[:, None], self.to_jimage[edges], -self.to_jimage[edges])
+
+        # accumulate the images along the paths to the roots by pointer
+        # jumping, offsets being relative to the ancestors
+        ancestors = np.where(parents == nsites, np.arange(nsites), parents)
+        while True:
+            offsets = offsets + offsets[ancestors]
+            if np.array_equal(ancestors[ancestors], ancestors):
+                break
+            ancestors = ancestors[ancestors]
+
+        cycles = offsets[self.from_index] + self.to_jimage - offsets[self.to_index]
+        dimensionalities = np.zeros(ncomponents, dtype=int)
+        periodic = np.any(cycles != 0, axis=1)
+        if np.any(periodic):
+            cycles = np.unique(np.column_stack([labels[self.from_index[periodic]], cycles[periodic]]), axis=0)
+            for label in np.unique(cycles[:, 0]):
+                dimensionalities[label] = np.linalg.matrix_rank(cycles[cycles[:, 0] == label, 1:])
+        return labels, offsets, dimensionalities
+
+    def _split_by_component(self, labels, values):
+        """
+        Splits values of sites or edges by the component labels given.
+        """
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=labels.max() + 1 if len(labels) else 0)
+        return np.split(values[order], np.cumsum(counts)[:-1])
+
+    def get_connected_components(self):
+        """
+        :return: list of arrays of the indices of the sites in each
+            connected component of the graph, i.e., each structure
+            component
+        """
+        labels = self._get_components()[0]
+        return self._split_by_component(labels, np.arange(len(self.structure)))
+
+    def get_component_dimensionalities(self):
+        """
+        Gets the dimensionality of every connected component, in the order
+        of get_connected_components, following the algorithm of Larsen et
+        al. also used by
+        :func:`pymatgen.analysis.dimensionality.get_structure_components`.
+
+        :return: array of dimensionalities
+        """
+        return self._get_components()[2]
+
+    def get_dimensionality(self):
+        """
+        :return (int): the dimensionality of the structure, i.e., the
+            highest dimensionality of its components
+        """
+        return int(self.get_component_dimensionalities().max(initial=0))
+
+    def get_subgraphs_as_molecules(self, use_weights=False):
+        """
+        Retrieve subgraphs as molecules, useful for extracting
+        molecules from periodic crystals, see
+        StructureGraph.get_subgraphs_as_molecules. Molecules are the
+        zero-dimensional components, with their sites in the images that
+        make them whole, so no supercell is needed.
+
+        :param use_weights (bool): If True, only treat subgraphs
+            as isomorphic if edges have the same weights.
+        :return: list of unique Molecules in Structure
+        """
+        labels, offsets, dimensionalities = self._get_components()
+        coords = self.structure.lattice.get_cartesian_coords(self.structure.frac_coords + offsets)
+        sites = self._split_by_component(labels, np.arange(len(self.structure)))
+        edges = self._split_by_component(labels[self.from_index], np.arange(self.num_edges))
+
+        def node_match(n1, n2):
+            return n1["specie"] == n2["specie"]
+
+        def edge_match(e1, e2):
+            if use_weights:
+                return e1["weight"] == e2["weight"] or (np.isnan(e1["weight"]) and np.isnan(e2["weight"]))
+            return True
+
+        # only subgraphs with the same composition and number of edges
+        # are tested for isomorphism
+        unique_subgraphs = defaultdict(list)
+        molecules = []
+        for label in np.nonzero(dimensionalities == 0)[0]:
+            species = [str(self.structure[n].specie) for n in sites[label]]
+            subgraph = nx.Graph()
+            for n, specie in zip(sites[label], species):
+                subgraph.add_node(n, specie=specie)
+            for e in edges[label]:
+                subgraph.add_edge(self.from_index[e], self.to_index[e], weight=self.weight[e])
+            candidates = unique_subgraphs[(tuple(sorted(species)), subgraph.number_of_edges())]
+            if any(nx.is_isomorphic(subgraph, g, node_match=node_match, edge_match=edge_match) for g in candidates):
+                continue
+            candidates.append(subgraph)
+
+            molecule = Molecule([self.structure[n].specie for n in sites[label]], coords[sites[label]])
+            molecules.append(molecule.get_centered_molecule())
+
+        return molecules
+
+    def __mul__(self, scaling_matrix):
+        """
+        Replicates the graph, creating a supercell, see
+        StructureGraph.__mul__. Edges are mapped to the supercell with
+        integer arithmetic on the lattice points, and sites are ordered by
+        lattice point first, as in StructureGraph.__mul__.
+
+        :param scaling_matrix: same as Structure.__mul__
+        :return: SparseStructureGraph
+        """
+        scale_matrix = np.array(scaling_matrix, np.int16)
+        if scale_matrix.shape != (3, 3):
+            scale_matrix = np.array(scale_matrix * np.eye(3), np.int16)
+        new_lattice = Lattice(np.dot(scale_matrix, self.structure.lattice.matrix))
+
+        # lattice points of the supercell, in terms of the original lattice
+        f_lat = lattice_points_in_supercell(scale_matrix)
+        t_lat = np.rint(np.dot(f_lat, scale_matrix)).astype(int)
+        ncells, nsites = len(t_lat), len(self.structure)
+
+        coords = self.structure.cart_coords[None, :, :] + self.structure.lattice.get_cartesian_coords(t_lat)[:, None]
+        new_structure = Structure(
+            new_lattice,
+            [site.species for site in self.structure] * ncells,
+            coords.reshape(-1, 3),
+            coords_are_cartesian=True,
+            site_properties={k: list(v) * ncells for k, v in self.structure.site_properties.items()} or None,
+        )
+
+        # the lattice point an edge ends in splits into an image of the
+        # supercell and a lattice point of the supercell
+        cells = np.repeat(np.arange(ncells), self.num_edges)
+        targets = t_lat[cells] + np.tile(self.to_jimage, (ncells, 1))
+        images = np.floor(np.round(np.dot(targets, np.linalg.inv(scale_matrix)), 8)).astype(int)
+        remainders = targets - np.dot(images, scale_matrix)
+
+        lowest = t_lat.min(axis=0)
+        span = t_lat.max(axis=0) - lowest + 1
+
+        def encode(points):
+            points = points - lowest
+            return (points[:, 0] * span[1] + points[:, 1]) * span[2] + points[:, 2]
+
+        keys = encode(t_lat)
+        order = np.argsort(keys)
+        to_cells = order[np.searchsorted(keys[order], encode(remainders))]
+
+        return self.__class__(
+            new_structure,
+            cells * nsites + np.tile(self.from_index, ncells),
+            to_cells * nsites + np.tile(self.to_index, ncells),
+            images,
+            weight=np.tile(self.weight, ncells),
+            name=self.name,
+            edge_weight_name=self.edge_weight_name,
+            edge_weight_units=self.edge_weight_unit,
+        )
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def _get_edges(self, other=None):
+        """
+        Returns the set of edges of other, or self, as (from_index,
+        to_index, to_jimage) tuples, with the site indices of other mapped
+        to those of the equal sites of self.
+        """
+        other = self if other is None else other
+        from_index, to_index, to_jimage = other.from_index, other.to_index, other.to_jimage
+        if other is not self:
+            # use a k-d tree to match the sites of other to those of self
+            dists, indices = KDTree(self.structure.cart_coords).query(other.structure.cart_coords)
+            if np.any(dists > 1e-5):
+                raise ValueError("Sites of other are not in Structure.")
+            from_index, to_index = indices[from_index], indices[to_index]
+            swap = to_index < from_index
+            from_index, to_index = np.where(swap, to_index, from_index), np.where(swap, from_index, to_index)
+            to_jimage = np.where(swap[:, None], -to_jimage, to_jimage)
+        return {(int(u), int(v), tuple(int(i) for i in image)) for u, v, image in zip(from_index, to_index, to_jimage)}
+
+    def __eq__(self, other):
+        """
+        Two SparseStructureGraphs are equal if they have equal Structures,
+        and have the same edges between Sites. Edge weights can be
+        different and graphs can still be considered equal.
+
+        :param other: SparseStructureGraph
+        :return (bool):
+        """
+        if not isinstance(other, SparseStructureGraph) or self.structure != other.structure:
+            return False
+        return self._get_edges() == self._get_edges(other)
+
+    def diff(self, other, strict=True):
+        """
+        Compares two SparseStructureGraphs, see StructureGraph.diff.
+
+        :param other: SparseStructureGraph
+        :param strict: if False, will compare bonds
+            from different Structures, with node indices
+            replaced by Species strings, will not count
+            number of occurrences of bonds
+        :return: dict with keys 'self', 'other', 'both' and 'dist'
+        """
+        if strict:
+            if self.structure != other.structure:
+                raise ValueError("Meaningless to compare StructureGraphs if " "corresponding Structures are different.")
+            edges = self._get_edges()
+            edges_other = self._get_edges(other)
+        else:
+            species = np.array([str(site.specie) for site in self.structure])
+            species_other = np.array([str(site.specie) for site in other.structure])
+            edges = set(zip(species[self.from_index], species[self.to_index]))
+            edges_other = set(zip(species_other[other.from_index], species_other[other.to_index]))
+
+        if len(edges) == 0 and len(edges_other) == 0:
+            jaccard_dist = 0  # by definition
+        else:
+            jaccard_dist = 1 - len(edges.intersection(edges_other)) / len(edges.union(edges_other))
+
+        return {
+            "self": edges - edges_other,
+            "other": edges_other - edges,
+            "both": edges.intersection(edges_other),
+            "dist": jaccard_dist,
+        }
+
+    def __len__(self):
+        """
+        :return: length of Structure / number of nodes in graph
+        """
+        return len(self.structure)
+
+    def __copy__(self):
+        return self.__class__.from_dict(self.as_dict())
+
+    def _edges_to_string(self):
+        g = nx.MultiDiGraph(
+            name=self.name, edge_weight_name=self.edge_weight_name, edge_weight_units=self.edge_weight_unit
+        )
+        for u, v, image, weight in zip(self.from_index, self.to_index, self.to_jimage, self.weight):
+            g.add_edge(int(u), int(v), to_jimage=tuple(int(i) for i in image), weight=0 if np.isnan(weight) else weight)
+        return StructureGraph._edges_to_string(g)
+
+    def __str__(self):
+        s = "Structure Graph"
+        s += "\nStructure: \n{}".format(self.structure.__str__())
+        s += "\nGraph: {}\n".format(self.name)
+        s += self._edges_to_string()
+        return s
+
+    def __repr__(self):
+        s = "Structure Graph"
+        s += "\nStructure: \n{}".format(self.structure.__repr__())
+        s += "\nGraph: {}\n".format(self.name)
+        s += self._edges_to_string()
+        return s
+
+    def as_dict(self):
+        """
+        As in :Class: `pymatgen.core.Structure`, with the edges as lists.
+        """
+        return {
+            "@module": self.__class__.__module__,
+            "@class": self.__class__.__name__,
+            "structure": self.structure.as_dict(),
+            "from_index": self.from_index.tolist(),
+            "to_index": self.to_index.tolist(),
+            "to_jimage": self.to_jimage.tolist(),
+            "weight": [None if np.isnan(w) else w for w in self.weight.tolist()],
+            "name": self.name,
+            "edge_weight_name": self.edge_weight_name,
+            "edge_weight_units": self.edge_weight_unit,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        As in :Class: `pymatgen.core.Structure`.
+        """
+        return cls(
+            Structure.from_dict(d["structure"]),
+            d["from_index"],
+            d["to_index"],
+            np.reshape(d["to_jimage"], (-1, 3)),
+            weight=d["weight"],
+            name=d["name"],
+            edge_weight_name=d["edge_weight_name"],
+            edge_weight_units=d["edge_weight_units"],
+        )
+
+
 class MolGraphSplitError(Exception):
     """
     Raised when a molecule graph is failed to split into two disconnected
@@ -8,14 +8,15 @@ the local environments (e.g., finding near neighbors)
 of single sites in molecules and structures.
 """
 
+import hashlib
 import json
 import math
 import os
 import warnings
 from bisect import bisect_left
-from collections import defaultdict, namedtuple
+from collections import OrderedDict, defaultdict, namedtuple
 from copy import deepcopy
-from functools import lru_cache
+from functools import lru_cache, wraps
 from math import acos, asin, atan2, cos, exp, fabs, pi, pow, sin, sqrt
 from typing import List, Optional, Union, Dict, Any
 
@@ -209,19 +210,143 @@ class ValenceIonicRadiusEvaluator:
         return valences
 
 
+def _get_structure_hash(structure):
+    """
+    Returns a hash of the lattice, species and coordinates of a structure or
+    molecule.
+    """
+    sha = hashlib.sha1(type(structure).__name__.encode())
+    lattice = getattr(structure, "lattice", None)
+    if lattice is not None:
+        sha.update(np.ascontiguousarray(lattice.matrix, dtype=float).tobytes())
+    sha.update(np.ascontiguousarray(structure.cart_coords, dtype=float).tobytes())
+    sha.update("\n".join(site.species_string for site in structure).encode())
+    return sha.hexdigest()
+
+
+def _copy_nn_info(nn_info):
+    """
+    Returns a copy of a list of near-neighbor information dicts (or of lists
+    of them), sharing the sites.
+    """
+    return [_copy_nn_info(entry) if isinstance(entry, list) else dict(entry) for entry in nn_info]
+
+
+def _cached_nn_info(func):
+    """
+    Decorator routing a method returning near-neighbor information through
+    the cache of the NearNeighbors instance, if enabled. Calls made while a
+    cached call runs, e.g., get_nn_info for each site in get_all_nn_info,
+    bypass the cache, so that a call is a single entry of the cache and the
+    structure is hashed once.
+    """
+
+    @wraps(func)
+    def wrapped(self, structure, *args, **kwargs):
+        cache = self.__dict__.get("_nn_cache")
+        if cache is None or cache["busy"]:
+            return func(self, structure, *args, **kwargs)
+        key = (
+            func.__name__,
+            _get_structure_hash(structure),
+            args,
+            tuple(sorted(kwargs.items())),
+            type(self).__name__,
+            repr(sorted(self._get_params().items())),
+        )
+        if key in cache["results"]:
+            cache["hits"] += 1
+            cache["results"].move_to_end(key)
+            return _copy_nn_info(cache["results"][key])
+        cache["misses"] += 1
+        cache["busy"] = True
+        try:
+            nn_info = func(self, structure, *args, **kwargs)
+        finally:
+            cache["busy"] = False
+        cache["results"][key] = _copy_nn_info(nn_info)
+        if len(cache["results"]) > cache["maxsize"]:
+            cache["results"].popitem(last=False)
+        return nn_info
+
+    return wrapped
+
+
 class NearNeighbors:
     """
     Base class to determine near neighbors that typically include nearest
     neighbors and others that are within some tolerable distance.
+
+    The near-neighbor information computed by an instance can be cached with
+    enable_cache, so that repeated analyses of the same structure, e.g., with
+    get_cn, get_local_order_parameters or
+    StructureGraph.with_local_env_strategy, are only done once.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Route the near-neighbor information of all strategies through the cache
+        for name in ("get_nn_info", "get_all_nn_info"):
+            if name in cls.__dict__:
+                setattr(cls, name, _cached_nn_info(cls.__dict__[name]))
+
     def __eq__(self, other):
         if isinstance(other, type(self)):
-            return self.__dict__ == other.__dict__
+            return self._get_params() == other._get_params()
         return False
 
     def __hash__(self):
-        return len(self.__dict__.items())
+        return len(self._get_params().items())
+
+    def _get_params(self):
+        """
+        Returns the parameters of the strategy, i.e., its attributes except
+        the cache.
+        """
+        return {k: v for k, v in self.__dict__.items() if k != "_nn_cache"}
+
+    def enable_cache(self, maxsize=128):
+        """
+        Cache the results of get_nn_info and get_all_nn_info (and hence of
+        get_cn, get_nn, ...). Results are keyed by a hash of the lattice,
+        species and coordinates of the structure and by the parameters of the
+        strategy, and the least recently used ones are evicted beyond maxsize
+        entries. Copies of the cached lists and dicts are returned, so that
+        they can be modified safely, but the sites are shared.
+
+        Args:
+            maxsize (int): Maximum number of cached results.
+        """
+        self._nn_cache = {"results": OrderedDict(), "maxsize": maxsize, "hits": 0, "misses": 0, "busy": False}
+
+    def disable_cache(self):
+        """
+        Stop caching results and drop the cache.
+        """
+        self.__dict__.pop("_nn_cache", None)
+
+    def clear_cache(self):
+        """
+        Drop the cached results and reset the counters of the cache.
+        """
+        if self.__dict__.get("_nn_cache") is not None:
+            self.enable_cache(self._nn_cache["maxsize"])
+
+    def cache_info(self):
+        """
+        Returns:
+            Dict of the statistics of the cache, with keys "hits", "misses",
+            "maxsize" and "currsize", or None if the cache is not enabled.
+        """
+        cache = self.__dict__.get("_nn_cache")
+        if cache is None:
+            return None
+        return {
+            "hits": cache["hits"],
+            "misses": cache["misses"],
+            "maxsize": cache["maxsize"],
+            "currsize": len(cache["results"]),
+        }
 
     @property
     def structures_allowed(self):
@@ -366,6 +491,7 @@ class NearNeighbors:
 
         raise NotImplementedError("get_nn_info(structure, n)" " is not defined!")
 
+    @_cached_nn_info
     def get_all_nn_info(self, structure):
         """Get a listing of all neighbors for all sites in a structure
 
@@ -707,8 +833,11 @@ class VoronoiNN(NearNeighbors):
 
         while True:
             try:
-                neighbors = structure.get_sites_in_sphere(center.coords, cutoff)
-                neighbors = [i[0] for i in sorted(neighbors, key=lambda s: s[1])]
+                neighbors = structure.get_sites_in_sphere(center.coords, cutoff, include_index=True)
+                neighbors = [
+                    self._get_neighbor(structure, i, site.frac_coords, dist)
+                    for site, dist, i in sorted(neighbors, key=lambda s: s[1])
+                ]
 
                 # Run the Voronoi tessellation
                 qvoronoi_input = [s.coords for s in neighbors]
@@ -759,42 +888,48 @@ class VoronoiNN(NearNeighbors):
         else:
             targets = self.targets
 
-        # Initialize the list of sites with the atoms in the origin unit cell
-        # The `get_all_neighbors` function returns neighbors for each site's image in
-        # the original unit cell. We start off with these central atoms to ensure they
-        # are included in the tessellation
-
-        sites = [x.to_unit_cell() for x in structure]
-        indices = [(i, 0, 0, 0) for i, _ in enumerate(structure)]
-
-        # Get all neighbors within a certain cutoff
-        #   Record both the list of these neighbors, and the site indices
-        all_neighs = structure.get_all_neighbors(self.cutoff, include_index=True, include_image=True)
-        for neighs in all_neighs:
-            sites.extend([x[0] for x in neighs])
-            indices.extend([(x[2],) + x[3] for x in neighs])
-
-        # Get the non-duplicates (using the site indices for numerical stability)
-        indices = np.array(indices, dtype=np.int_)
-        indices, uniq_inds = np.unique(indices, return_index=True, axis=0)
-        sites = [sites[i] for i in uniq_inds]
-
-        # Sort array such that atoms in the root image are first
-        #   Exploit the fact that the array is sorted by the unique operation such that
-        #   the images associated with atom 0 are first, followed by atom 1, etc.
-        (root_images,) = np.nonzero(np.abs(indices[:, 1:]).max(axis=1) == 0)
+        # Get the site indices and images of all neighbors within a certain
+        # cutoff, together with the atoms in the origin unit cell to ensure
+        # they are included in the tessellation
+        _, neighbor_indices, neighbor_images, _ = structure.get_neighbor_list(self.cutoff)
+        indices = np.concatenate(
+            [
+                np.column_stack([np.arange(len(structure)), np.zeros((len(structure), 3))]),
+                np.column_stack([neighbor_indices, neighbor_images]),
+            ]
+        ).astype(np.int_)
+        del neighbor_indices, neighbor_images  # Save memory (tessellations can be costly)
 
-        del indices  # Save memory (tessellations can be costly)
+        # Get the non-duplicates, sorted such that the images associated with
+        # atom 0 are first, followed by atom 1, etc.
+        indices = np.unique(indices, axis=0)
+        (root_images,) = np.nonzero(np.abs(indices[:, 1:]).max(axis=1) == 0)
+        frac_coords = structure.frac_coords[indices[:, 0]] + indices[:, 1:]
+        sites = [self._get_neighbor(structure, i, fcoords) for i, fcoords in zip(indices[:, 0].tolist(), frac_coords)]
 
         # Run the tessellation
-        qvoronoi_input = [s.coords for s in sites]
-        voro = Voronoi(qvoronoi_input)
+        voro = Voronoi(structure.lattice.get_cartesian_coords(frac_coords))
 
-        # Get the information for each neighbor
-        return [
-            self._extract_cell_info(structure, i, sites, targets, voro, self.compute_adj_neighbors)
-            for i in root_images.tolist()
-        ]
+        # Get the information for each site
+        return self._extract_cells_info(root_images, sites, targets, voro, self.compute_adj_neighbors)
+
+    @staticmethod
+    def _get_neighbor(structure, index, frac_coords, distance=0.0):
+        """
+        Returns a PeriodicNeighbor of the site with an index at fractional
+        coordinates, remembering the index and the image of the site.
+        """
+        site = structure[index]
+        image = tuple(np.around(frac_coords - site.frac_coords).astype(int))
+        return PeriodicNeighbor(
+            site.species,
+            frac_coords,
+            structure.lattice,
+            site.properties,
+            nn_distance=distance,
+            index=index,
+            image=image,
+        )
 
     def _extract_cell_info(self, structure, site_idx, sites, targets, voro, compute_adj_neighbors=False):
         """Get the information about a certain atom from the results of a tessellation
@@ -820,74 +955,129 @@ class VoronoiNN(NearNeighbors):
                 - n_verts - Number of vertices on the facet
                 - adj_neighbors - Facet id's for the adjacent neighbors
         """
-        # Get the coordinates of every vertex
-        all_vertices = voro.vertices
-
-        # Get the coordinates of the central site
-        center_coords = sites[site_idx].coords
-
-        # Iterate through all the faces in the tessellation
-        results = {}
-        for nn, vind in voro.ridge_dict.items():
-            # Get only those that include the site in question
-            if site_idx in nn:
-                other_site = nn[0] if nn[1] == site_idx else nn[1]
-                if -1 in vind:
-                    # -1 indices correspond to the Voronoi cell
-                    #  missing a face
-                    if self.allow_pathological:
-                        continue
-
-                    raise RuntimeError(
-                        "This structure is pathological," " infinite vertex in the voronoi " "construction"
-                    )
-
-                # Get the solid angle of the face
-                facets = [all_vertices[i] for i in vind]
-                angle = solid_angle(center_coords, facets)
-
-                # Compute the volume of associated with this face
-                volume = 0
-                #  qvoronoi returns vertices in CCW order, so I can break
-                #   the face up in to segments (0,1,2), (0,2,3), ... to compute
-                #   its area where each number is a vertex size
-                for j, k in zip(vind[1:], vind[2:]):
-                    volume += vol_tetra(
-                        center_coords,
-                        all_vertices[vind[0]],
-                        all_vertices[j],
-                        all_vertices[k],
-                    )
+        return self._extract_cells_info([site_idx], sites, targets, voro, compute_adj_neighbors)[0]
 
-                # Compute the distance of the site to the face
-                face_dist = np.linalg.norm(center_coords - sites[other_site].coords) / 2
+    def _extract_cells_info(self, site_indices, sites, targets, voro, compute_adj_neighbors=False):
+        """Get the information about many atoms at once from the results of a
+        tessellation. The solid angles and volumes of all the faces are computed
+        together, splitting the faces in triangles.
 
-                # Compute the area of the face (knowing V=Ad/3)
-                face_area = 3 * volume / face_dist
-
-                # Compute the normal of the facet
-                normal = np.subtract(sites[other_site].coords, center_coords)
-                normal /= np.linalg.norm(normal)
+        Args:
+            site_indices ([int]) - Indices of the atoms in question
+            sites ([Site]) - List of all sites in the tessellation
+            targets ([Element]) - Target elements
+            voro - Output of qvoronoi
+            compute_adj_neighbors (boolean) - Whether to compute which neighbors are adjacent
+        Returns:
+            A list of the dicts of sites sharing a common Voronoi facet with
+            each atom, see _extract_cell_info.
+        """
+        coords = voro.points
+        site_indices = np.array(site_indices, dtype=np.int_)
+        positions = np.full(len(coords), -1)
+        positions[site_indices] = np.arange(len(site_indices))
+
+        # Get the faces of the atoms in question, as the atom and the other
+        # site sharing the face, in the order of the faces in the tessellation
+        ridge_points = voro.ridge_points
+        centers = ridge_points.T.ravel()
+        others = ridge_points[:, ::-1].T.ravel()
+        ridges = np.tile(np.arange(len(ridge_points)), 2)
+        mask = positions[centers] >= 0
+        centers, others, ridges = centers[mask], others[mask], ridges[mask]
+        order = np.lexsort((ridges, positions[centers]))
+        centers, others, ridges = centers[order], others[order], ridges[order]
+
+        face_vertices = [voro.ridge_vertices[r] for r in ridges.tolist()]
+        n_verts = np.array([len(vind) for vind in face_vertices], dtype=np.int_)
+        flat_vertices = np.concatenate(face_vertices).astype(np.int_) if face_vertices else np.zeros(0, dtype=np.int_)
+        starts = np.cumsum(n_verts) - n_verts
+
+        # -1 indices correspond to the Voronoi cell missing a face
+        pathological = np.minimum.reduceat(flat_vertices, starts) < 0 if len(starts) else np.zeros(0, dtype=bool)
+        if np.any(pathological):
+            if not self.allow_pathological:
+                raise RuntimeError("This structure is pathological," " infinite vertex in the voronoi " "construction")
+            n_verts[pathological] = 2
+
+        # Split the faces in triangles (0,1,2), (0,2,3), ... as qvoronoi
+        # returns vertices in CCW order, and get the solid angle and the
+        # volume of the tetrahedra formed with the center, following:
+        # https://en.wikipedia.org/wiki/Solid_angle#Tetrahedron
+        n_triangles = n_verts - 2
+        triangle_faces = np.repeat(np.arange(len(n_verts)), n_triangles)
+        first = np.repeat(starts, n_triangles)
+        second = (
+            first + np.arange(len(triangle_faces)) - np.repeat(np.cumsum(n_triangles) - n_triangles, n_triangles) + 1
+        )
+        center_coords = coords[centers][triangle_faces]
+        r0 = voro.vertices[flat_vertices[first]] - center_coords
+        r1 = voro.vertices[flat_vertices[second]] - center_coords
+        r2 = voro.vertices[flat_vertices[second + 1]] - center_coords
+        n0, n1, n2 = [np.linalg.norm(r, axis=1) for r in (r0, r1, r2)]
+        tp = np.abs(np.einsum("ij,ij->i", r0, np.cross(r1, r2)))
+        de = (
+            n0 * n1 * n2
+            + n2 * np.einsum("ij,ij->i", r0, r1)
+            + n1 * np.einsum("ij,ij->i", r0, r2)
+            + n0 * np.einsum("ij,ij->i", r1, r2)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            triangle_angles = np.where(de == 0, np.where(tp > 0, 0.5 * pi, -0.5 * pi), np.arctan(tp / de))
+        triangle_angles = 2 * np.where(triangle_angles > 0, triangle_angles, triangle_angles + pi)
+        angles = np.bincount(triangle_faces, weights=triangle_angles, minlength=len(n_verts))
+        volumes = np.bincount(triangle_faces, weights=tp, minlength=len(n_verts)) / 6
+
+        # Compute the distance of the site to the face, the area of the face
+        # (knowing V=Ad/3) and its normal
+        normals = coords[others] - coords[centers]
+        face_dists = np.linalg.norm(normals, axis=1) / 2
+        areas = 3 * volumes / face_dists
+        normals /= 2 * face_dists[:, None]
+
+        all_results = []
+        bounds = np.searchsorted(positions[centers], np.arange(len(site_indices) + 1))
+        for lower, upper in zip(bounds[:-1], bounds[1:]):
+            results = {}
+            for face in range(lower, upper):
+                if n_verts[face] < 3:
+                    continue
+                other_site = int(others[face])
 
                 # Store by face index
                 results[other_site] = {
                     "site": sites[other_site],
-                    "normal": normal,
-                    "solid_angle": angle,
-                    "volume": volume,
-                    "face_dist": face_dist,
-                    "area": face_area,
-                    "n_verts": len(vind),
+                    "normal": normals[face].copy(),
+                    "solid_angle": float(angles[face]),
+                    "volume": float(volumes[face]),
+                    "face_dist": float(face_dists[face]),
+                    "area": float(areas[face]),
+                    "n_verts": int(n_verts[face]),
                 }
 
                 # If we are computing which neighbors are adjacent, store the vertices
                 if compute_adj_neighbors:
-                    results[other_site]["verts"] = vind
+                    results[other_site]["verts"] = face_vertices[face]
+
+            # all sites should have atleast two connected ridges in periodic system
+            if not results:
+                raise ValueError("No Voronoi neighbours found for site - try increasing cutoff")
 
-        # all sites should have atleast two connected ridges in periodic system
-        if not results:
-            raise ValueError("No Voronoi neighbours found for site - try increasing cutoff")
+            all_results.append(self._filter_cell_info(results, targets, compute_adj_neighbors))
+        return all_results
 
+    @staticmethod
+    def _filter_cell_info(results, targets, compute_adj_neighbors=False):
+        """Keep the facets of the neighbors of target elements, and determine
+        which of them are adjacent
+
+        Args:
+            results (dict) - Facets, see _extract_cell_info
+            targets ([Element]) - Target elements
+            compute_adj_neighbors (boolean) - Whether to compute which neighbors are adjacent
+        Returns:
+            A dict of the facets of the targets.
+        """
         # Get only target elements
         resultweighted = {}
         for nn_index, nstats in results.items():
@@ -984,11 +1174,19 @@ class VoronoiNN(NearNeighbors):
         for nstats in nns.values():
             site = nstats["site"]
             if nstats[self.weight] > self.tol * max_weight and _is_in_targets(site, targets):
+                if isinstance(site, PeriodicNeighbor):
+                    site_index = site.index
+                    image = tuple(
+                        np.around(np.subtract(site.frac_coords, structure[site_index].frac_coords)).astype(int)
+                    )
+                else:
+                    site_index = self._get_original_site(structure, site)
+                    image = self._get_image(structure, site)
                 nn_info = {
                     "site": site,
-                    "image": self._get_image(structure, site),
+                    "image": image,
                     "weight": nstats[self.weight] / max_weight,
-                    "site_index": self._get_original_site(structure, site),
+                    "site_index": site_index,
                 }
 
                 if self.extra_nn_info:
@@ -2008,15 +2206,20 @@ def get_neighbors_of_site_with_index(struct, n, approach="min_dist", delta=0.1,
         struct (Structure): input structure.
         n (int): index of site in Structure object for which motif type
             is to be determined.
-        approach (str): type of neighbor-finding approach, where
-            "min_dist" will use the MinimumDistanceNN class,
+        approach (str or NearNeighbors): type of neighbor-finding approach,
+            where "min_dist" will use the MinimumDistanceNN class,
             "voronoi" the VoronoiNN class, "min_OKeeffe" the
             MinimumOKeeffe class, and "min_VIRE" the MinimumVIRENN class.
+            A NearNeighbors instance is used as is (delta and cutoff are
+            then ignored), e.g., to reuse its cache.
         delta (float): tolerance involved in neighbor finding.
         cutoff (float): (large) radius to find tentative neighbors.
 
     Returns: neighbor sites.
     """
+    if isinstance(approach, NearNeighbors):
+        return approach.get_nn(struct, n)
+
     if approach == "min_dist":
         return MinimumDistanceNN(tol=delta, cutoff=cutoff).get_nn(struct, n)
 
@@ -2044,10 +2247,11 @@ def site_is_of_motif_type(struct, n, approach="min_dist", delta=0.1, cutoff=10.0
         struct (Structure): input structure.
         n (int): index of site in Structure object for which motif type
                 is to be determined.
-        approach (str): type of neighbor-finding approach, where
-              "min_dist" will use the MinimumDistanceNN class,
+        approach (str or NearNeighbors): type of neighbor-finding approach,
+              where "min_dist" will use the MinimumDistanceNN class,
               "voronoi" the VoronoiNN class, "min_OKeeffe" the
               MinimumOKeeffe class, and "min_VIRE" the MinimumVIRENN class.
+              A NearNeighbors instance is used as is.
         delta (float): tolerance involved in neighbor finding.
         cutoff (float): (large) radius to find tentative neighbors.
         thresh (dict): thresholds for motif criteria (currently, required
@@ -2878,17 +3082,7 @@ class LocalStructOrderParams:
             vnn = VoronoiNN(tol=tol, targets=target_spec)
             neighsites = vnn.get_nn(structure, n)
         else:
-            # Structure.get_sites_in_sphere --> also other periodic images
-            neighsitestmp = [i[0] for i in structure.get_sites_in_sphere(centsite.coords, self._cutoff)]
-            neighsites = []
-            if centsite not in neighsitestmp:
-                raise ValueError("Could not find center site!")
-            neighsitestmp.remove(centsite)
-
-            if target_spec is None:
-                neighsites = list(neighsitestmp)
-            else:
-                neighsites[:] = [site for site in neighsitestmp if site.specie.symbol == target_spec]
+            neighsites = self._get_neighbors_in_cutoff(structure, n, target_spec)
         nneigh = len(neighsites)
         self._last_nneigh = nneigh
 
@@ -3350,6 +3544,465 @@ class LocalStructOrderParams:
 
         return ops
 
+    def _get_neighbors_in_cutoff(self, structure, n, target_spec=None):
+        """
+        Returns the neighbors of site n within the cutoff radius, optionally
+        only those of the target species.
+        """
+        centsite = structure[n]
+        # Structure.get_sites_in_sphere --> also other periodic images
+        neighsitestmp = [i[0] for i in structure.get_sites_in_sphere(centsite.coords, self._cutoff)]
+        if centsite not in neighsitestmp:
+            raise ValueError("Could not find center site!")
+        neighsitestmp.remove(centsite)
+
+        if target_spec is None:
+            return neighsitestmp
+        return [site for site in neighsitestmp if site.specie.symbol == target_spec]
+
+    def get_all_order_parameters(self, structure, indices=None, nn=None, tol=0.0, target_spec=None):
+        """
+        Compute all order parameters of many sites at once. Neighbors are
+        determined for all sites together, and the order parameters of the
+        sites with the same number of neighbors are computed together with
+        NumPy (see get_order_parameters_from_vectors), which is much faster
+        than calling get_order_parameters for each site.
+
+        Args:
+            structure (Structure): input structure.
+            indices ([int]): indices of the sites for which OPs are to be
+                calculated. Defaults to all sites.
+            nn (NearNeighbors): near-neighbor strategy determining the
+                neighbors of the sites with get_all_nn_info, e.g., CrystalNN().
+                Defaults to the neighbor determination defined in the
+                constructor (i.e., Voronoi coordination finder via negative
+                cutoff radius vs constant cutoff radius if cutoff was
+                positive).
+            tol (float): threshold of weight (= solid angle / maximal solid
+                angle) to determine if a particular pair is considered
+                neighbors when Voronoi polyhedra are used to determine
+                coordination.
+            target_spec (Species): target species to be considered when
+                calculating the order parameters; None includes all species
+                of input structure. Ignored if nn is given.
+
+        Returns:
+            np.ndarray of shape (number of sites, number of OPs) of the
+            order parameters, in the order of indices and of the types. OPs
+            that cannot be computed (None in get_order_parameters) are NaN.
+            Note that the "bcc" OP depends on the order of the neighbors,
+            which may differ from get_order_parameters when the neighbors
+            are determined with a Voronoi tessellation of the whole
+            structure.
+        """
+        if indices is None:
+            indices = range(len(structure))
+        indices = list(indices)
+        if tol < 0.0:
+            raise ValueError("Negative tolerance for weighted solid angle!")
+
+        if nn is not None or self._voroneigh:
+            if nn is None:
+                nn = VoronoiNN(tol=tol, targets=target_spec)
+            all_neighbors = [[entry["site"] for entry in nn_info] for nn_info in nn.get_all_nn_info(structure)]
+            all_neighbors = [all_neighbors[n] for n in indices]
+        else:
+            all_neighbors = [self._get_neighbors_in_cutoff(structure, n, target_spec) for n in indices]
+
+        vectors = []
+        for n, neighbors in zip(indices, all_neighbors):
+            coords = np.array([site.coords for site in neighbors]).reshape((len(neighbors), 3))
+            vectors.append(coords - structure[n].coords)
+        return self.get_order_parameters_from_vectors(vectors)
+
+    def get_order_parameters_from_vectors(self, vectors, chunk_size=2 ** 20):
+        """
+        Compute all order parameters of many sites from the vectors from
+        each site to its neighbors. The sites are grouped by number of
+        neighbors, and the contributions of all neighbor pairs and triplets
+        of the sites of a group are computed at once. The results are the
+        same as those of get_order_parameters for the same neighbors.
+
+        Args:
+            vectors ([np.ndarray]): for each site, array of shape
+                (number of neighbors, 3) of the vectors from the site to its
+                neighbors.
+            chunk_size (int): maximum number of neighbor triplets processed
+                at once, which bounds memory usage.
+
+        Returns:
+            np.ndarray of shape (number of sites, number of OPs) of the
+            order parameters. OPs that cannot be computed are NaN.
+        """
+        vectors = [np.reshape(np.array(v, dtype=float), (-1, 3)) for v in vectors]
+        ops = np.full((len(vectors), len(self._types)), np.nan)
+        nneighs = np.array([len(v) for v in vectors], dtype=int)
+        for nneigh in np.unique(nneighs):
+            (sites,) = np.nonzero(nneighs == nneigh)
+            step = max(1, chunk_size // max(1, nneigh ** 3))
+            for start in range(0, len(sites), step):
+                chunk = sites[start : start + step]
+                ops[chunk] = self._get_order_parameters_batch(
+                    np.array([vectors[i] for i in chunk]).reshape(-1, nneigh, 3)
+                )
+        return ops
+
+    def _get_order_parameters_batch(self, rij):
+        """
+        Compute all order parameters of sites with the same number of
+        neighbors, see get_order_parameters.
+
+        Args:
+            rij (np.ndarray): vectors from the sites to their neighbors, of
+                shape (number of sites, number of neighbors, 3).
+
+        Returns:
+            np.ndarray of shape (number of sites, number of OPs).
+        """
+        nsites, nneigh = rij.shape[:2]
+        ops = np.zeros((nsites, len(self._types)))
+        dist = np.linalg.norm(rij, axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rijnorm = rij / dist[:, :, None]
+
+        # First, coordination number and distance-based OPs.
+        for i, t in enumerate(self._types):
+            if t == "cn":
+                ops[:, i] = nneigh / self._params[i]["norm"]
+            elif t == "sgl_bd":
+                if nneigh == 1:
+                    ops[:, i] = 1.0
+                elif nneigh > 1:
+                    dist_sorted = np.sort(dist, axis=1)
+                    ops[:, i] = 1.0 - dist_sorted[:, 0] / dist_sorted[:, 1]
+
+        # Then, bond orientational OPs based on spherical harmonics.
+        if self._boops:
+            for i, t in enumerate(self._types):
+                if t in ("q2", "q4", "q6"):
+                    ops[:, i] = self._get_boops_batch(rijnorm, int(t[1])) if nneigh > 0 else np.nan
+
+        # Then, the Peters-style OPs from the angles j-i-k between pairs of
+        # neighbors and j-i-m with the azimuths of m around j, relative to k.
+        if self._geomops:
+            self._get_geomops_batch(rijnorm, dist, ops)
+
+        # Then, the new-style OPs that require vectors between neighbors.
+        if self._geomops2:
+            for i, t in enumerate(self._types):
+                if t in ("reg_tri", "sq"):
+                    ops[:, i] = self._get_geomops2_batch(rij, rijnorm, t, self._params[i]) if nneigh >= 3 else np.nan
+
+        return ops
+
+    @staticmethod
+    def _get_boops_batch(rijnorm, l):
+        """
+        Compute the bond orientational order parameter of weight l (2, 4 or
+        6) of sites from the unit vectors to their neighbors, see get_q2,
+        get_q4 and get_q6.
+        """
+        left_of_unity = 1.0 - 1.0e-12
+        z = rijnorm[:, :, 2]
+        thetas = np.arccos(np.clip(z, -1.0, 1.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            phis = np.arccos(np.clip(rijnorm[:, :, 0] / np.hypot(rijnorm[:, :, 0], rijnorm[:, :, 1]), -1.0, 1.0))
+        phis = np.where(rijnorm[:, :, 1] < 0.0, -phis, phis)
+        phis = np.where((-left_of_unity < z) & (z < left_of_unity), phis, 0.0)
+        s, c = np.sin(thetas), np.cos(thetas)
+
+        # Prefactors of the spherical harmonics Y_l_m for m = 0...l; those of
+        # Y_l_-m have the same magnitudes.
+        if l == 2:
+            pre = [
+                0.25 * sqrt(5.0 / pi) * (3.0 * c ** 2 - 1.0),
+                0.5 * sqrt(15.0 / (2.0 * pi)) * s * c,
+                0.25 * sqrt(15.0 / (2.0 * pi)) * s ** 2,
+            ]
+        elif l == 4:
+            pre = [
+                3.0 / 16.0 * sqrt(1.0 / pi) * (35.0 * c ** 4 - 30.0 * c ** 2 + 3.0),
+                3.0 / 8.0 * sqrt(5.0 / pi) * s * (7.0 * c ** 3 - 3.0 * c),
+                3.0 / 8.0 * sqrt(5.0 / (2.0 * pi)) * s ** 2 * (7.0 * c ** 2 - 1.0),
+                3.0 / 8.0 * sqrt(35.0 / pi) * s ** 3 * c,
+                3.0 / 16.0 * sqrt(35.0 / (2.0 * pi)) * s ** 4,
+            ]
+        else:
+            pre = [
+                1.0 / 32.0 * sqrt(13.0 / pi) * (231.0 * c ** 6 - 315.0 * c ** 4 + 105.0 * c ** 2 - 5.0),
+                1.0 / 16.0 * sqrt(273.0 / (2.0 * pi)) * s * (33.0 * c ** 5 - 30.0 * c ** 3 + 5.0 * c),
+                1.0 / 64.0 * sqrt(1365.0 / pi) * s ** 2 * (33.0 * c ** 4 - 18.0 * c ** 2 + 1.0),
+                1.0 / 32.0 * sqrt(1365.0 / pi) * s ** 3 * (11.0 * c ** 3 - 3.0 * c),
+                3.0 / 32.0 * sqrt(91.0 / (2.0 * pi)) * s ** 4 * (11.0 * c ** 2 - 1.0),
+                3.0 / 32.0 * sqrt(1001.0 / pi) * s ** 5 * c,
+                1.0 / 64.0 * sqrt(3003.0 / pi) * s ** 6,
+            ]
+
+        acc = np.sum(pre[0], axis=1) ** 2
+        for m in range(1, l + 1):
+            real = np.sum(pre[m] * np.cos(m * phis), axis=1)
+            imag = np.sum(pre[m] * np.sin(m * phis), axis=1)
+            acc += 2.0 * (real * real + imag * imag)
+        nneigh = rijnorm.shape[1]
+        return np.sqrt(4.0 * pi * acc / ((2.0 * l + 1.0) * float(nneigh * nneigh)))
+
+    def _get_geomops_batch(self, rijnorm, dist, ops):
+        """
+        Compute the Peters-style OPs of sites from the unit vectors to their
+        neighbors, filling them in ops, see get_order_parameters.
+        """
+        nsites, nneigh = rijnorm.shape[:2]
+        very_small = 1.0e-12
+        fac_bcc = 1.0 / exp(-0.5)
+        ipi = 1.0 / pi
+
+        def gauss(x):
+            return np.exp(-0.5 * x * x)
+
+        # Angles between neighbors j and k, and prime meridians, i.e., the
+        # parts of neighbors k orthogonal to neighbors j, as [site, j, k].
+        dots = np.einsum("sjd,skd->sjk", rijnorm, rijnorm)
+        cosines = np.clip(dots, -1.0, 1.0)
+        thetas = np.arccos(cosines)
+        # np.arccos and math.acos may differ in the last digit, which matters
+        # for angles lying exactly on a threshold (e.g., bcc's min_SPP).
+        thresholds = [pi / 2] + [p["min_SPP"] for p in self._params if p is not None and "min_SPP" in p]
+        ties = np.zeros(thetas.shape, dtype=bool)
+        for threshold in thresholds:
+            ties |= np.abs(thetas - threshold) < very_small
+        thetas[ties] = [acos(c) for c in cosines[ties]]
+        norms2 = np.einsum("sjd,sjd->sj", rijnorm, rijnorm)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xaxes = rijnorm[:, None, :, :] - (dots / norms2[:, :, None])[:, :, :, None] * rijnorm[:, :, None, :]
+            xnorms = np.linalg.norm(xaxes, axis=3)
+            flag_xaxes = xnorms < very_small
+            xaxes = np.where(flag_xaxes[:, :, :, None], xaxes, xaxes / xnorms[:, :, :, None])
+            if self._comp_azi:
+                yaxes = np.cross(rijnorm[:, :, None, :], xaxes)
+                ynorms = np.linalg.norm(yaxes, axis=3)
+                flag_yaxes = ~(ynorms > very_small)
+                yaxes = np.where(flag_yaxes[:, :, :, None], yaxes, yaxes / ynorms[:, :, :, None])
+
+        # Pairs j != k and triplets with m != j, m != k as [site, j, k, m],
+        # for which the angle between the prime meridians of k and m is phi.
+        eye = np.eye(nneigh, dtype=bool)
+        pairs = np.broadcast_to(~eye, (nsites, nneigh, nneigh))
+        triplets = pairs[:, :, :, None] & ~eye[None, :, None, :] & ~eye[None, None, :, :]
+        triplets = triplets & ~flag_xaxes[:, :, :, None]
+        triplets2 = triplets & ~flag_xaxes[:, :, None, :]
+        thetak = thetas[:, :, :, None]
+        thetam = thetas[:, :, None, :]
+        phis = np.arccos(np.clip(np.einsum("sjkd,sjmd->sjkm", xaxes, xaxes), -1.0, 1.0))
+        if self._comp_azi:
+            phis2 = np.arctan2(np.einsum("sjmd,sjkd->sjkm", xaxes, yaxes), np.einsum("sjmd,sjkd->sjkm", xaxes, xaxes))
+        upper = np.triu(np.ones((nneigh, nneigh), dtype=bool), 1)[None, :, :]
+
+        last = len(self._types) - 1
+        for i, t in enumerate(self._types):
+            p = self._params[i]
+            qp = np.zeros(pairs.shape)  # contributions of pairs j, k
+            np_ = np.zeros(pairs.shape)
+            qt = np.zeros(triplets.shape)  # contributions of triplets j, k, m
+            nt = np.zeros(triplets.shape)
+
+            def add_pairs(cond, q, norm=1.0):
+                qp[...] += np.where(cond & pairs, q, 0.0)
+                np_[...] += np.where(cond & pairs, norm, 0.0)
+
+            def add_triplets(cond, q, norm=1.0, mask=triplets2):
+                qt[...] += np.where(cond & mask, q, 0.0)
+                nt[...] += np.where(cond & mask, norm, 0.0)
+
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                # Contributions of j-i-k angles, where i represents the
+                # central atom and j and k two of the neighbors.
+                gaussthetak = None
+                if t in ["bent", "sq_pyr_legacy", "tri_plan_max", "tet_max"]:
+                    add_pairs(True, gauss(p["IGW_TA"] * (thetas * ipi - p["TA"])))
+                elif t in ["tri_plan", "tet"]:
+                    gaussthetak = gauss(p["IGW_TA"] * (thetak * ipi - p["TA"]))
+                elif t in ["T", "tri_pyr", "sq_pyr", "pent_pyr", "hex_pyr"]:
+                    add_pairs(True, gauss(p["IGW_EP"] * (thetas * ipi - 0.5)))
+                elif t in ["sq_plan", "oct", "oct_legacy", "cuboct", "cuboct_max"]:
+                    q = p["w_SPP"] * gauss(p["IGW_SPP"] * (thetas * ipi - 1.0))
+                    add_pairs(thetas >= p["min_SPP"], q, p["w_SPP"])
+                elif t in [
+                    "see_saw_rect",
+                    "tri_bipyr",
+                    "sq_bipyr",
+                    "pent_bipyr",
+                    "hex_bipyr",
+                    "oct_max",
+                    "sq_plan_max",
+                    "hex_plan_max",
+                ]:
+                    if t != "hex_plan_max":
+                        tmp = p["IGW_EP"] * (thetas * ipi - 0.5)
+                    else:
+                        tmp = p["IGW_TA"] * (np.abs(thetas * ipi - 0.5) - p["TA"])
+                    add_pairs(thetas < p["min_SPP"], gauss(tmp))
+                elif t in ["pent_plan", "pent_plan_max"]:
+                    tmp = np.where(thetak <= p["TA"] * pi, 0.4, 0.8)
+                    gaussthetak = gauss(p["IGW_TA"] * (thetak * ipi - tmp))
+                    if t == "pent_plan_max":
+                        add_pairs(True, gaussthetak[:, :, :, 0])
+                        gaussthetak = None
+                elif t == "bcc":
+                    q = p["w_SPP"] * gauss(p["IGW_SPP"] * (thetas * ipi - 1.0))
+                    add_pairs(upper & (thetas >= p["min_SPP"]), q, p["w_SPP"])
+                elif t == "sq_face_cap_trig_pris":
+                    add_pairs(thetas < p["TA3"], gauss(p["IGW_TA1"] * (thetas * ipi - p["TA1"])))
+
+                # South pole contributions of m. As in get_order_parameters,
+                # they only apply to the last type.
+                if i == last and t in [
+                    "tri_bipyr",
+                    "sq_bipyr",
+                    "pent_bipyr",
+                    "hex_bipyr",
+                    "oct_max",
+                    "sq_plan_max",
+                    "hex_plan_max",
+                    "see_saw_rect",
+                ]:
+                    q = gauss(p["IGW_SPP"] * (thetam * ipi - 1.0))
+                    add_triplets(thetam >= p["min_SPP"], q, mask=triplets)
+
+                # Contributions of j-i-m angle and angles between plane j-i-k
+                # and i-m vector.
+                if t in ["tri_plan", "tri_plan_max", "tet", "tet_max"]:
+                    tmp3 = 1.0 if t in ["tri_plan_max", "tet_max"] else gaussthetak
+                    q = gauss(p["IGW_TA"] * (thetam * ipi - p["TA"])) * np.cos(p["fac_AA"] * phis) ** p["exp_cos_AA"]
+                    add_triplets(True, tmp3 * q)
+                elif t in ["pent_plan", "pent_plan_max"]:
+                    tmp = np.where(thetam <= p["TA"] * pi, 0.4, 0.8)
+                    tmp4 = 1.0 if t == "pent_plan_max" else gaussthetak
+                    add_triplets(True, tmp4 * gauss(p["IGW_TA"] * (thetam * ipi - tmp)) * np.cos(phis) ** 2)
+                elif t in ["T", "tri_pyr", "sq_pyr", "pent_pyr", "hex_pyr"]:
+                    q = np.cos(p["fac_AA"] * phis) ** p["exp_cos_AA"] * gauss(p["IGW_EP"] * (thetam * ipi - 0.5))
+                    add_triplets(True, q)
+                elif t in ["sq_plan", "oct", "oct_legacy"]:
+                    tmp = np.cos(p["fac_AA"] * phis) ** p["exp_cos_AA"]
+                    q = tmp * gauss(p["IGW_EP"] * (thetam * ipi - 0.5))
+                    if t == "oct_legacy":
+                        q = q - tmp * p[6] * p[7]
+                    add_triplets((thetak < p["min_SPP"]) & (thetam < p["min_SPP"]), q)
+                elif t in [
+                    "tri_bipyr",
+                    "sq_bipyr",
+                    "pent_bipyr",
+                    "hex_bipyr",
+                    "oct_max",
+                    "sq_plan_max",
+                    "hex_plan_max",
+                ]:
+                    tmp = np.cos(p["fac_AA"] * phis) ** p["exp_cos_AA"]
+                    if t != "hex_plan_max":
+                        tmp2 = p["IGW_EP"] * (thetam * ipi - 0.5)
+                    else:
+                        tmp2 = p["IGW_TA"] * (np.abs(thetam * ipi - 0.5) - p["TA"])
+                    add_triplets((thetam < p["min_SPP"]) & (thetak < p["min_SPP"]), tmp * gauss(tmp2))
+                elif t == "bcc":
+                    fac = np.where(thetak > pi / 2.0, 1.0, -1.0)
+                    tmp = (thetam - pi / 2.0) / asin(1 / 3)
+                    q = fac * np.cos(3.0 * phis) * fac_bcc * tmp * gauss(tmp)
+                    add_triplets(upper[:, :, :, None] & (thetak < p["min_SPP"]), q)
+                elif t == "see_saw_rect":
+                    q = np.cos(p["fac_AA"] * phis) ** p["exp_cos_AA"] * gauss(p["IGW_EP"] * (thetam * ipi - 0.5))
+                    cond = (thetam < p["min_SPP"]) & (thetak < p["min_SPP"]) & (phis < 0.75 * pi)
+                    add_triplets(cond, q)
+                elif t in ["cuboct", "cuboct_max"]:
+                    cond = (thetam < p["min_SPP"]) & (p[4] < thetak) & (thetak < p[2])
+                    q = np.cos(phis) ** 2 * gauss(p[5] * (thetam * ipi - 0.5))
+                    add_triplets(cond & (p[4] < thetam) & (thetam < p[2]), q)
+                    tmp = gauss(0.0556 * (np.cos(phis - 0.5 * pi) - 0.81649658))
+                    add_triplets(cond & (thetam < p[4]), tmp * gauss(p[6] * (thetam * ipi - 1.0 / 3.0)))
+                    add_triplets(cond & (thetam > p[2]), tmp * gauss(p[6] * (thetam * ipi - 2.0 / 3.0)))
+                elif t == "sq_face_cap_trig_pris":
+                    q = np.where(
+                        thetam < p["TA3"],
+                        np.cos(p["fac_AA1"] * phis2) ** p["exp_cos_AA1"]
+                        * gauss(p["IGW_TA1"] * (thetam * ipi - p["TA1"])),
+                        np.cos(p["fac_AA2"] * (phis2 + p["shift_AA2"])) ** p["exp_cos_AA2"]
+                        * gauss(p["IGW_TA2"] * (thetam * ipi - p["TA2"])),
+                    )
+                    add_triplets(~flag_yaxes[:, :, :, None] & (thetak < p["TA3"]), q)
+
+                qsptheta = qp + qt.sum(axis=3)
+                norms = np_ + nt.sum(axis=3)
+
+                # Normalize Peters-style OPs.
+                if t in ["tri_plan", "tet", "bent", "sq_plan", "oct", "oct_legacy", "cuboct", "pent_plan"]:
+                    tmp_norm = norms.sum(axis=(1, 2))
+                    ops[:, i] = np.where(tmp_norm > 1.0e-12, qsptheta.sum(axis=(1, 2)) / tmp_norm, np.nan)
+                elif t in [
+                    "T",
+                    "tri_pyr",
+                    "see_saw_rect",
+                    "sq_pyr",
+                    "tri_bipyr",
+                    "sq_bipyr",
+                    "pent_pyr",
+                    "hex_pyr",
+                    "pent_bipyr",
+                    "hex_bipyr",
+                    "oct_max",
+                    "tri_plan_max",
+                    "tet_max",
+                    "sq_plan_max",
+                    "pent_plan_max",
+                    "cuboct_max",
+                    "hex_plan_max",
+                    "sq_face_cap_trig_pris",
+                ]:
+                    if nneigh > 1:
+                        qsptheta = np.where(norms > 1.0e-12, qsptheta / norms, 0.0)
+                        ops[:, i] = np.max(np.where(pairs, qsptheta, -np.inf), axis=(1, 2))
+                    else:
+                        ops[:, i] = np.nan
+                elif t == "bcc":
+                    if nneigh > 3:
+                        ops[:, i] = qsptheta.sum(axis=(1, 2)) / (
+                            0.5 * float(nneigh * (6 + (nneigh - 2) * (nneigh - 3)))
+                        )
+                    else:
+                        ops[:, i] = np.nan
+                elif t == "sq_pyr_legacy":
+                    if nneigh > 1:
+                        acc = gauss(p[2] * (dist - dist.mean(axis=1)[:, None])).sum(axis=1)
+                        ops[:, i] = acc * np.max(np.where(pairs, qsptheta, -np.inf), axis=(1, 2)) / float(nneigh)
+                    else:
+                        ops[:, i] = np.nan
+
+    @staticmethod
+    def _get_geomops2_batch(rij, rijnorm, t, params):
+        """
+        Compute the "reg_tri" or "sq" OP of sites with at least three
+        neighbors, see get_order_parameters.
+        """
+        nneigh = rij.shape[1]
+        upper = np.triu_indices(nneigh, 1)
+
+        # Compute all (unique) angles and sort the resulting list.
+        dots = np.einsum("sjd,skd->sjk", rijnorm, rijnorm)
+        aijs = np.sort(np.arccos(np.clip(dots[:, upper[0], upper[1]], -1.0, 1.0)), axis=1)
+
+        # Compute height, side and diagonal length estimates.
+        h = np.linalg.norm(rij.mean(axis=1), axis=1)
+        distjk = np.linalg.norm(rij[:, upper[1]] - rij[:, upper[0]], axis=2)
+        b = distjk.min(axis=1)
+        dhalf = distjk.max(axis=1) / 2.0
+
+        with np.errstate(invalid="ignore"):
+            if t == "reg_tri":
+                a = 2.0 * np.arcsin(b / (2.0 * np.sqrt(h * h + (b / (2.0 * cos(3.0 * pi / 18.0))) ** 2.0)))
+                nmax = 3
+            else:
+                a = 2.0 * np.arcsin(b / (2.0 * np.sqrt(h * h + dhalf * dhalf)))
+                nmax = 4
+        nmax = min(nneigh, nmax)
+        return np.prod(np.exp(-0.5 * ((aijs[:, :nmax] - a[:, None]) * params[0]) ** 2), axis=1)
+
 
 class BrunnerNN_reciprocal(NearNeighbors):
     """
@@ -3841,7 +4494,25 @@ class CrystalNN(NearNeighbors):
         """
 
         nndata = self.get_nn_data(structure, n)
+        return self._get_nn_info_from_data(nndata)
 
+    def get_all_nn_info(self, structure):
+        """
+        Get the near-neighbor information of all sites at once, from a single
+        Voronoi tessellation of the structure (see get_all_nn_data).
+
+        Args:
+            structure: (Structure) pymatgen Structure
+
+        Returns:
+            List of the near-neighbor information of each site, see get_nn_info.
+        """
+        return [self._get_nn_info_from_data(nndata) for nndata in self.get_all_nn_data(structure)]
+
+    def _get_nn_info_from_data(self, nndata):
+        """
+        Get the near-neighbor information from the NNData of a site.
+        """
         if not self.weighted_cn:
             max_key = max(nndata.cn_weights, key=lambda k: nndata.cn_weights[k])
             nn = nndata.cn_nninfo[max_key]
@@ -3879,21 +4550,67 @@ class CrystalNN(NearNeighbors):
         length = length or self.fingerprint_length
 
         # determine possible bond targets
-        target = None
-        if self.cation_anion:
-            target = []
-            m_oxi = structure[n].specie.oxi_state
-            for site in structure:
-                if site.specie.oxi_state * m_oxi <= 0:  # opposite charge
-                    target.append(site.specie)
-            if not target:
-                raise ValueError("No valid targets for site within cation_anion constraint!")
+        target = self._get_targets(structure, n)
 
         # get base VoronoiNN targets
         cutoff = self.search_cutoff
         vnn = VoronoiNN(weight="solid_angle", targets=target, cutoff=cutoff)
         nn = vnn.get_nn_info(structure, n)
+        return self._get_nn_data(structure, n, nn, length)
+
+    def get_all_nn_data(self, structure, length=None):
+        """
+        Compute the near neighbor data of all sites at once. The structure is
+        tessellated only once, which is much faster than calling get_nn_data
+        for each site of large structures. If the tessellation of the whole
+        structure fails, e.g., because the search cutoff is too small for
+        some site, falls back to get_nn_data for each site.
+
+        Args:
+            structure: (Structure) enclosing structure object
+            length: (int) if set, will return a fixed range of CN numbers
 
+        Returns:
+            List of the NNData of each site, see get_nn_data.
+        """
+        length = length or self.fingerprint_length
+        vnn = VoronoiNN(weight="solid_angle", cutoff=self.search_cutoff, compute_adj_neighbors=False)
+        try:
+            cells = vnn.get_all_voronoi_polyhedra(structure)
+        except (RuntimeError, ValueError):
+            return [self.get_nn_data(structure, n, length) for n in range(len(structure))]
+
+        all_nndata = []
+        for n, cell in enumerate(cells):
+            target = self._get_targets(structure, n)
+            if target is not None:
+                cell = vnn._filter_cell_info(cell, target)
+            vnn.targets = target
+            nn = vnn._extract_nn_info(structure, cell)
+            all_nndata.append(self._get_nn_data(structure, n, nn, length))
+        return all_nndata
+
+    def _get_targets(self, structure, n):
+        """
+        Returns the possible bond targets of site n, i.e., the species of
+        opposite charge if cation_anion is set, else None.
+        """
+        if not self.cation_anion:
+            return None
+        target = []
+        m_oxi = structure[n].specie.oxi_state
+        for site in structure:
+            if site.specie.oxi_state * m_oxi <= 0:  # opposite charge
+                target.append(site.specie)
+        if not target:
+            raise ValueError("No valid targets for site within cation_anion constraint!")
+        return target
+
+    def _get_nn_data(self, structure, n, nn, length):
+        """
+        Compute the near neighbor data of site n from its VoronoiNN near
+        neighbors with solid angle weights, see get_nn_data.
+        """
         # solid angle weights can be misleading in open / porous structures
         # adjust weights to correct for this behavior
         if self.porous_adjustment:
@@ -400,6 +400,205 @@ class BasePhaseDiagram(MSONable):
             qhull_entries=qhull_entries,
         )
 
+    def add_entries(self, entries):
+        """
+        Add entries to the phase diagram, updating the convex hull in place
+        instead of recomputing it from scratch. For each entry, only the facets
+        lying above it are replaced, by the facets connecting the entry to the
+        boundary of the region they cover (the beneath-beyond algorithm).
+        Entries above the hull only need a check against the facets, so
+        repeatedly testing and adding candidates to a large reference phase
+        diagram is cheap.
+
+        Entries that lie on the hull within numerical_tol are treated as not
+        changing the hull, and stable_entries may differ from a full
+        reconstruction in such degenerate cases. qhull_entries only grows, so
+        it may contain entries that a full reconstruction would not use.
+
+        Args:
+            entries ([PDEntry]): PDEntry-like objects. Their elements must
+                all be in the phase diagram.
+        """
+        for entry in entries:
+            self._add_entry(entry)
+        self._stable_entries = set(self.qhull_entries[i] for i in set(itertools.chain(*self.facets)))
+        # The caches are keyed on the instance, which has now changed.
+        BasePhaseDiagram._get_facet_and_simplex.cache_clear()
+        BasePhaseDiagram.get_stable_entries_normed.cache_clear()
+
+    def _add_entry(self, entry):
+        """
+        Adds a single entry to all_entries and updates the facets if the
+        entry is below the current hull.
+        """
+        comp = entry.composition
+        if set(comp.elements).difference(self.elements):
+            raise ValueError("{} has elements not in the phase diagram {}".format(comp, self.elements))
+        self.all_entries.append(entry)
+
+        row = np.array([comp.get_atomic_fraction(el) for el in self.elements[1:]] + [entry.energy_per_atom])
+        coords, energy = row[:-1], row[-1]
+
+        # Energies of the hyperplanes of all facets at the composition.
+        aug_invs, facet_energies = self._get_facet_data()
+        plane_energies = np.sum(np.dot(np.append(coords, 1), aug_invs) * facet_energies, axis=-1)
+        visible = np.where(energy < plane_energies - self.numerical_tol)[0].tolist()
+        if not visible:
+            return
+
+        if comp.is_element:
+            self.el_refs[comp.elements[0]] = entry
+
+        # Insert before the extra point used to enforce full dimensionality,
+        # so that indices in existing facets remain valid.
+        new_index = len(self.qhull_entries)
+        self.qhull_entries.append(entry)
+        self.qhull_data = np.insert(self.qhull_data, new_index, row, axis=0)
+
+        if self.dim == 1:
+            new_facets = [np.array([new_index])]
+        else:
+            # Ridges of the visible facets which are not shared by two visible
+            # facets form the boundary of the region to be re-triangulated.
+            ridge_counts = collections.Counter(
+                ridge for i in visible for ridge in itertools.combinations(sorted(self.facets[i]), self.dim - 1)
+            )
+            new_facets = []
+            for ridge, count in ridge_counts.items():
+                if count > 1:
+                    continue
+                facet = np.array(list(ridge) + [new_index])
+                m = self.qhull_data[facet]
+                m[:, -1] = 1
+                # Skip ridges on a boundary of the composition space which
+                # also contains the new entry.
+                if abs(np.linalg.det(m)) > 1e-14:
+                    new_facets.append(facet)
+
+        kept = [i for i in range(len(self.facets)) if i not in set(visible)]
+        self.facets = [self.facets[i] for i in kept] + new_facets
+        self.simplexes = [self.simplexes[i] for i in kept] + [Simplex(self.qhull_data[f, :-1]) for f in new_facets]
+        self._facet_data = None
+
+    def _get_facet_data(self):
+        """
+        Returns the inverse augmented vertex matrices of all facets, shape
+        (nfacets, dim, dim), and the energies of their vertices, shape
+        (nfacets, dim). The barycentric coordinates of points [x, 1] in all
+        facets are then given by a single dot product with the matrices.
+        """
+        if getattr(self, "_facet_data", None) is None:
+            facets = np.array(self.facets)
+            aug = self.qhull_data[facets]
+            energies = aug[:, :, -1].copy()
+            aug[:, :, -1] = 1
+            self._facet_data = np.linalg.inv(aug), energies
+        return self._facet_data
+
+    def _get_facets_and_bary_coords(self, coords, max_array_size=10000000):
+        """
+        Vectorized equivalent of _get_facet_and_simplex and bary_coords for
+        many points at once.
+
+        Args:
+            coords (np.ndarray): Points in the phase diagram basis, shape
+                (npoints, dim - 1).
+            max_array_size (int): The barycentric coordinates of the points in
+                all facets are computed in chunks of points such that at most
+                max_array_size values are held at once.
+
+        Returns:
+            (facet_indices, bary_coords): Index of the first facet containing
+            each point, in the same order as self.facets, and the barycentric
+            coordinates of the point in that facet, shape (npoints, dim).
+        """
+        aug_invs, _ = self._get_facet_data()
+        nfacets, dim, _ = aug_invs.shape
+        points = np.concatenate([np.reshape(coords, (-1, dim - 1)), np.ones((len(coords), 1))], axis=1)
+        facet_indices = np.zeros(len(points), dtype=int)
+        bary_coords = np.zeros((len(points), dim))
+        chunk_size = max(1, max_array_size // (nfacets * dim))
+        for start in range(0, len(points), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            all_bary = np.einsum("pi,fij->pfj", points[chunk], aug_invs)
+            inside = np.all(all_bary >= -PhaseDiagram.numerical_tol / 10, axis=-1)
+            if not np.all(np.any(inside, axis=-1)):
+                i = start + np.where(~np.any(inside, axis=-1))[0][0]
+                raise RuntimeError("No facet found for coords = {}".format(points[i, :-1]))
+            inds = np.argmax(inside, axis=-1)
+            facet_indices[chunk] = inds
+            bary_coords[chunk] = all_bary[np.arange(len(inds)), inds]
+        return facet_indices, bary_coords
+
+    def get_hull_energy_per_atom_batch(self, compositions):
+        """
+        Vectorized hull energies for many compositions, computed with a single
+        NumPy pass over all facets instead of a loop over facets per
+        composition.
+
+        Args:
+            compositions ([Composition]): Input compositions.
+
+        Returns:
+            np.ndarray of the energies per atom of the lowest energy
+            equilibrium at each composition.
+        """
+        compositions = list(compositions)
+        if not compositions:
+            return np.zeros(0)
+        coords = np.array([self.pd_coords(c) for c in compositions])
+        facet_indices, bary_coords = self._get_facets_and_bary_coords(coords)
+        _, facet_energies = self._get_facet_data()
+        return np.sum(bary_coords * facet_energies[facet_indices], axis=-1)
+
+    def get_hull_energy_batch(self, compositions):
+        """
+        Vectorized version of get_hull_energy.
+
+        Args:
+            compositions ([Composition]): Input compositions.
+
+        Returns:
+            np.ndarray of the energies of the lowest energy equilibrium at each
+            composition. Not normalized by atoms, i.e. E(Li4O2) = 2 * E(Li2O)
+        """
+        compositions = list(compositions)
+        num_atoms = np.array([c.num_atoms for c in compositions])
+        return num_atoms * self.get_hull_energy_per_atom_batch(compositions)
+
+    def get_e_above_hull_batch(self, entries, allow_negative=False):
+        """
+        Vectorized version of get_e_above_hull, suited to ranking large
+        numbers of (hypothetical) entries against the hull.
+
+        Args:
+            entries ([PDEntry]): PDEntry-like objects.
+            allow_negative (bool): Whether to allow negative e_above_hulls,
+                i.e. entries below the hull. Defaults to False.
+
+        Returns:
+            np.ndarray of the energies above convex hull of the entries, per
+            atom. Stable entries have energy above hull of 0.
+        """
+        entries = list(entries)
+        e_above_hull = np.array([e.energy_per_atom for e in entries]) - self.get_hull_energy_per_atom_batch(
+            [e.composition for e in entries]
+        )
+        # Mirror get_decomp_and_e_above_hull, which compares entries with a
+        # numerical tolerance, but only against stable entries of the same
+        # formula.
+        stable_entries = collections.defaultdict(list)
+        for e in self.stable_entries:
+            stable_entries[e.composition.reduced_formula].append(e)
+        e_above_hull[[i for i, e in enumerate(entries) if e in stable_entries[e.composition.reduced_formula]]] = 0
+        if not allow_negative:
+            below = np.where(e_above_hull < -PhaseDiagram.numerical_tol)[0]
+            if len(below) > 0:
+                raise ValueError(
+                    "No valid decomp found for {}! (e {})".format(entries[below[0]], e_above_hull[below[0]])
+                )
+        return e_above_hull
+
     def pd_coords(self, comp):
         """
         The phase diagram is generated in a reduced dimensional space
@@ -1215,6 +1414,24 @@ class GrandPotentialPhaseDiagram(PhaseDiagram):
 
         super().__init__(all_entries, elements)
 
+    def add_entries(self, entries):
+        """
+        Add entries to the grand potential phase diagram, updating the convex
+        hull in place. See BasePhaseDiagram.add_entries.
+
+        Args:
+            entries ([PDEntry]): PDEntry-like objects. Entries containing only
+                open elements are ignored.
+        """
+        elements = set(self.elements)
+        super().add_entries(
+            [
+                GrandPotPDEntry(e, self.chempots)
+                for e in entries
+                if len(elements.intersection(e.composition.elements)) > 0
+            ]
+        )
+
     def __repr__(self):
         chemsys = "-".join([el.symbol for el in self.elements])
         chempots = ", ".join(["u{}={}".format(el, v) for el, v in self.chempots.items()])
@@ -1321,6 +1538,20 @@ class CompoundPhaseDiagram(PhaseDiagram):
 
         return new_entries, sp_mapping
 
+    def add_entries(self, entries):
+        """
+        Add entries to the compound phase diagram, updating the convex hull in
+        place. See BasePhaseDiagram.add_entries.
+
+        Args:
+            entries ([PDEntry]): PDEntry-like objects. Entries falling outside
+                the phase space of the terminal compositions are ignored.
+        """
+        entries = list(entries)
+        self.original_entries = list(self.original_entries) + entries
+        pentries, _ = self.transform_entries(entries, self.terminal_compositions)
+        super().add_entries(pentries)
+
     def as_dict(self):
         """
         :return: MSONable dict
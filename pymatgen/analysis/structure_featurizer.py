@@ -0,0 +1,395 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+This module implements a driver to featurize large numbers of structures
+with the coordination numbers of CrystalNN, local structure order
+parameters, space groups and bond valences, in parallel and with the
+features written out incrementally in columnar files.
+"""
+
+import collections
+import copy
+import signal
+import threading
+import time
+import warnings
+import zipfile
+
+import numpy as np
+from monty.dev import requires
+
+from pymatgen.analysis.bond_valence import BVAnalyzer, calculate_bv_sum, calculate_bv_sum_unordered
+from pymatgen.analysis.local_env import CrystalNN, LocalStructOrderParams
+from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
+from pymatgen.util.parallel import StatefulPool
+from pymatgen.util.sequence import iter_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+class StructureFeaturizer:
+    """
+    Featurizes structures with a configurable set of analyzers. Features are
+    computed for chunks of structures, which are the tasks of a process pool
+    with ncpus, and returned as tables, i.e., dicts of column names to numpy
+    arrays::
+
+        featurizer = StructureFeaturizer(["cn", "spacegroup"], ncpus=8, timeout=60)
+        featurizer.write_npz(structures, "features.npz")
+        table = StructureFeaturizer.load_npz("features.npz")
+
+    Each table has a row per structure for the columns formula, n_sites,
+    error and time, the time taken in s, and for the structure features.
+    Site features have a "site_" prefix and concatenate the values of all
+    sites of the structures, which can be split with
+    np.split(values, np.cumsum(table["n_sites"])[:-1]).
+    The features available are:
+
+        - cn: Coordination numbers of CrystalNN (site_cn).
+        - order_parameters: Local structure order parameters of the sites
+          with the neighbors of CrystalNN (site_op_<type>).
+        - spacegroup: Space group number and symbol and crystal system of
+          SpacegroupAnalyzer (spacegroup_number, spacegroup_symbol,
+          crystal_system).
+        - bond_valence: Valences assigned by BVAnalyzer and bond valence sums
+          of the sites (site_valence, site_bv_sum).
+
+    A feature which could not be computed for a structure is NaN (0 for the
+    space group number and "" for strings), and the error raised is recorded
+    in the error column, e.g., when no valences can be assigned or when the
+    structure took longer than the timeout.
+    """
+
+    FEATURES = ("cn", "order_parameters", "spacegroup", "bond_valence")
+
+    def __init__(
+        self,
+        features=FEATURES,
+        nn=None,
+        op_types=("cn", "tet", "oct", "bcc", "q2", "q4", "q6"),
+        symprec=0.01,
+        angle_tolerance=5,
+        bv_analyzer=None,
+        ncpus=None,
+        chunk_size=100,
+        max_pending=None,
+        timeout=None,
+    ):
+        """
+        Args:
+            features ([str]): Features to compute, see FEATURES.
+            nn (NearNeighbors): Near-neighbor strategy for the coordination
+                numbers and order parameters. Defaults to CrystalNN().
+            op_types ([str]): Types of the order parameters, see
+                LocalStructOrderParams.
+            symprec (float): Tolerance for symmetry finding.
+            angle_tolerance (float): Angle tolerance for symmetry finding.
+            bv_analyzer (BVAnalyzer): Analyzer for the valences and the
+                radius of the bond valence sums. Defaults to BVAnalyzer().
+            ncpus (int): Number of processes to featurize with. Default is
+                None, which implies serial.
+            chunk_size (int): Number of structures per task and table.
+            max_pending (int): Maximum number of chunks being featurized at
+                once in parallel, which bounds the number of structures held
+                in memory. Defaults to twice ncpus.
+            timeout (float): Time in s after which the featurization of a
+                structure is aborted. Requires a platform with SIGALRM.
+                Default is None, i.e., no timeout.
+        """
+        for feature in features:
+            if feature not in self.FEATURES:
+                raise ValueError("Unknown feature {}, must be one of {}".format(feature, self.FEATURES))
+        if len(set(op_types)) != len(op_types):
+            raise ValueError("Duplicate order parameter types.")
+        self.features = list(features)
+        self.nn = nn or CrystalNN()
+        self.op_types = list(op_types)
+        self.symprec = symprec
+        self.angle_tolerance = angle_tolerance
+        self.bv_analyzer = bv_analyzer or BVAnalyzer()
+        self.ncpus = ncpus
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * (ncpus or 1)
+        self.timeout = timeout
+
+    def get_columns(self):
+        """
+        Returns the columns of the tables as a dict of column names to
+        (dtype, whether it is a site feature, missing value).
+        """
+        columns = collections.OrderedDict(
+            [
+                ("formula", (str, False, "")),
+                ("n_sites", (int, False, 0)),
+                ("error", (str, False, "")),
+                ("time", (float, False, np.nan)),
+            ]
+        )
+        if "cn" in self.features:
+            columns["site_cn"] = (float, True, np.nan)
+        if "order_parameters" in self.features:
+            for t in self.op_types:
+                columns["site_op_" + t] = (float, True, np.nan)
+        if "spacegroup" in self.features:
+            columns["spacegroup_number"] = (int, False, 0)
+            columns["spacegroup_symbol"] = (str, False, "")
+            columns["crystal_system"] = (str, False, "")
+        if "bond_valence" in self.features:
+            columns["site_valence"] = (float, True, np.nan)
+            columns["site_bv_sum"] = (float, True, np.nan)
+        return columns
+
+    def featurize_structure(self, structure):
+        """
+        Computes the features of a structure.
+
+        Args:
+            structure (Structure): Input structure.
+
+        Returns:
+            Dict of column names to values, which are arrays for the site
+            features. Features that could not be computed are missing and
+            the errors are joined in the error column.
+        """
+        row = {"formula": structure.composition.reduced_formula, "n_sites": len(structure)}
+        errors = []
+        with _time_limit(self.timeout):
+            for feature in self.features:
+                try:
+                    getattr(self, "_add_{}_features".format(feature))(structure, row)
+                except TimeoutError:
+                    raise
+                except Exception as ex:  # pylint: disable=W0703
+                    errors.append("{}: {}: {}".format(feature, ex.__class__.__name__, ex))
+        row["error"] = "; ".join(errors)
+        return row
+
+    def _add_cn_features(self, structure, row):
+        row["site_cn"] = np.array([len(nn_info) for nn_info in self.nn.get_all_nn_info(structure)], dtype=float)
+
+    def _add_order_parameters_features(self, structure, row):
+        ops = LocalStructOrderParams(self.op_types).get_all_order_parameters(structure, nn=self.nn)
+        for i, t in enumerate(self.op_types):
+            row["site_op_" + t] = ops[:, i]
+
+    def _add_spacegroup_features(self, structure, row):
+        sga = SpacegroupAnalyzer(structure, symprec=self.symprec, angle_tolerance=self.angle_tolerance)
+        row["spacegroup_number"] = sga.get_space_group_number()
+        row["spacegroup_symbol"] = sga.get_space_group_symbol()
+        row["crystal_system"] = sga.get_crystal_system()
+
+    def _add_bond_valence_features(self, structure, row):
+        bva = self.bv_analyzer
+        neighbors = structure.get_all_neighbors(bva.max_radius)
+        if structure.is_ordered:
+            bv_sums = [calculate_bv_sum(site, nn, bva.dist_scale_factor) for site, nn in zip(structure, neighbors)]
+        else:
+            bv_sums = [
+                calculate_bv_sum_unordered(site, nn, bva.dist_scale_factor) for site, nn in zip(structure, neighbors)
+            ]
+        # the sums are kept if no valences can be assigned
+        row["site_bv_sum"] = np.array(bv_sums, dtype=float)
+        valences = bva.get_valences(structure)
+        if not structure.is_ordered:
+            # occupancy-weighted valences of the species of disordered sites
+            valences = [
+                sum(occu * v for occu, v in zip(site.species.values(), site_valences))
+                for site, site_valences in zip(structure, valences)
+            ]
+        row["site_valence"] = np.array(valences, dtype=float)
+
+    def get_table(self, rows):
+        """
+        Assembles the rows of featurize_structure into a table.
+
+        Args:
+            rows ([dict]): Rows of structures.
+
+        Returns:
+            Dict of column names to numpy arrays.
+        """
+        table = collections.OrderedDict()
+        for name, (dtype, site, missing) in self.get_columns().items():
+            if site:
+                values = [row.get(name, np.full(row["n_sites"], missing)) for row in rows]
+                table[name] = np.concatenate(values).astype(dtype) if values else np.zeros(0, dtype=dtype)
+            else:
+                table[name] = np.array([row.get(name, missing) for row in rows], dtype=dtype)
+        return table
+
+    def iter_tables(self, structures):
+        """
+        Featurize structures.
+
+        Args:
+            structures: Iterable of Structures. It is only consumed as the
+                tables are.
+
+        Yields:
+            Tables of chunks of chunk_size structures, in the order of the
+            input structures.
+        """
+        # The near-neighbor information is cached for the coordination numbers
+        # and order parameters of a structure to share, off the strategy of self.
+        featurizer = copy.deepcopy(self)
+        featurizer.nn.enable_cache(maxsize=1)
+        with StatefulPool(_featurize_chunk, featurizer, ncores=self.ncpus, max_pending=self.max_pending) as pool:
+            for rows in pool.imap((chunk,) for chunk in iter_chunks(structures, self.chunk_size)):
+                yield self.get_table(rows)
+
+    def featurize(self, structures):
+        """
+        Featurize structures into a single table.
+
+        Args:
+            structures: Iterable of Structures.
+
+        Returns:
+            Table of all structures.
+        """
+        return _concatenate_tables(list(self.iter_tables(structures)), self.get_columns())
+
+    def write_npz(self, structures, filename):
+        """
+        Featurize structures and write the tables to an npz file as they are
+        computed, as arrays named <column>.<chunk number>. Use load_npz to
+        read the table of all structures.
+
+        Args:
+            structures: Iterable of Structures.
+            filename (str): Filename.
+
+        Returns:
+            Number of structures written.
+        """
+        count = 0
+        with zipfile.ZipFile(filename, "w", allowZip64=True) as zf:
+            for i, table in enumerate(self.iter_tables(structures)):
+                for name, values in table.items():
+                    with zf.open("{}.{:06d}.npy".format(name, i), "w", force_zip64=True) as f:
+                        np.lib.format.write_array(f, values, allow_pickle=False)
+                count += len(table["n_sites"])
+        return count
+
+    @staticmethod
+    def load_npz(filename):
+        """
+        Read the table of the structures of a file written by write_npz.
+
+        Args:
+            filename (str): Filename.
+
+        Returns:
+            Dict of column names to numpy arrays.
+        """
+        arrays = collections.defaultdict(list)
+        with np.load(filename, allow_pickle=False) as npz:
+            for key in sorted(npz.files, key=lambda k: int(k.rsplit(".", 1)[1])):
+                arrays[key.rsplit(".", 1)[0]].append(npz[key])
+        return collections.OrderedDict((name, np.concatenate(values)) for name, values in arrays.items())
+
+    @requires(pq, "pyarrow is required to write Parquet files.")
+    def write_parquet(self, structures, filename):
+        """
+        Featurize structures and write the tables to a Parquet file as they
+        are computed, with a row group per chunk. Site features are list
+        columns with the values of the sites of each structure.
+
+        Args:
+            structures: Iterable of Structures.
+            filename (str): Filename.
+
+        Returns:
+            Number of structures written.
+        """
+        count = 0
+        writer = None
+        try:
+            for table in self.iter_tables(structures):
+                offsets = np.concatenate([[0], np.cumsum(table["n_sites"])]).astype(np.int32)
+                columns = {
+                    name: pa.ListArray.from_arrays(offsets, values) if name.startswith("site_") else pa.array(values)
+                    for name, values in table.items()
+                }
+                batch = pa.Table.from_pydict(columns)
+                if writer is None:
+                    writer = pq.ParquetWriter(filename, batch.schema)
+                writer.write_table(batch)
+                count += len(table["n_sites"])
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+
+def _concatenate_tables(tables, columns):
+    """
+    Helper method of StructureFeaturizer to concatenate tables.
+    """
+    if not tables:
+        return collections.OrderedDict((name, np.zeros(0, dtype=dtype)) for name, (dtype, _, _) in columns.items())
+    return collections.OrderedDict((name, np.concatenate([t[name] for t in tables])) for name in tables[0])
+
+
+class _time_limit:
+    """
+    Helper context manager of StructureFeaturizer to raise a TimeoutError in
+    the main thread after timeout s.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.enabled = False
+
+    def _raise(self, signum, frame):
+        raise TimeoutError("Timed out after {} s".format(self.timeout))
+
+    def __enter__(self):
+        if not self.timeout:
+            return self
+        if not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+            warnings.warn("Timeouts require SIGALRM in the main thread and are ignored.")
+            return self
+        self.enabled = True
+        self.handler = signal.signal(signal.SIGALRM, self._raise)
+        signal.setitimer(signal.ITIMER_REAL, self.timeout)
+        return self
+
+    def __exit__(self, *args):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.handler)
+            self.enabled = False
+
+
+def _featurize_chunk(featurizer, structures):
+    """
+    Helper method of StructureFeaturizer to featurize a chunk of structures.
+
+    Args:
+        featurizer (StructureFeaturizer): Featurizer.
+        structures ([Structure]): Chunk of structures.
+
+    Returns:
+        Rows of the structures.
+    """
+    rows = []
+    for structure in structures:
+        start = time.time()
+        try:
+            row = featurizer.featurize_structure(structure)
+        except TimeoutError as ex:
+            row = {
+                "formula": structure.composition.reduced_formula,
+                "n_sites": len(structure),
+                "error": "TimeoutError: {}".format(ex),
+            }
+        row["time"] = time.time() - start
+        rows.append(row)
+    return rows
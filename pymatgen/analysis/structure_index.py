@@ -0,0 +1,231 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+This module provides a persistent index of structures for fast duplicate
+lookups with StructureMatcher against very large sets of structures.
+"""
+
+import json
+import sqlite3
+import warnings
+
+from monty.json import MontyDecoder, MontyEncoder, MSONable
+
+from pymatgen.analysis.structure_matcher import ElementComparator, FingerprintPrefilter, StructureMatcher
+from pymatgen.core.structure import Structure
+
+
+class StructureIndex(MSONable):
+    """
+    Persistent, incrementally updatable index of structures stored in a SQLite
+    database. Each structure is stored under a key made of the comparator hash
+    of its composition and (optionally) the fingerprint of a
+    FingerprintPrefilter. A query only runs StructureMatcher.fit against the
+    stored structures sharing the same key, which is found with a B-tree
+    lookup, so the cost of a query does not grow with the total number of
+    stored structures.
+
+    The structure matcher and prefilter are saved in the database the first
+    time it is created, so that keys remain consistent when it is reopened.
+
+    Usage::
+
+        with StructureIndex("structures.sqlite", prefilter=FingerprintPrefilter()) as index:
+            index.add_structures(structures, ids)
+            matching_ids = index.query(new_structure)
+    """
+
+    def __init__(self, filename=":memory:", structure_matcher=None, prefilter=None):
+        """
+        Args:
+            filename (str): Path to the SQLite database. Created if it does not
+                exist. Defaults to an in-memory database.
+            structure_matcher (StructureMatcher): Matcher used to compare
+                structures. Defaults to the one saved in the database, or to
+                StructureMatcher(comparator=ElementComparator()) for a new
+                database.
+            prefilter (FingerprintPrefilter): Prefilter used to split the
+                composition buckets. Defaults to the one saved in the
+                database, or to no prefilter for a new database.
+        """
+        self.filename = str(filename)
+        self._db = sqlite3.connect(self.filename)
+        self._db.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS structures (id TEXT UNIQUE, key TEXT NOT NULL, structure TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS key_index ON structures (key)")
+
+        settings = dict(self._db.execute("SELECT name, value FROM settings"))
+        if not settings:
+            structure_matcher = structure_matcher or StructureMatcher(comparator=ElementComparator())
+            self._db.executemany(
+                "INSERT INTO settings VALUES (?, ?)",
+                [
+                    ("structure_matcher", json.dumps(structure_matcher, cls=MontyEncoder)),
+                    ("prefilter", json.dumps(prefilter, cls=MontyEncoder)),
+                ],
+            )
+            self._db.commit()
+        else:
+            for name, value in [("structure_matcher", structure_matcher), ("prefilter", prefilter)]:
+                if value is not None and json.dumps(value, cls=MontyEncoder) != settings[name]:
+                    raise ValueError("{} differs from the one used to build {}".format(name, self.filename))
+            structure_matcher = json.loads(settings["structure_matcher"], cls=MontyDecoder)
+            prefilter = json.loads(settings["prefilter"], cls=MontyDecoder)
+        self.structure_matcher = structure_matcher
+        self.prefilter = prefilter
+
+    def get_key(self, structure):
+        """
+        Args:
+            structure (Structure): Input structure.
+
+        Returns:
+            Key (str) under which the structure is stored. Only structures
+            with the same key are compared in a query.
+        """
+        s = self.structure_matcher._process_species([structure])[0]
+        key = [str(self.structure_matcher._comparator.get_hash(s.composition))]
+        if self.prefilter is not None:
+            key.append(self.prefilter.get_fingerprint(s))
+        return json.dumps(key)
+
+    def add(self, structure, structure_id=None):
+        """
+        Add a structure to the index.
+
+        Args:
+            structure (Structure): Structure to add.
+            structure_id (str): Unique id of the structure. Defaults to the
+                row number in the database.
+
+        Returns:
+            Id of the added structure.
+        """
+        return self.add_structures([structure], None if structure_id is None else [structure_id])[0]
+
+    def add_structures(self, structures, structure_ids=None):
+        """
+        Add many structures to the index in a single transaction.
+
+        Args:
+            structures ([Structure]): Structures to add.
+            structure_ids ([str]): Unique ids of the structures. Defaults to
+                the row numbers in the database.
+
+        Returns:
+            List of the ids of the added structures.
+        """
+        structures = list(structures)
+        if structure_ids is None:
+            structure_ids = [None] * len(structures)
+        ids = []
+        with self._db:
+            for s, structure_id in zip(structures, structure_ids):
+                cursor = self._db.execute(
+                    "INSERT INTO structures VALUES (?, ?, ?)",
+                    (structure_id, self.get_key(s), json.dumps(s.as_dict())),
+                )
+                if structure_id is None:
+                    structure_id = str(cursor.lastrowid)
+                    self._db.execute("UPDATE structures SET id = ? WHERE rowid = ?", (structure_id, cursor.lastrowid))
+                ids.append(str(structure_id))
+        return ids
+
+    def remove(self, structure_id):
+        """
+        Remove a structure from the index.
+
+        Args:
+            structure_id (str): Id of the structure to remove.
+        """
+        with self._db:
+            self._db.execute("DELETE FROM structures WHERE id = ?", (str(structure_id),))
+
+    def query(self, structure, first_match_only=False):
+        """
+        Find stored structures matching a structure.
+
+        Args:
+            structure (Structure): Structure to look up.
+            first_match_only (bool): Whether to stop at the first match.
+                Useful to only test for the presence of a structure.
+
+        Returns:
+            List of ids of the matching stored structures.
+        """
+        matches = []
+        for structure_id, d in self._db.execute(
+            "SELECT id, structure FROM structures WHERE key = ?", (self.get_key(structure),)
+        ):
+            if self.structure_matcher.fit(Structure.from_dict(json.loads(d)), structure):
+                matches.append(structure_id)
+                if first_match_only:
+                    break
+        return matches
+
+    def get_structure(self, structure_id):
+        """
+        Args:
+            structure_id (str): Id of a stored structure.
+
+        Returns:
+            Stored Structure.
+        """
+        row = self._db.execute("SELECT structure FROM structures WHERE id = ?", (str(structure_id),)).fetchone()
+        if row is None:
+            raise KeyError(structure_id)
+        return Structure.from_dict(json.loads(row[0]))
+
+    def __contains__(self, structure):
+        return len(self.query(structure, first_match_only=True)) > 0
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM structures").fetchone()[0]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def as_dict(self):
+        """
+        Returns: MSONable dict. Only the filename and settings are serialized,
+        the structures stay in the database. The structures of an in-memory
+        database are hence lost, and a warning is issued.
+        """
+        if self.filename in (":memory:", ""):
+            warnings.warn("The structures of an in-memory StructureIndex are not serialized, use a database file.")
+        return {
+            "@module": self.__class__.__module__,
+            "@class": self.__class__.__name__,
+            "filename": self.filename,
+            "structure_matcher": self.structure_matcher.as_dict(),
+            "prefilter": None if self.prefilter is None else self.prefilter.as_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Args:
+            d (dict): Dict representation.
+
+        Returns:
+            StructureIndex
+        """
+        prefilter = d["prefilter"]
+        return cls(
+            d["filename"],
+            structure_matcher=StructureMatcher.from_dict(d["structure_matcher"]),
+            prefilter=None if prefilter is None else FingerprintPrefilter.from_dict(prefilter),
+        )
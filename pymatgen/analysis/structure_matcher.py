@@ -8,6 +8,8 @@ This module provides classes to perform fitting of structures.
 
 import abc
 import itertools
+import logging
+from multiprocessing import Pool
 
 import numpy as np
 from monty.json import MSONable
@@ -33,6 +35,8 @@ __email__ = "wrichard@mit.edu"
 __status__ = "Production"
 __date__ = "Dec 3, 2012"
 
+logger = logging.getLogger(__name__)
+
 
 class AbstractComparator(MSONable, metaclass=abc.ABCMeta):
     """
@@ -790,14 +794,26 @@ class StructureMatcher(MSONable):
 
         return None
 
-    def group_structures(self, s_list, anonymous=False):
+    def group_structures(self, s_list, anonymous=False, prefilter=None, ncpus=None):
         """
         Given a list of structures, use fit to group
         them by structural equality.
 
+        Structures are first bucketed by the comparator hash of their
+        composition (and by the fingerprint of the prefilter, if supplied).
+        Pairwise fitting is only performed within a bucket, and buckets are
+        independent so they can be matched in parallel. The output does not
+        depend on ncpus.
+
         Args:
             s_list ([Structure]): List of structures to be grouped
             anonymous (bool): Whether to use anonymous mode.
+            prefilter (FingerprintPrefilter): Optional prefilter providing
+                cheap structural invariants that further split the
+                composition buckets. Structures with different fingerprints
+                are never fitted against each other.
+            ncpus (int): Number of processes used to compute fingerprints and
+                to match buckets. Default of None means serial processing.
 
         Returns:
             A list of lists of matched structures
@@ -822,31 +838,48 @@ class StructureMatcher(MSONable):
         def s_hash(s):
             return c_hash(s[1].composition)
 
-        sorted_s_list = sorted(enumerate(s_list), key=s_hash)
-        all_groups = []
-
-        # For each pre-grouped list of structures, perform actual matching.
-        for k, g in itertools.groupby(sorted_s_list, key=s_hash):
-            unmatched = list(g)
-            while len(unmatched) > 0:
-                i, refs = unmatched.pop(0)
-                matches = [i]
-                if anonymous:
-                    inds = filter(
-                        lambda i: self.fit_anonymous(refs, unmatched[i][1]),
-                        list(range(len(unmatched))),
-                    )
+        pool = Pool(ncpus) if ncpus else None
+        try:
+            if prefilter is not None:
+                if pool:
+                    fingerprints = pool.map(prefilter.get_fingerprint, s_list, chunksize=max(1, len(s_list) // ncpus))
                 else:
-                    inds = filter(
-                        lambda i: self.fit(refs, unmatched[i][1]),
-                        list(range(len(unmatched))),
-                    )
-                inds = list(inds)
-                matches.extend([unmatched[i][0] for i in inds])
-                unmatched = [unmatched[i] for i in range(len(unmatched)) if i not in inds]
-                all_groups.append([original_s_list[i] for i in matches])
+                    fingerprints = [prefilter.get_fingerprint(s) for s in s_list]
+            else:
+                fingerprints = [None] * len(s_list)
+
+            sorted_s_list = sorted(enumerate(s_list), key=s_hash)
+            buckets = []
+            for k, g in itertools.groupby(sorted_s_list, key=s_hash):
+                sub_buckets = {}
+                for i, s in g:
+                    sub_buckets.setdefault(fingerprints[i], []).append((i, s))
+                buckets.extend(sub_buckets.values())
+            logger.info(
+                "Grouping {} structures in {} buckets (largest: {})".format(
+                    len(s_list), len(buckets), max([len(b) for b in buckets], default=0)
+                )
+            )
 
-        return all_groups
+            # For each pre-grouped list of structures, perform actual matching.
+            # Largest buckets are dispatched first for better load balancing,
+            # but results are collected in bucket order.
+            tasks = [(self, b, anonymous) for b in buckets]
+            order = sorted(range(len(tasks)), key=lambda j: -len(buckets[j]))
+            if pool:
+                results = pool.imap(_group_bucket, [tasks[j] for j in order])
+            else:
+                results = map(_group_bucket, [tasks[j] for j in order])
+            bucket_groups = [None] * len(buckets)
+            for n, (j, groups) in enumerate(zip(order, results)):
+                bucket_groups[j] = groups
+                logger.debug("Matched bucket {}/{} of size {}".format(n + 1, len(buckets), len(buckets[j])))
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        return [[original_s_list[i] for i in group] for groups in bucket_groups for group in groups]
 
     def as_dict(self):
         """
@@ -1195,6 +1228,93 @@ class StructureMatcher(MSONable):
         return match[4]
 
 
+class FingerprintPrefilter(MSONable):
+    """
+    Cheap structural invariants used by StructureMatcher.group_structures to
+    split structures of the same composition into smaller buckets before the
+    pairwise fits. Structures with different fingerprints are never fitted
+    against each other, so this trades a small risk of missing borderline
+    matches (e.g., two structures whose space group differs at the chosen
+    symprec) for a large reduction in the number of fit calls when grouping
+    many structures.
+    """
+
+    def __init__(self, symprec=0.1, volume_tol=None, nn_tol=None):
+        """
+        Args:
+            symprec (float): Tolerance used to determine the space group
+                number, which is part of the fingerprint. Set to None to
+                not use the space group.
+            volume_tol (float): If set, the volume per atom binned in steps
+                of volume_tol (in Angstrom^3) is part of the fingerprint.
+                Only use this with a StructureMatcher with scale=False.
+            nn_tol (float): If set, the histogram of nearest neighbor
+                distances, normalized by the average free length per atom
+                (V / Nsites) ** (1/3) and binned in steps of nn_tol, is part
+                of the fingerprint. The normalization makes it insensitive to
+                volume scaling and the choice of supercell.
+        """
+        self.symprec = symprec
+        self.volume_tol = volume_tol
+        self.nn_tol = nn_tol
+
+    def get_fingerprint(self, structure):
+        """
+        Args:
+            structure (Structure): Input structure.
+
+        Returns:
+            Hashable fingerprint of the structure.
+        """
+        fingerprint = []
+        if self.symprec is not None:
+            from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
+
+            try:
+                fingerprint.append(SpacegroupAnalyzer(structure, symprec=self.symprec).get_space_group_number())
+            except Exception:
+                # spglib fails for some pathological structures. These are
+                # put together in their own bucket.
+                fingerprint.append(None)
+        if self.volume_tol is not None:
+            fingerprint.append(int(round(structure.volume / len(structure) / self.volume_tol)))
+        if self.nn_tol is not None:
+            norm = (structure.volume / len(structure)) ** (1 / 3)
+            r = 2 * norm
+            center_indices, _, _, distances = structure.get_neighbor_list(r)
+            nn_dists = np.full(len(structure), r)
+            np.minimum.at(nn_dists, center_indices, distances)
+            bins = np.floor(nn_dists / norm / self.nn_tol).astype(int)
+            values, counts = np.unique(bins, return_counts=True)
+            fingerprint.append(tuple(zip(values.tolist(), np.round(counts / len(structure), 3).tolist())))
+        return tuple(fingerprint)
+
+
+def _group_bucket(args):
+    """
+    Greedy grouping of a single bucket of structures. Module-level function
+    so that it can be used with multiprocessing.
+
+    Args:
+        args: Tuple of (StructureMatcher, [(index, Structure)], anonymous).
+
+    Returns:
+        List of groups, each a list of the indices of matched structures.
+    """
+    matcher, bucket, anonymous = args
+    fit = matcher.fit_anonymous if anonymous else matcher.fit
+    groups = []
+    unmatched = list(bucket)
+    while len(unmatched) > 0:
+        i, refs = unmatched.pop(0)
+        matches = [i]
+        inds = {j for j in range(len(unmatched)) if fit(refs, unmatched[j][1])}
+        matches.extend([unmatched[j][0] for j in sorted(inds)])
+        unmatched = [unmatched[j] for j in range(len(unmatched)) if j not in inds]
+        groups.append(matches)
+    return groups
+
+
 class PointDefectComparator(MSONable):
     """
     A class that matches pymatgen Point Defect objects even if their
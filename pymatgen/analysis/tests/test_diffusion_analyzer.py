@@ -15,11 +15,15 @@ from monty.tempfile import ScratchDir
 
 from pymatgen.analysis.diffusion_analyzer import (
     DiffusionAnalyzer,
+    _analyze_run,
     fit_arrhenius,
+    get_arrhenius_analysis,
     get_conversion_factor,
+    get_msd_fft,
 )
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Structure
+from pymatgen.core.trajectory import Trajectory
 from pymatgen.util.testing import PymatgenTest
 
 
@@ -48,6 +52,15 @@ class FuncTest(unittest.TestCase):
         self.assertAlmostEqual(r2[1], 10)
         self.assertEqual(r2[2], None)
 
+    def test_get_msd_fft(self):
+        disp = np.cumsum(np.random.RandomState(0).randn(4, 100, 3), axis=1)
+        timesteps = [0, 1, 10, 99]
+        msd = get_msd_fft(disp, timesteps, chunk_size=3)
+        self.assertEqual(msd.shape, (4, 4, 3))
+        for i, n in enumerate(timesteps):
+            expected = np.average((disp[:, n:] - disp[:, : 100 - n]) ** 2, axis=1)
+            np.testing.assert_allclose(msd[:, i], expected, atol=1e-10)
+
 
 class DiffusionAnalyzerTest(PymatgenTest):
     def test_init(self):
@@ -486,6 +499,97 @@ class DiffusionAnalyzerTest(PymatgenTest):
             np.array([[0.0, 0.0, 0.0], [0.21, 0.21, 0.21], [0.40, 0.40, 0.40]]),
         )
 
+    def test_from_trajectory(self):
+        with open(os.path.join(PymatgenTest.TEST_FILES_DIR, "DiffusionAnalyzer.json")) as f:
+            d = DiffusionAnalyzer.from_dict(json.load(f))
+        structures = list(d.get_drift_corrected_structures())
+        ref = DiffusionAnalyzer.from_structures(structures, d.specie, d.temperature, d.time_step, d.step_skip)
+
+        frac_coords = np.array([s.frac_coords for s in structures])
+        a = DiffusionAnalyzer.from_frac_coords(
+            structures[0], frac_coords, d.specie, d.temperature, d.time_step, d.step_skip, chunk_size=7
+        )
+        self.assertArrayAlmostEqual(a.disp, ref.disp)
+        self.assertAlmostEqual(a.diffusivity, ref.diffusivity)
+        self.assertAlmostEqual(a.chg_diffusivity, ref.chg_diffusivity)
+        self.assertEqual(a.lattices.shape, (1, 3, 3))
+
+        traj = Trajectory.from_structures(structures, time_step=d.time_step)
+        a = DiffusionAnalyzer.from_trajectory(traj, d.specie, d.temperature, step_skip=d.step_skip)
+        self.assertArrayAlmostEqual(a.disp, ref.disp)
+        self.assertAlmostEqual(a.conductivity, ref.conductivity)
+
+        # Blocks of a trajectory, some in displacement mode
+        blocks = [traj[i : i + 300] for i in range(0, len(traj), 300)]
+        blocks[1].to_displacements()
+        a = DiffusionAnalyzer.from_trajectory(blocks, d.specie, d.temperature, step_skip=d.step_skip)
+        self.assertArrayAlmostEqual(a.disp, ref.disp)
+        self.assertArrayAlmostEqual(a.msd, ref.msd)
+        self.assertArrayAlmostEqual(a.mscd, ref.mscd)
+
+        traj.time_step = None
+        self.assertRaises(ValueError, DiffusionAnalyzer.from_trajectory, traj, d.specie, d.temperature)
+
+    def test_from_frac_coords_npt(self):
+        frac_coords = np.array([[[0.0, 0.0, 0.0], [x, x, x]] for x in [0.5, 0.6, 0.7]])
+        lattices = np.array([np.eye(3) * 2.0, np.eye(3) * 2.1, np.eye(3) * 2.0])
+        s = Structure(lattices[0], ["F", "Li"], frac_coords[0])
+        d = DiffusionAnalyzer.from_frac_coords(s, frac_coords, "Li", 500.0, 2.0, 1, lattices=lattices, smoothed=None)
+        self.assertArrayAlmostEqual(d.disp[1], [[0.0, 0.0, 0.0], [0.21, 0.21, 0.21], [0.40, 0.40, 0.40]])
+        self.assertArrayAlmostEqual(d.lattices, np.concatenate([lattices[:1], lattices]))
+
+    def test_get_arrhenius_analysis(self):
+        with open(os.path.join(PymatgenTest.TEST_FILES_DIR, "DiffusionAnalyzer.json")) as f:
+            d = DiffusionAnalyzer.from_dict(json.load(f))
+        structures = list(d.get_drift_corrected_structures())
+        time_step = d.time_step * d.step_skip
+        with ScratchDir("."):
+            runs = {}
+            for temperature, nsteps in [(1000, 1000), (600, 600), (800, 800)]:
+                os.makedirs(os.path.join(str(temperature), "run1"))
+                traj = Trajectory.from_structures(structures[:nsteps])
+                traj.write_Xdatcar(os.path.join(str(temperature), "run1", "XDATCAR"))
+                runs[temperature] = str(temperature)
+            self.assertRaises(ValueError, get_arrhenius_analysis, runs, "Li", step_skip=1)
+
+            result = get_arrhenius_analysis(runs, "Li", step_skip=1, time_step=time_step, new_temp=300)
+            parallel = get_arrhenius_analysis(
+                runs, "Li", step_skip=1, time_step=time_step, ncores=2, return_analyzers=True
+            )
+
+            # A run split over files of odd length, read with step_skip.
+            split_runs = {800: "800", 600: []}
+            for i, frames in enumerate([slice(0, 301), slice(301, 600)]):
+                traj = Trajectory.from_structures(structures[frames])
+                traj.write_Xdatcar("XDATCAR_{}".format(i))
+                split_runs[600].append("XDATCAR_{}".format(i))
+            split = get_arrhenius_analysis(split_runs, "Li", step_skip=2, time_step=time_step, return_analyzers=True)
+
+            # Only the results of the analyzers are returned by the workers by default.
+            _, analysis, _, _ = _analyze_run((600, "600", "Li", 1, time_step, False, {}))
+            self.assertNotIn("analyzer", analysis)
+            self.assertAlmostEqual(analysis["diffusivity"], result["diffusivities"][0])
+
+        self.assertEqual(result["temperatures"], [600, 800, 1000])
+        self.assertNotIn("analyzers", result)
+        diffusivities = []
+        for temperature, nsteps in [(600, 600), (800, 800), (1000, 1000)]:
+            ref = DiffusionAnalyzer.from_structures(structures[:nsteps], "Li", temperature, time_step, 1)
+            diffusivities.append(ref.diffusivity)
+            self.assertAlmostEqual(parallel["analyzers"][temperature].conductivity, ref.conductivity, 3)
+            self.assertEqual(result["summaries"][temperature]["temperature"], temperature)
+        self.assertArrayAlmostEqual(result["diffusivities"], diffusivities, 10)
+        self.assertArrayAlmostEqual(parallel["diffusivities"], result["diffusivities"])
+        ea, c, _ = fit_arrhenius([600, 800, 1000], diffusivities)
+        self.assertAlmostEqual(result["Ea"], ea, 4)
+        self.assertAlmostEqual(result["c"], c, 4)
+        self.assertGreater(result["extrapolated_conductivity"], 0)
+        ref = DiffusionAnalyzer.from_structures(structures[:600:2], "Li", 600, time_step, 2)
+        self.assertAlmostEqual(split["analyzers"][600].diffusivity, ref.diffusivity, 10)
+        self.assertArrayAlmostEqual(split["analyzers"][600].disp, ref.disp, 4)
+        self.assertEqual(set(result["timing"]["parse"]), {600, 800, 1000})
+        self.assertGreaterEqual(result["timing"]["total"], result["timing"]["fit"])
+
 
 if __name__ == "__main__":
     unittest.main()
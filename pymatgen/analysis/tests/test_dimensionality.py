@@ -13,7 +13,7 @@ from pymatgen.analysis.dimensionality import (
     get_structure_components,
     zero_d_graph_to_molecule_graph,
 )
-from pymatgen.analysis.graphs import StructureGraph
+from pymatgen.analysis.graphs import SparseStructureGraph, StructureGraph
 from pymatgen.analysis.local_env import CrystalNN
 from pymatgen.core.structure import Structure
 from pymatgen.util.testing import PymatgenTest
@@ -59,6 +59,8 @@ class LarsenDimensionalityTest(PymatgenTest):
         self.assertEqual(get_dimensionality_larsen(self.lifepo), 3)
         self.assertEqual(get_dimensionality_larsen(self.graphite), 2)
         self.assertEqual(get_dimensionality_larsen(self.cscl), 3)
+        for sg, dimensionality in [(self.lifepo, 3), (self.graphite, 2), (self.tricky_structure, 3)]:
+            self.assertEqual(get_dimensionality_larsen(SparseStructureGraph.from_structure_graph(sg)), dimensionality)
 
     def test_tricky_structure(self):
         """
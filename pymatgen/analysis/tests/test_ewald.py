@@ -9,7 +9,7 @@ import warnings
 
 import numpy as np
 
-from pymatgen.analysis.ewald import EwaldMinimizer, EwaldSummation
+from pymatgen.analysis.ewald import EwaldEnergyUpdater, EwaldMinimizer, EwaldSummation
 from pymatgen.io.vasp.inputs import Poscar
 from pymatgen.util.testing import PymatgenTest
 
@@ -87,6 +87,73 @@ class EwaldSummationTest(unittest.TestCase):
         self.assertEqual(d["recip_space_cut"], ham._gmax)
         self.assertEqual(ham.as_dict(), EwaldSummation.from_dict(d).as_dict())
 
+    def test_energy_only(self):
+        ham = EwaldSummation(self.s, compute_forces=True)
+        ham2 = EwaldSummation(self.s, compute_forces=True, energy_only=True, block_size=7)
+        self.assertAlmostEqual(ham2.real_space_energy, ham.real_space_energy, 8)
+        self.assertAlmostEqual(ham2.reciprocal_space_energy, ham.reciprocal_space_energy, 8)
+        self.assertAlmostEqual(ham2.total_energy, ham.total_energy, 8)
+        np.testing.assert_allclose(ham2.forces, ham.forces, atol=1e-8)
+        self.assertRaises(AttributeError, getattr, ham2, "total_energy_matrix")
+        self.assertRaises(AttributeError, ham2.get_site_energy, 0)
+
+        ham3 = EwaldSummation.from_dict(ham2.as_dict())
+        self.assertTrue(ham3._energy_only)
+        self.assertAlmostEqual(ham3.total_energy, ham.total_energy, 8)
+
+    def test_block_size(self):
+        ham = EwaldSummation(self.s, compute_forces=True)
+        ham2 = EwaldSummation(self.s, compute_forces=True, block_size=5, nthreads=2)
+        np.testing.assert_allclose(ham2.total_energy_matrix, ham.total_energy_matrix, atol=1e-10)
+        np.testing.assert_allclose(ham2.forces, ham.forces, atol=1e-10)
+
+
+class EwaldEnergyUpdaterTest(unittest.TestCase):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        filepath = os.path.join(PymatgenTest.TEST_FILES_DIR, "POSCAR")
+        s = Poscar.from_file(filepath, check_for_POTCAR=False).structure
+        s.add_oxidation_state_by_element({"Li": 1, "Fe": 2, "P": 5, "O": -2})
+        self.ewald = EwaldSummation(s)
+        self.matrix = self.ewald.total_energy_matrix
+
+    def tearDown(self):
+        warnings.simplefilter("default")
+
+    def get_energy(self, scales):
+        return np.dot(scales, np.dot(self.matrix, scales))
+
+    def test_moves(self):
+        updater = EwaldEnergyUpdater(self.matrix)
+        self.assertAlmostEqual(updater.energy, np.sum(self.matrix), 8)
+
+        removals = [[0, 1], [2, 3], [1, 3]]
+        for indices, de in zip(removals, updater.get_removal_energies(removals)):
+            self.assertAlmostEqual(updater.energy + de, self.ewald.compute_partial_energy(indices), 8)
+        self.assertAlmostEqual(
+            updater.energy + updater.get_removal_energies([0, 1]), self.ewald.compute_partial_energy([0, 1]), 8
+        )
+
+        self.assertAlmostEqual(
+            updater.apply_move([0, 2], [0, 0.5]), self.get_energy(updater.scales) - np.sum(self.matrix), 8
+        )
+        self.assertAlmostEqual(updater.energy, self.get_energy(updater.scales), 8)
+
+        # swaps of a removed site with full and half scaled sites
+        des = updater.get_swap_energies([0, 0, 0], [1, 4, 2])
+        for j, de in zip([1, 4, 2], des):
+            scales = updater.scales
+            scales[[0, j]] = scales[[j, 0]]
+            self.assertAlmostEqual(updater.energy + de, self.get_energy(scales), 8)
+            self.assertAlmostEqual(updater.get_move_energies([0, j], scales[[0, j]]), de, 8)
+
+    def test_get_energies(self):
+        updater = EwaldEnergyUpdater(self.matrix, scales=np.linspace(0, 1, len(self.matrix)))
+        self.assertAlmostEqual(updater.energy, self.get_energy(np.linspace(0, 1, len(self.matrix))), 8)
+        scales = np.random.RandomState(0).rand(20, len(self.matrix))
+        energies = updater.get_energies(scales, chunk_size=7)
+        np.testing.assert_allclose(energies, [self.get_energy(s) for s in scales])
+
 
 class EwaldMinimizerTest(unittest.TestCase):
     def setUp(self):
@@ -119,6 +186,35 @@ class EwaldMinimizerTest(unittest.TestCase):
         self.assertAlmostEqual(e_min.minimized_sum, 111.63, 3, "Returned wrong minimum value")
         self.assertEqual(len(e_min.best_m_list), 6, "Returned wrong number of permutations")
 
+    def test_algos(self):
+        matrix = np.random.RandomState(0).rand(16, 16) * 10 - 3
+        m_list = [[0, 3, list(range(8)), None], [0.5, 2, list(range(8, 16)), "a"]]
+
+        e_min = EwaldMinimizer(matrix, m_list, 10)
+        self.assertTrue(e_min.complete)
+        sums = [output[0] for output in e_min.output_lists]
+        self.assertEqual(len(sums), 10)
+        self.assertEqual(len(m_list[0][2]), 8, "Input m_list modified")
+
+        e_min2 = EwaldMinimizer(matrix, m_list, 10, algo=EwaldMinimizer.ALGO_COMPLETE)
+        np.testing.assert_allclose([output[0] for output in e_min2.output_lists], sums)
+        e_min2 = EwaldMinimizer(matrix, m_list, 10, ncpus=2)
+        np.testing.assert_allclose([output[0] for output in e_min2.output_lists], sums)
+        self.assertTrue(e_min2.complete)
+
+        # best ordering found within the node budget
+        e_min2 = EwaldMinimizer(matrix, m_list, 10, max_nodes=20)
+        self.assertFalse(e_min2.complete)
+        self.assertEqual(e_min2.nodes, 20)
+        self.assertGreaterEqual(e_min2.minimized_sum, e_min.minimized_sum - 1e-8)
+        self.assertEqual(len(e_min2.best_m_list), 5)
+
+        # only the last pass of the top levels counts against the budget in
+        # parallel, leaving nodes for the subtrees
+        e_min2 = EwaldMinimizer(matrix, m_list, 10, ncpus=2, max_nodes=20)
+        self.assertFalse(e_min2.complete)
+        self.assertGreater(len(e_min2.output_lists), 0)
+
     def test_site(self):
         """Test that uses an uncharged structure"""
         filepath = os.path.join(PymatgenTest.TEST_FILES_DIR, "POSCAR")
@@ -511,6 +511,110 @@ from    to  to_image
         self.assertListEqual(types_anonymous, ["A-B(3)", "A-B(6)"])
 
 
+class SparseStructureGraphTest(PymatgenTest):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        structure = Structure(Lattice.tetragonal(5.0, 50.0), ["H"], [[0, 0, 0]])
+        self.square_sg = SparseStructureGraph.with_edges(
+            structure,
+            {
+                (0, 0, (0, 0, 0), (1, 0, 0)): None,
+                (0, 0, (0, 0, 0), (-1, 0, 0)): None,
+                (0, 0, (0, 0, 0), (0, 1, 0)): None,
+                (0, 0, (0, 0, 0), (0, -1, 0)): {"weight": 1.5},
+            },
+        )
+        self.structure = Structure.from_file(os.path.join(PymatgenTest.TEST_FILES_DIR, "critic2", "MoS2.cif"))
+        self.mos2_sg = SparseStructureGraph.with_local_env_strategy(self.structure, MinimumDistanceNN())
+
+    def tearDown(self):
+        warnings.simplefilter("default")
+
+    def test_edge_editing(self):
+        sg = SparseStructureGraph.with_empty_graph(self.square_sg.structure)
+        sg.add_edge(0, 0, to_jimage=(1, 0, 0))
+        sg.add_edge(0, 0, from_jimage=(1, 0, 0), to_jimage=(0, 0, 0), weight=2)
+        sg.add_edge(0, 0, to_jimage=(1, 0, 0))
+        self.assertEqual(sg.num_edges, 2)
+        self.assertEqual(sg.get_coordination_of_site(0), 2)
+        self.assertRaises(ValueError, sg.add_edge, 0, 0)
+        self.assertRaises(ValueError, sg.add_edge, 0, 1, to_jimage=(0, 0, 0))
+        sg.break_edge(0, 0, to_jimage=(-1, 0, 0))
+        self.assertEqual(sg.get_connected_sites(0)[0].jimage, (1, 0, 0))
+        self.assertRaises(ValueError, sg.break_edge, 0, 0, to_jimage=(-1, 0, 0))
+
+        sg = SparseStructureGraph.with_empty_graph(self.structure)
+        sg.add_edges([2, 0], [0, 2], [[0, 1, 0], [0, -1, 0]], weight=[1, None])
+        self.assertArrayEqual(sg.to_jimage, [[0, -1, 0]])
+        self.assertEqual(sg.get_connected_sites(2)[0].weight, 1)
+
+    def test_conversion(self):
+        sg = StructureGraph.with_local_env_strategy(self.structure, MinimumDistanceNN())
+        self.assertEqual(SparseStructureGraph.from_structure_graph(sg), self.mos2_sg)
+        self.assertEqual(self.mos2_sg.to_structure_graph(), sg)
+        self.assertEqual(SparseStructureGraph.from_dict(self.square_sg.as_dict()), self.square_sg)
+        for n in range(len(self.structure)):
+            self.assertEqual(self.mos2_sg.get_coordination_of_site(n), sg.get_coordination_of_site(n))
+            connected_sites = self.mos2_sg.get_connected_sites(n, jimage=(0, 1, 0))
+            self.assertEqual(
+                [(s.index, s.jimage) for s in connected_sites],
+                [(s.index, s.jimage) for s in sg.get_connected_sites(n, jimage=(0, 1, 0))],
+            )
+        self.assertArrayEqual(self.mos2_sg.get_coordination_numbers(), [6, 3, 3])
+        self.assertEqual(self.square_sg.get_coordination_of_site(0), 4)
+        self.assertEqual(self.mos2_sg.diff(SparseStructureGraph.from_structure_graph(sg))["dist"], 0)
+
+    def test_mul(self):
+        square_sg_mul = self.square_sg * (2, 1, 1)
+        self.assertEqual(
+            "\n".join(str(square_sg_mul).splitlines()[-6:]),
+            """   0     0  (0, 1, 0)     0.000e+00
+   0     0  (0, -1, 0)    1.500e+00
+   0     1  (0, 0, 0)     0.000e+00
+   0     1  (-1, 0, 0)    0.000e+00
+   1     1  (0, 1, 0)     0.000e+00
+   1     1  (0, -1, 0)    1.500e+00""",
+        )
+        self.assertEqual((self.square_sg * (2, 2, 1)) * (2, 2, 1), self.square_sg * (4, 4, 1))
+
+        mos2_sg_mul = self.mos2_sg * (3, 3, 1)
+        for idx in mos2_sg_mul.structure.indices_from_symbol("Mo"):
+            self.assertEqual(mos2_sg_mul.get_coordination_of_site(idx), 6)
+        mos2_sg_premul = SparseStructureGraph.with_local_env_strategy(self.structure * (3, 3, 1), MinimumDistanceNN())
+        self.assertEqual(mos2_sg_mul, mos2_sg_premul)
+
+        scaling_matrix = [[1, 1, 0], [-1, 1, 0], [0, 0, 2]]
+        mos2_sg_premul = SparseStructureGraph.with_local_env_strategy(
+            self.structure * scaling_matrix, MinimumDistanceNN()
+        )
+        self.assertEqual(self.mos2_sg * scaling_matrix, mos2_sg_premul)
+        diff = mos2_sg_premul.diff(self.mos2_sg * (2, 1, 1), strict=False)
+        self.assertEqual(diff["both"], {("Mo", "S")})
+
+    def test_components(self):
+        self.assertEqual(self.square_sg.get_dimensionality(), 2)
+        self.assertEqual(self.mos2_sg.get_dimensionality(), 2)
+        sg = self.mos2_sg * (2, 2, 2)
+        self.assertEqual([len(c) for c in sg.get_connected_components()], [12, 12])
+        self.assertArrayEqual(sg.get_component_dimensionalities(), [2, 2])
+
+        structure = Structure.from_file(os.path.join(PymatgenTest.TEST_FILES_DIR, "H6PbCI3N_mp-977013_symmetrized.cif"))
+        sg = SparseStructureGraph.with_local_env_strategy(structure, MinimumDistanceNN())
+        self.assertArrayEqual(sg.get_component_dimensionalities(), [0, 3])
+        molecules = (sg * (2, 1, 1)).get_subgraphs_as_molecules()
+        self.assertEqual(len(molecules), 1)
+        self.assertEqual(molecules[0].composition.formula, "H3 C1")
+        self.assertArrayAlmostEqual(
+            sorted(molecules[0].distance_matrix[0]),
+            sorted(
+                StructureGraph.with_local_env_strategy(structure, MinimumDistanceNN())
+                .get_subgraphs_as_molecules()[0]
+                .distance_matrix[0]
+            ),
+        )
+        self.assertEqual(len(self.mos2_sg.get_subgraphs_as_molecules()), 0)
+
+
 class MoleculeGraphTest(unittest.TestCase):
     def setUp(self):
 
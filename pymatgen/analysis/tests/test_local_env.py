@@ -628,6 +628,42 @@ class NearNeighborTest(PymatgenTest):
                 self.assertEqual(nn_info[0]["site_index"], 1)
                 self.assertEqual(nn_info[0]["image"][0], 1)
 
+    def test_cache(self):
+        nn = MinimumDistanceNN()
+        self.assertIsNone(nn.cache_info())
+        nn.enable_cache(maxsize=2)
+        self.assertEqual(nn, MinimumDistanceNN())
+
+        nn_info = nn.get_nn_info(self.diamond, 0)
+        self.assertEqual(nn.get_cn(self.diamond, 0), 4)
+        self.assertEqual(nn.cache_info(), {"hits": 1, "misses": 1, "maxsize": 2, "currsize": 1})
+        # copies are returned
+        weight = nn_info[0]["weight"]
+        nn_info[0]["weight"] = 0
+        self.assertEqual(nn.get_nn_info(self.diamond, 0)[0]["weight"], weight)
+
+        # a different structure or different parameters are not hits
+        diamond = self.diamond.copy()
+        diamond.perturb(0.01)
+        nn.get_nn_info(diamond, 0)
+        nn.tol = 0.2
+        nn.get_nn_info(self.diamond, 0)
+        self.assertEqual(nn.cache_info(), {"hits": 2, "misses": 3, "maxsize": 2, "currsize": 2})
+
+        # a whole-structure call is a single entry, without those of its sites
+        self.assertEqual(len(nn.get_all_nn_info(self.diamond)), 2)
+        self.assertEqual(nn.cache_info(), {"hits": 2, "misses": 4, "maxsize": 2, "currsize": 2})
+        self.assertEqual(len(nn.get_all_nn_info(self.diamond)), 2)
+        self.assertEqual(nn.cache_info()["hits"], 3)
+        self.assertEqual(site_is_of_motif_type(self.diamond, 1, approach=nn), "tetrahedral")
+        self.assertEqual(site_is_of_motif_type(self.diamond, 1, approach=nn), "tetrahedral")
+        self.assertEqual(nn.cache_info()["hits"], 4)
+
+        nn.clear_cache()
+        self.assertEqual(nn.cache_info(), {"hits": 0, "misses": 0, "maxsize": 2, "currsize": 0})
+        nn.disable_cache()
+        self.assertIsNone(nn.cache_info())
+
     def tearDown(self):
         del self.diamond
 
@@ -1227,6 +1263,46 @@ class LocalStructOrderParamsTest(PymatgenTest):
         with self.assertRaises(ValueError):
             ops_101.get_order_parameters(self.bcc, 0, indices_neighs=[2])
 
+    def test_get_all_order_parameters(self):
+        op_types = list(LocalStructOrderParams._LocalStructOrderParams__supported_types)
+        for types in [op_types, op_types[::-1]]:
+            ops = LocalStructOrderParams(types, cutoff=0.9)
+
+            # Motifs with the central site 0 and its neighbors
+            motifs = [
+                self.single_bond,
+                self.linear,
+                self.bent45,
+                self.regular_triangle,
+                self.square,
+                self.square_pyramid,
+                self.trigonal_planar,
+                self.pentagonal_bipyramid,
+                self.hexagonal_bipyramid,
+                self.cuboctahedron,
+                self.see_saw_rect,
+                self.sq_face_capped_trig_pris,
+            ]
+            vectors = [s.cart_coords[1:] - s.cart_coords[0] for s in motifs]
+            op_vals = ops.get_order_parameters_from_vectors(vectors, chunk_size=10)
+            self.assertEqual(op_vals.shape, (len(motifs), len(types)))
+            for s, vals in zip(motifs, op_vals):
+                expected = ops.get_order_parameters(s, 0, indices_neighs=list(range(1, len(s))))
+                self.assertArrayAlmostEqual(vals, [np.nan if v is None else v for v in expected])
+
+            # Neighbors within the cutoff
+            for s in [self.bcc, self.fcc, self.diamond]:
+                op_vals = ops.get_all_order_parameters(s)
+                for n, vals in enumerate(op_vals):
+                    expected = ops.get_order_parameters(s, n)
+                    self.assertArrayAlmostEqual(vals, [np.nan if v is None else v for v in expected])
+
+        ops = LocalStructOrderParams(["cn", "q4"], cutoff=-10)
+        op_vals = ops.get_all_order_parameters(self.fcc, indices=[0], tol=0.1)
+        self.assertArrayAlmostEqual(op_vals, [ops.get_order_parameters(self.fcc, 0, tol=0.1)])
+        op_vals = ops.get_all_order_parameters(self.fcc, nn=MinimumDistanceNN())
+        self.assertArrayAlmostEqual(op_vals[:, 0], [12] * len(self.fcc))
+
     def tearDown(self):
         del self.single_bond
         del self.linear
@@ -1403,6 +1479,20 @@ class CrystalNNTest(PymatgenTest):
         cnn = CrystalNN(weighted_cn=True, x_diff_weight=0)
         self.assertAlmostEqual(cnn.get_cn(self.lifepo4, 0, use_weights=True), 5.8630, 2)
 
+    def test_all_nn_info(self):
+        for cnn in [CrystalNN(), CrystalNN(weighted_cn=True, cation_anion=True)]:
+            all_nn_info = cnn.get_all_nn_info(self.lifepo4)
+            self.assertEqual(len(all_nn_info), len(self.lifepo4))
+            for n, nn_info in enumerate(all_nn_info):
+                expected = cnn.get_nn_info(self.lifepo4, n)
+                self.assertEqual(
+                    sorted((x["site_index"], x["image"], x["weight"]) for x in nn_info),
+                    sorted((x["site_index"], x["image"], x["weight"]) for x in expected),
+                )
+
+        nndata = CrystalNN(fingerprint_length=30).get_all_nn_data(self.lifepo4)
+        self.assertEqual(len(nndata[0].cn_weights), 30)
+
     def test_noble_gas_material(self):
         cnn = CrystalNN()
 
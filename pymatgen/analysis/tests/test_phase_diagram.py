@@ -260,6 +260,18 @@ class PhaseDiagramTest(unittest.TestCase):
                 self.assertTrue(isinstance(e_ah, Number))
                 self.assertGreaterEqual(e_ah, 0)
 
+    def test_get_e_above_hull_batch(self):
+        entries = list(self.pd.all_entries)
+        e_above_hull = self.pd.get_e_above_hull_batch(entries)
+        self.assertEqual(e_above_hull.shape, (len(entries),))
+        for entry, e_ah in zip(entries, e_above_hull):
+            self.assertAlmostEqual(e_ah, self.pd.get_e_above_hull(entry))
+
+        entry = PDEntry("LiFeO2", self.pd.get_hull_energy(Composition("LiFeO2")) - 1)
+        self.assertRaises(ValueError, self.pd.get_e_above_hull_batch, [entry])
+        self.assertAlmostEqual(self.pd.get_e_above_hull_batch([entry], allow_negative=True)[0], -0.25)
+        self.assertEqual(len(self.pd.get_e_above_hull_batch([])), 0)
+
     def test_get_equilibrium_reaction_energy(self):
         for entry in self.pd.stable_entries:
             self.assertLessEqual(
@@ -428,6 +440,34 @@ class PhaseDiagramTest(unittest.TestCase):
             n_h_e = self.pd.get_hull_energy(entry.composition.fractional_composition)
             self.assertAlmostEqual(n_h_e, entry.energy_per_atom)
 
+    def test_get_hull_energy_batch(self):
+        compositions = [Composition(c) for c in ["Li2O", "Li4O2", "LiFeO2", "Li3Fe2O7", "Fe", "O"]]
+        hull_energies = self.pd.get_hull_energy_batch(compositions)
+        hull_energies_per_atom = self.pd.get_hull_energy_per_atom_batch(compositions)
+        for c, e, e_per_atom in zip(compositions, hull_energies, hull_energies_per_atom):
+            self.assertAlmostEqual(e, self.pd.get_hull_energy(c))
+            self.assertAlmostEqual(e_per_atom * c.num_atoms, e)
+        self.assertRaises(ValueError, self.pd.get_hull_energy_batch, [Composition("LiP")])
+
+    def test_add_entries(self):
+        entries = list(self.entries)
+        base = [e for e in entries if e.composition.reduced_formula in ["Li", "Fe", "O2", "Li2O"]]
+        pd = PhaseDiagram(base)
+        hull_energy = pd.get_hull_energy(Composition("LiFeO2"))
+        pd.add_entries([e for e in entries if e not in base])
+        self.assertEqual(len(pd.all_entries), len(entries))
+        self.assertEqual(set(pd.stable_entries), set(self.pd.stable_entries))
+        self.assertLess(pd.get_hull_energy(Composition("LiFeO2")), hull_energy)
+        for entry in entries:
+            self.assertAlmostEqual(pd.get_e_above_hull(entry), self.pd.get_e_above_hull(entry))
+        # All entries must be in the phase diagram
+        self.assertRaises(ValueError, pd.add_entries, [PDEntry("LiP", 0)])
+
+        pd = PhaseDiagram([PDEntry("H", 0)])
+        pd.add_entries([PDEntry("H", 1), PDEntry("H", -1)])
+        self.assertEqual(len(pd.stable_entries), 1)
+        self.assertAlmostEqual(pd.get_e_above_hull(PDEntry("H", 0)), 1)
+
     def test_1d_pd(self):
         entry = PDEntry("H", 0)
         pd = PhaseDiagram([entry])
@@ -573,6 +613,16 @@ class GrandPotentialPhaseDiagramTest(unittest.TestCase):
             self.assertTrue(formula in stable_formulas, "{} not in stable entries!".format(formula))
         self.assertEqual(len(self.pd6.stable_entries), 4)
 
+    def test_add_entries(self):
+        entries = list(self.entries)
+        base = [e for e in entries if e.composition.is_element]
+        pd = GrandPotentialPhaseDiagram(base, {Element("O"): -5})
+        pd.add_entries([e for e in entries if e not in base])
+        self.assertEqual(
+            sorted(e.name for e in pd.stable_entries),
+            sorted(e.name for e in self.pd.stable_entries),
+        )
+
     def test_get_formation_energy(self):
         stable_formation_energies = {
             ent.original_entry.composition.reduced_formula: self.pd.get_form_energy(ent)
@@ -627,6 +677,17 @@ class CompoundPhaseDiagramTest(unittest.TestCase):
         for formula in expected_stable:
             self.assertTrue(formula in stable_formulas)
 
+    def test_add_entries(self):
+        entries = list(self.entries)
+        base = [e for e in entries if e.composition.reduced_formula in ["Li2O", "Fe2O3"]]
+        pd = CompoundPhaseDiagram(base, [Composition("Li2O"), Composition("Fe2O3")])
+        pd.add_entries([e for e in entries if e not in base])
+        self.assertEqual(len(pd.original_entries), len(entries))
+        self.assertEqual(
+            sorted(e.name for e in pd.stable_entries),
+            sorted(e.name for e in self.pd.stable_entries),
+        )
+
     def test_get_formation_energy(self):
         stable_formation_energies = {ent.name: self.pd.get_form_energy(ent) for ent in self.pd.stable_entries}
         expected_formation_energies = {
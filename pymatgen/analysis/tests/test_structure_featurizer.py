@@ -0,0 +1,101 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+import os
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+
+from pymatgen.analysis.bond_valence import BVAnalyzer
+from pymatgen.analysis.local_env import CrystalNN
+from pymatgen.analysis.structure_featurizer import StructureFeaturizer, pq
+from pymatgen.util.testing import PymatgenTest
+
+
+class StructureFeaturizerTest(PymatgenTest):
+    def setUp(self):
+        warnings.simplefilter("ignore")
+        self.structures = [self.get_structure(name) for name in ["Si", "CsCl", "LiFePO4", "Li2O"]]
+
+    def tearDown(self):
+        warnings.simplefilter("default")
+
+    def test_featurize(self):
+        featurizer = StructureFeaturizer(op_types=["cn", "q4"], chunk_size=3)
+        table = featurizer.featurize(self.structures)
+        self.assertEqual(list(table), list(featurizer.get_columns()))
+        self.assertEqual(list(table["formula"]), ["Si", "CsCl", "LiFePO4", "Li2O"])
+        self.assertArrayEqual(table["n_sites"], [2, 2, 28, 3])
+        self.assertEqual(len(table["site_cn"]), 35)
+        self.assertArrayEqual(table["spacegroup_number"], [227, 221, 14, 225])
+        self.assertEqual(list(table["crystal_system"]), ["cubic", "cubic", "monoclinic", "cubic"])
+
+        site_cns = np.split(table["site_cn"], np.cumsum(table["n_sites"])[:-1])
+        nn = CrystalNN()
+        self.assertArrayEqual(site_cns[2], [nn.get_cn(self.structures[2], i) for i in range(28)])
+        self.assertArrayEqual(table["site_op_cn"], table["site_cn"])
+        self.assertArrayAlmostEqual(table["site_op_q4"][:2], [0.50917508, 0.50917508])
+
+        # no valences can be assigned to Si, but the bond valence sums remain
+        self.assertIn("bond_valence: ValueError", table["error"][0])
+        self.assertEqual(list(table["error"][1:]), ["", "", ""])
+        self.assertTrue(np.all(np.isnan(table["site_valence"][:2])))
+        self.assertArrayAlmostEqual(table["site_bv_sum"][:2], [0, 0])
+        self.assertArrayEqual(table["site_valence"][4:32], BVAnalyzer().get_valences(self.structures[2]))
+
+        self.assertRaises(ValueError, StructureFeaturizer, ["cn", "xrd"])
+        table = StructureFeaturizer(["spacegroup"]).featurize([])
+        self.assertEqual(len(table["spacegroup_symbol"]), 0)
+
+    def test_interleaved_featurizers(self):
+        featurizer = StructureFeaturizer(["spacegroup"], chunk_size=1)
+        a = featurizer.iter_tables(self.structures[:2])
+        b = StructureFeaturizer(["cn"], chunk_size=1).iter_tables(self.structures[2:])
+        self.assertEqual(list(next(a)["spacegroup_symbol"]), ["Fd-3m"])
+        self.assertNotIn("spacegroup_symbol", next(b))
+        table = next(a)
+        self.assertEqual(list(table["spacegroup_symbol"]), ["Pm-3m"])
+        self.assertArrayEqual(table["spacegroup_number"], [221])
+        self.assertEqual(list(table["error"]), [""])
+        # the cache is kept off the near-neighbor strategy of the featurizer
+        self.assertIsNone(featurizer.nn.cache_info())
+
+    def test_timeout(self):
+        featurizer = StructureFeaturizer(["order_parameters", "spacegroup"], timeout=1e-4)
+        table = featurizer.featurize(self.structures[2:3])
+        self.assertIn("TimeoutError", table["error"][0])
+        self.assertEqual(table["spacegroup_number"][0], 0)
+        self.assertTrue(np.all(np.isnan(table["site_op_q6"])))
+        table = StructureFeaturizer(["spacegroup"], timeout=60).featurize(self.structures[2:3])
+        self.assertEqual(table["error"][0], "")
+        self.assertEqual(table["spacegroup_number"][0], 14)
+
+    def test_write_npz(self):
+        featurizer = StructureFeaturizer(["cn", "spacegroup", "bond_valence"], chunk_size=3)
+        table = featurizer.featurize(self.structures)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "features.npz")
+            parallel = StructureFeaturizer(["cn", "spacegroup", "bond_valence"], chunk_size=1, ncpus=2)
+            self.assertEqual(parallel.write_npz(iter(self.structures), filename), 4)
+            table2 = StructureFeaturizer.load_npz(filename)
+        self.assertEqual(list(table2), list(table))
+        for name in table:
+            if name != "time":
+                self.assertArrayEqual(table2[name], table[name])
+
+    @unittest.skipIf(pq is None, "pyarrow not installed")
+    def test_write_parquet(self):
+        featurizer = StructureFeaturizer(["cn", "spacegroup"], chunk_size=3)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "features.parquet")
+            self.assertEqual(featurizer.write_parquet(self.structures, filename), 4)
+            df = pq.read_table(filename).to_pandas()
+        self.assertEqual(list(df["spacegroup_number"]), [227, 221, 14, 225])
+        self.assertEqual(len(df["site_cn"][2]), 28)
+
+
+if __name__ == "__main__":
+    unittest.main()
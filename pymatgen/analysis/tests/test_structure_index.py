@@ -0,0 +1,78 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+import json
+import os
+import unittest
+import warnings
+
+from monty.json import MontyDecoder
+from monty.tempfile import ScratchDir
+
+from pymatgen.analysis.structure_index import StructureIndex
+from pymatgen.analysis.structure_matcher import FingerprintPrefilter, StructureMatcher
+from pymatgen.util.testing import PymatgenTest
+
+
+class StructureIndexTest(PymatgenTest):
+    def setUp(self):
+        with open(os.path.join(PymatgenTest.TEST_FILES_DIR, "TiO2_entries.json"), "r") as fp:
+            entries = json.load(fp, cls=MontyDecoder)
+        self.struct_list = [e.structure for e in entries]
+
+    def test_query(self):
+        sm = StructureMatcher()
+        index = StructureIndex(structure_matcher=sm, prefilter=FingerprintPrefilter(symprec=None, nn_tol=0.1))
+        ids = index.add_structures(self.struct_list[:-1])
+        self.assertEqual(ids, [str(i) for i in range(1, len(self.struct_list))])
+        self.assertEqual(len(index), len(self.struct_list) - 1)
+        for i, s in enumerate(self.struct_list):
+            expected = [str(j + 1) for j, s2 in enumerate(self.struct_list[:-1]) if sm.fit(s2, s)]
+            self.assertEqual(index.query(s), expected)
+
+        s = self.struct_list[0].copy()
+        s.make_supercell([1, 1, 2])
+        self.assertIn(s, index)
+        s.replace_species({"Ti": "Zr"})
+        self.assertNotIn(s, index)
+
+        self.assertEqual(index.add(s, "zr"), "zr")
+        self.assertEqual(index.query(s), ["zr"])
+        self.assertEqual(index.get_structure("zr"), s)
+        index.remove("zr")
+        self.assertEqual(index.query(s), [])
+        self.assertRaises(KeyError, index.get_structure, "zr")
+
+    def test_persistence(self):
+        with ScratchDir("."):
+            prefilter = FingerprintPrefilter(symprec=0.1)
+            with StructureIndex("index.sqlite", prefilter=prefilter) as index:
+                index.add_structures(self.struct_list[:5], ["a", "b", "c", "d", "e"])
+                d = index.as_dict()
+
+            with StructureIndex("index.sqlite") as index:
+                self.assertEqual(len(index), 5)
+                self.assertEqual(index.prefilter.symprec, 0.1)
+                self.assertEqual(index.query(self.struct_list[0]), ["a", "b", "c"])
+                index.add(self.struct_list[5])
+                self.assertEqual(len(index), 6)
+
+            index = StructureIndex.from_dict(d)
+            self.assertEqual(len(index), 6)
+            index.close()
+
+            self.assertRaises(ValueError, StructureIndex, "index.sqlite", prefilter=FingerprintPrefilter(symprec=0.01))
+
+        index = StructureIndex()
+        index.add_structures(self.struct_list[:2])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            d = index.as_dict()
+        self.assertEqual(len(w), 1)
+        self.assertIn("in-memory", str(w[0].message))
+        self.assertEqual(len(StructureIndex.from_dict(d)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
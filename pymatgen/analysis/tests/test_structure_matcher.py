@@ -17,6 +17,7 @@ from pymatgen.core.structure import Structure
 from pymatgen.analysis.defects.core import Interstitial, Substitution, Vacancy
 from pymatgen.analysis.structure_matcher import (
     ElementComparator,
+    FingerprintPrefilter,
     FrameworkComparator,
     OccupancyComparator,
     OrderDisorderElementComparator,
@@ -323,6 +324,27 @@ class StructureMatcherTest(PymatgenTest):
         out = sm.group_structures(self.struct_list, anonymous=True)
         self.assertEqual(list(map(len, out)), [4, 1, 1, 1, 1, 1, 1, 1, 2, 2, 1])
 
+    def test_group_structures_prefilter_ncpus(self):
+        sm = StructureMatcher()
+        out = sm.group_structures(self.struct_list)
+        self.assertEqual(sm.group_structures(self.struct_list, ncpus=2), out)
+
+        prefilter = FingerprintPrefilter(symprec=None, nn_tol=0.1)
+        fingerprint = prefilter.get_fingerprint(self.struct_list[0])
+        s = self.struct_list[0].copy()
+        s.make_supercell([2, 1, 1])
+        s.scale_lattice(s.volume * 1.1)
+        self.assertEqual(prefilter.get_fingerprint(s), fingerprint)
+
+        out_prefilter = sm.group_structures(self.struct_list, prefilter=prefilter)
+        self.assertEqual(sorted(map(len, out_prefilter)), sorted(map(len, out)))
+        self.assertEqual(sm.group_structures(self.struct_list, prefilter=prefilter, ncpus=2), out_prefilter)
+
+        prefilter = FingerprintPrefilter(symprec=0.1)
+        self.assertEqual(prefilter.get_fingerprint(self.struct_list[0]), (227,))
+        out_prefilter = sm.group_structures(self.struct_list, prefilter=prefilter)
+        self.assertEqual(sum(map(len, out_prefilter)), len(self.struct_list))
+
     def test_mix(self):
         structures = [
             self.get_structure("Li2O"),
@@ -8,13 +8,16 @@ This module define the various drones used to assimilate data.
 
 import abc
 import glob
+import hashlib
 import json
 import logging
 import os
+import sqlite3
+import time
 import warnings
 
 from monty.io import zopen
-from monty.json import MSONable
+from monty.json import MontyDecoder, MontyEncoder, MSONable
 
 from pymatgen.entries.computed_entries import ComputedEntry, ComputedStructureEntry
 from pymatgen.io.gaussian import GaussianOutput
@@ -70,6 +73,179 @@ class AbstractDrone(MSONable, metaclass=abc.ABCMeta):
         return
 
 
+class AssimilationCache(MSONable):
+    """
+    On-disk cache of assimilated objects, stored in a SQLite database, so
+    that re-running a drone over a directory tree only parses the files that
+    changed since the last run. Each object is stored under the path of the
+    file it was assimilated from and a string describing the drone settings,
+    and is returned only if the size and modification time (or, optionally,
+    the content hash) of the file are unchanged.
+
+    The cache can be shared by the processes of a BorgQueen. Each process
+    opens its own connection to the database.
+    """
+
+    def __init__(self, filename, max_size=None, use_hash=False):
+        """
+        Args:
+            filename (str): Path to the SQLite database. Created if it does not
+                exist.
+            max_size (int): Maximum total size in bytes of the stored objects.
+                The least recently used objects are evicted when it is
+                exceeded. Defaults to no limit.
+            use_hash (bool): Whether to validate cached objects with a SHA1
+                hash of the file contents instead of its modification time.
+                Slower, as the file has to be read, but robust to files being
+                copied or touched without changes.
+        """
+        self.filename = str(filename)
+        self.max_size = max_size
+        self.use_hash = use_hash
+        self._db = None
+        self._size = None
+
+    @property
+    def db(self):
+        """
+        Connection to the database, opened on first use in each process.
+        """
+        if self._db is None:
+            self._db = sqlite3.connect(self.filename, timeout=60)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (path TEXT NOT NULL, settings TEXT NOT NULL, "
+                "size INTEGER, mtime INTEGER, hash TEXT, last_access REAL, data TEXT, "
+                "PRIMARY KEY (path, settings))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS access_index ON cache (last_access)")
+            self._db.commit()
+        return self._db
+
+    def _get_key(self, filepath):
+        stat = os.stat(filepath)
+        if self.use_hash:
+            sha1 = hashlib.sha1()
+            with open(filepath, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha1.update(block)
+            return stat.st_size, None, sha1.hexdigest()
+        return stat.st_size, stat.st_mtime_ns, None
+
+    def get(self, filepath, settings=""):
+        """
+        Args:
+            filepath (str): Path to the file the object was assimilated from.
+            settings (str): Drone settings the object was assimilated with.
+
+        Returns:
+            The cached object, or None if there is none or the file changed.
+        """
+        filepath = os.path.abspath(filepath)
+        row = self.db.execute(
+            "SELECT size, mtime, hash, data FROM cache WHERE path = ? AND settings = ?", (filepath, settings)
+        ).fetchone()
+        if row is None or tuple(row[:3]) != self._get_key(filepath):
+            return None
+        with self.db:
+            self.db.execute(
+                "UPDATE cache SET last_access = ? WHERE path = ? AND settings = ?", (time.time(), filepath, settings)
+            )
+        return json.loads(row[3], cls=MontyDecoder)
+
+    def put(self, filepath, obj, settings=""):
+        """
+        Store an object in the cache, evicting the least recently used
+        objects if max_size is exceeded.
+
+        Args:
+            filepath (str): Path to the file the object was assimilated from.
+            obj: MSONable object to store.
+            settings (str): Drone settings the object was assimilated with.
+        """
+        filepath = os.path.abspath(filepath)
+        data = json.dumps(obj, cls=MontyEncoder)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (filepath, settings) + self._get_key(filepath) + (time.time(), data),
+            )
+        if self.max_size is not None:
+            if self._size is None:
+                self._size = self.get_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        # The running size is only an upper bound when entries are replaced or
+        # other processes write to the cache, so check the exact size first.
+        self._size = self.get_size()
+        excess = self._size - self.max_size
+        if excess <= 0:
+            return
+        rowids = []
+        for rowid, size in self.db.execute("SELECT rowid, LENGTH(data) FROM cache ORDER BY last_access"):
+            rowids.append((rowid,))
+            excess -= size
+            self._size -= size
+            if excess <= 0:
+                break
+        with self.db:
+            self.db.executemany("DELETE FROM cache WHERE rowid = ?", rowids)
+        logger.debug("Evicted {} objects from {}".format(len(rowids), self.filename))
+
+    def invalidate(self, filepath=None):
+        """
+        Remove the objects cached for a file, or all objects.
+
+        Args:
+            filepath (str): Path to the file. If None, the whole cache is
+                cleared.
+        """
+        with self.db:
+            if filepath is None:
+                self.db.execute("DELETE FROM cache")
+            else:
+                self.db.execute("DELETE FROM cache WHERE path = ?", (os.path.abspath(filepath),))
+        self._size = None
+
+    def get_size(self):
+        """
+        Returns:
+            Total size in bytes of the stored objects.
+        """
+        return self.db.execute("SELECT TOTAL(LENGTH(data)) FROM cache").fetchone()[0]
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d["_db"] = None
+        return d
+
+    def as_dict(self):
+        """
+        Returns: MSONable dict
+        """
+        return {
+            "@module": self.__class__.__module__,
+            "@class": self.__class__.__name__,
+            "filename": self.filename,
+            "max_size": self.max_size,
+            "use_hash": self.use_hash,
+        }
+
+
 class VaspToComputedEntryDrone(AbstractDrone):
     """
     VaspToEntryDrone assimilates directories containing vasp output to
@@ -82,7 +258,7 @@ class VaspToComputedEntryDrone(AbstractDrone):
     3. The drone parses only the vasprun.xml file.
     """
 
-    def __init__(self, inc_structure=False, parameters=None, data=None):
+    def __init__(self, inc_structure=False, parameters=None, data=None, cache=None):
         """
         Args:
             inc_structure (bool): Set to True if you want
@@ -95,6 +271,9 @@ class VaspToComputedEntryDrone(AbstractDrone):
                 post-processing will be set.
             data (list): Output data to include. Has to be one of the properties
                 supported by the Vasprun object.
+            cache (AssimilationCache): Cache of previously assimilated
+                entries. If given, a vasprun.xml is only parsed if it changed
+                since it was last assimilated with the same settings.
         """
         self._inc_structure = inc_structure
         self._parameters = {
@@ -107,6 +286,7 @@ class VaspToComputedEntryDrone(AbstractDrone):
         if parameters:
             self._parameters.update(parameters)
         self._data = data if data else []
+        self._cache = cache
 
     def assimilate(self, path):
         """
@@ -132,6 +312,12 @@ class VaspToComputedEntryDrone(AbstractDrone):
                 filepath = sorted(vasprun_files)[-1]
                 warnings.warn("%d vasprun.xml.* found. %s is being parsed." % (len(vasprun_files), filepath))
 
+        if self._cache is not None and filepath is not None:
+            settings = json.dumps([self._inc_structure, sorted(self._parameters), list(self._data)])
+            entry = self._cache.get(filepath, settings)
+            if entry is not None:
+                return entry
+
         try:
             vasprun = Vasprun(filepath)
         except Exception as ex:
@@ -139,6 +325,8 @@ class VaspToComputedEntryDrone(AbstractDrone):
             return None
 
         entry = vasprun.get_computed_entry(self._inc_structure, parameters=self._parameters, data=self._data)
+        if self._cache is not None:
+            self._cache.put(filepath, entry, settings)
 
         # entry.parameters["history"] = _get_transformation_history(path)
         return entry
@@ -183,6 +371,7 @@ class VaspToComputedEntryDrone(AbstractDrone):
                 "inc_structure": self._inc_structure,
                 "parameters": self._parameters,
                 "data": self._data,
+                "cache": self._cache.as_dict() if self._cache is not None else None,
             },
             "@module": self.__class__.__module__,
             "@class": self.__class__.__name__,
@@ -197,7 +386,10 @@ class VaspToComputedEntryDrone(AbstractDrone):
         Returns:
             VaspToComputedEntryDrone
         """
-        return cls(**d["init_args"])
+        init_args = dict(d["init_args"])
+        if init_args.get("cache") is not None:
+            init_args["cache"] = AssimilationCache.from_dict(init_args["cache"])
+        return cls(**init_args)
 
 
 class SimpleVaspToComputedEntryDrone(VaspToComputedEntryDrone):
@@ -8,10 +8,13 @@ This module defines the BorgQueen class, which manages drones to assimilate
 data using Python's multiprocessing.
 """
 
+import glob
 import json
 import logging
 import os
-from multiprocessing import Manager, Pool
+import time
+import warnings
+from multiprocessing import Pool
 
 from monty.io import zopen
 from monty.json import MontyDecoder, MontyEncoder
@@ -24,9 +27,23 @@ class BorgQueen:
     The Borg Queen controls the drones to assimilate data in an entire
     directory tree. Uses multiprocessing to speed up things considerably. It
     also contains convenience methods to save and load data between sessions.
+
+    For very large directory trees, the assimilated data can be streamed to a
+    store directory instead of being kept in memory. The store contains
+    newline-delimited JSON data files, one per assimilation run, and a
+    checkpoint file listing the paths already processed, so that an
+    interrupted assimilation resumes where it stopped when run again with the
+    same store directory::
+
+        queen = BorgQueen(drone, number_of_drones=16)
+        queen.parallel_assimilate(rootpath, store_dir="assimilated")
+        for entry in BorgQueen.iter_store("assimilated"):
+            ...
     """
 
-    def __init__(self, drone, rootpath=None, number_of_drones=1):
+    CHECKPOINT_FILE = "checkpoint.txt"
+
+    def __init__(self, drone, rootpath=None, number_of_drones=1, store_dir=None):
         """
         Args:
             drone (Drone): An implementation of
@@ -41,56 +58,143 @@ class BorgQueen:
                 will definitely see a significant speedup of at least 50% or so.
                 If you are running this over a server with far more processors,
                 the speedup will be even greater.
+            store_dir (str): Directory to stream the assimilated data to
+                instead of keeping it in memory. See parallel_assimilate.
         """
         self._drone = drone
         self._num_drones = number_of_drones
         self._data = []
+        self._stats = {}
 
         if rootpath:
             if number_of_drones > 1:
-                self.parallel_assimilate(rootpath)
+                self.parallel_assimilate(rootpath, store_dir=store_dir)
             else:
-                self.serial_assimilate(rootpath)
+                self.serial_assimilate(rootpath, store_dir=store_dir)
 
-    def parallel_assimilate(self, rootpath):
+    def parallel_assimilate(self, rootpath, store_dir=None, compress=True, chunksize=1):
         """
-        Assimilate the entire subdirectory structure in rootpath.
+        Assimilate the entire subdirectory structure in rootpath. The
+        subdirectories of rootpath are scanned for valid paths in parallel,
+        and the assimilated data is sent back from the drones as JSON strings
+        and written out as it arrives.
+
+        Args:
+            rootpath (str): The root directory to start assimilation.
+            store_dir (str): Directory to stream the assimilated data to. If
+                None (default), the data is kept in memory and is available
+                from get_data. Otherwise, nothing is kept in memory, the data
+                is appended to a new data file in store_dir and the processed
+                paths to its checkpoint file. Paths listed in the checkpoint
+                file of an existing store_dir are skipped, i.e., an
+                interrupted assimilation is resumed. Use iter_store or
+                load_data to read the data back.
+            compress (bool): Whether to gzip the data file written to
+                store_dir.
+            chunksize (int): Number of paths sent to a drone at once. Larger
+                chunks reduce the communication overhead for directory trees
+                with very many quick to assimilate paths.
         """
-        logger.info("Scanning for valid paths...")
-        valid_paths = []
-        for (parent, subdirs, files) in os.walk(rootpath):
-            valid_paths.extend(self._drone.get_valid_paths((parent, subdirs, files)))
-        manager = Manager()
-        data = manager.list()
-        status = manager.dict()
-        status["count"] = 0
-        status["total"] = len(valid_paths)
-        logger.info("{} valid paths found.".format(len(valid_paths)))
-        p = Pool(self._num_drones)
-        p.map(
-            order_assimilation,
-            ((path, self._drone, data, status) for path in valid_paths),
-        )
-        for d in data:
-            self._data.append(json.loads(d, cls=MontyDecoder))
+        with Pool(self._num_drones) as p:
+            self._assimilate(rootpath, p, store_dir, compress, chunksize)
 
-    def serial_assimilate(self, rootpath):
+    def serial_assimilate(self, rootpath, store_dir=None, compress=True):
         """
         Assimilate the entire subdirectory structure in rootpath serially.
+
+        Args:
+            rootpath (str): The root directory to start assimilation.
+            store_dir (str): Directory to stream the assimilated data to. See
+                parallel_assimilate.
+            compress (bool): Whether to gzip the data file written to
+                store_dir.
         """
-        valid_paths = []
-        for (parent, subdirs, files) in os.walk(rootpath):
-            valid_paths.extend(self._drone.get_valid_paths((parent, subdirs, files)))
-        data = []
-        count = 0
-        total = len(valid_paths)
-        for path in valid_paths:
-            newdata = self._drone.assimilate(path)
-            self._data.append(newdata)
-            count += 1
-            logger.info("{}/{} ({:.2f}%) done".format(count, total, count / total * 100))
-        for d in data:
-            self._data.append(json.loads(d, cls=MontyDecoder))
+        self._assimilate(rootpath, None, store_dir, compress, 1)
+
+    def _assimilate(self, rootpath, pool, store_dir, compress, chunksize):
+        mapper = map if pool is None else pool.imap
+
+        logger.info("Scanning for valid paths...")
+        start = time.time()
+        walk = next(os.walk(rootpath), None)
+        if walk is None:
+            warnings.warn("{} is not a readable directory, no paths to assimilate.".format(rootpath))
+            walk = (rootpath, [], [])
+        parent, subdirs, files = walk
+        valid_paths = list(self._drone.get_valid_paths((parent, subdirs, files)))
+        for paths in mapper(
+            _scan_paths,
+            ((self._drone, os.path.join(parent, d)) for d in subdirs),
+        ):
+            valid_paths.extend(paths)
+        scan_time = time.time() - start
+        logger.info("{} valid paths found.".format(len(valid_paths)))
+
+        stats = {
+            "total": len(valid_paths),
+            "skipped": 0,
+            "assimilated": 0,
+            "failed": 0,
+            "scan_time": scan_time,
+            "assimilation_time": 0,
+            "max_time": 0,
+            "slowest_path": None,
+            "drones": {},
+        }
+        self._stats = stats
+
+        data_file = checkpoint = None
+        if store_dir is not None:
+            os.makedirs(store_dir, exist_ok=True)
+            checkpoint_file = os.path.join(store_dir, self.CHECKPOINT_FILE)
+            if os.path.exists(checkpoint_file):
+                with open(checkpoint_file, "rt") as f:
+                    done = {line.rstrip("\n") for line in f}
+                remaining = [path for path in valid_paths if path not in done]
+                stats["skipped"] = len(valid_paths) - len(remaining)
+                valid_paths = remaining
+                logger.info("Resuming, {} paths already assimilated.".format(stats["skipped"]))
+            data_file = os.path.join(
+                store_dir,
+                "data-{}.jsonl{}".format(len(_get_data_files(store_dir)), ".gz" if compress else ""),
+            )
+            data_file = zopen(data_file, "wt")
+            checkpoint = open(checkpoint_file, "at")
+
+        try:
+            count = stats["skipped"]
+            for path, newdata, pid, elapsed in mapper(
+                _assimilate_path,
+                ((path, self._drone) for path in valid_paths),
+                *([] if pool is None else [chunksize]),
+            ):
+                if newdata is None:
+                    stats["failed"] += 1
+                else:
+                    stats["assimilated"] += 1
+                    if data_file is None:
+                        self._data.append(json.loads(newdata, cls=MontyDecoder))
+                    else:
+                        data_file.write('{{"path": {}, "data": {}}}\n'.format(json.dumps(path), newdata))
+                        data_file.flush()
+                if checkpoint is not None:
+                    checkpoint.write(path + "\n")
+                    checkpoint.flush()
+
+                stats["assimilation_time"] += elapsed
+                if elapsed > stats["max_time"]:
+                    stats["max_time"] = elapsed
+                    stats["slowest_path"] = path
+                drone_stats = stats["drones"].setdefault(pid, {"count": 0, "time": 0})
+                drone_stats["count"] += 1
+                drone_stats["time"] += elapsed
+
+                count += 1
+                logger.info("{}/{} ({:.2f}%) done".format(count, stats["total"], count / stats["total"] * 100))
+        finally:
+            if data_file is not None:
+                data_file.close()
+                checkpoint.close()
 
     def get_data(self):
         """
@@ -98,6 +202,24 @@ class BorgQueen:
         """
         return self._data
 
+    def get_stats(self):
+        """
+        Returns statistics of the last assimilation as a dict with the
+        following keys:
+
+            - total: Number of valid paths found.
+            - skipped: Number of paths skipped as already in the checkpoint.
+            - assimilated: Number of paths successfully assimilated.
+            - failed: Number of paths for which the drone returned nothing.
+            - scan_time: Time spent scanning for valid paths, in s.
+            - assimilation_time: Total time spent by the drones assimilating,
+              in s.
+            - max_time, slowest_path: Longest assimilation time and its path.
+            - drones: {pid: {"count": n, "time": t}} number of paths
+              assimilated and time spent by each drone process.
+        """
+        return self._stats
+
     def save_data(self, filename):
         """
         Save the assimilated data to a file.
@@ -112,10 +234,81 @@ class BorgQueen:
 
     def load_data(self, filename):
         """
-        Load assimilated data from a file
+        Load assimilated data from a file, or from a store directory written
+        by parallel_assimilate or serial_assimilate.
+        """
+        if os.path.isdir(filename):
+            self._data = list(self.iter_store(filename))
+        else:
+            with zopen(filename, "rt") as f:
+                self._data = json.load(f, cls=MontyDecoder)
+
+    @staticmethod
+    def iter_store(store_dir):
+        """
+        Iterate over the data in a store directory without loading it all in
+        memory. Each path is yielded at most once, and truncated records left
+        by an interrupted assimilation are skipped.
+
+        Args:
+            store_dir (str): Store directory written by parallel_assimilate
+                or serial_assimilate.
+
+        Yields:
+            Assimilated objects.
         """
-        with zopen(filename, "rt") as f:
-            self._data = json.load(f, cls=MontyDecoder)
+        seen = set()
+        for data_file in _get_data_files(store_dir):
+            with zopen(data_file, "rt") as f:
+                try:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            logger.warning("Skipping truncated record in {}".format(data_file))
+                            continue
+                        if record["path"] not in seen:
+                            seen.add(record["path"])
+                            yield MontyDecoder().process_decoded(record["data"])
+                except EOFError:
+                    logger.warning("{} is truncated".format(data_file))
+
+
+def _get_data_files(store_dir):
+    """
+    Returns the data files in a store directory, in the order they were
+    written.
+    """
+    return sorted(
+        glob.glob(os.path.join(store_dir, "data-*.jsonl*")),
+        key=lambda f: int(os.path.basename(f).split(".")[0].split("-")[1]),
+    )
+
+
+def _scan_paths(args):
+    """
+    Internal helper method for BorgQueen to scan a directory tree for valid
+    paths.
+    """
+    (drone, path) = args
+    valid_paths = []
+    for (parent, subdirs, files) in os.walk(path):
+        valid_paths.extend(drone.get_valid_paths((parent, subdirs, files)))
+    return valid_paths
+
+
+def _assimilate_path(args):
+    """
+    Internal helper method for BorgQueen to assimilate a path. The data is
+    returned as a JSON string together with the path, the id of the drone
+    process and the time taken.
+    """
+    (path, drone) = args
+    start = time.time()
+    newdata = drone.assimilate(path)
+    if newdata is not None:
+        newdata = json.dumps(newdata, cls=MontyEncoder)
+    return path, newdata, os.getpid(), time.time() - start
 
 
 def order_assimilation(args):
@@ -4,10 +4,14 @@
 
 
 import os
+import shutil
 import unittest
 import warnings
 
+from monty.tempfile import ScratchDir
+
 from pymatgen.apps.borg.hive import (
+    AssimilationCache,
     GaussianToComputedEntryDrone,
     SimpleVaspToComputedEntryDrone,
     VaspToComputedEntryDrone,
@@ -50,6 +54,60 @@ class VaspToComputedEntryDroneTest(unittest.TestCase):
         drone = VaspToComputedEntryDrone.from_dict(d)
         self.assertEqual(type(drone), VaspToComputedEntryDrone)
 
+    def test_cache(self):
+        with ScratchDir("."):
+            os.mkdir("calc")
+            shutil.copy(
+                os.path.join(PymatgenTest.TEST_FILES_DIR, "vasprun.xml.xe"), os.path.join("calc", "vasprun.xml")
+            )
+            drone = VaspToComputedEntryDrone(data=["efermi"], cache=AssimilationCache("cache.sqlite"))
+            entry = drone.assimilate("calc")
+            self.assertEqual(len(drone._cache), 1)
+
+            # The cached entry is returned as long as the file is unchanged.
+            drone = VaspToComputedEntryDrone.from_dict(drone.as_dict())
+            self.assertIsInstance(drone._cache, AssimilationCache)
+            cached = drone._cache.get(os.path.join("calc", "vasprun.xml"), "")
+            self.assertIsNone(cached)
+            cached = drone.assimilate("calc")
+            self.assertEqual(cached.energy, entry.energy)
+            self.assertEqual(cached.data["efermi"], entry.data["efermi"])
+
+            # Different drone settings are cached separately.
+            structure_drone = VaspToComputedEntryDrone(True, cache=AssimilationCache("cache.sqlite"))
+            self.assertIsInstance(structure_drone.assimilate("calc"), ComputedStructureEntry)
+            self.assertEqual(len(structure_drone._cache), 2)
+
+            shutil.copy(
+                os.path.join(PymatgenTest.TEST_FILES_DIR, "vasprun.xml.LiF"), os.path.join("calc", "vasprun.xml")
+            )
+            self.assertEqual(drone.assimilate("calc").composition.reduced_formula, "LiF")
+
+            drone._cache.invalidate(os.path.join("calc", "vasprun.xml"))
+            self.assertEqual(len(drone._cache), 0)
+
+    def test_cache_eviction_and_hash(self):
+        with ScratchDir("."):
+            cache = AssimilationCache("cache.sqlite", max_size=1000, use_hash=True)
+            for i in range(10):
+                with open("file{}".format(i), "w") as f:
+                    f.write(str(i))
+                cache.put("file{}".format(i), {"data": "x" * 200})
+            self.assertLessEqual(cache.get_size(), 1000)
+            self.assertEqual(len(cache), 4)
+            self.assertIsNone(cache.get("file0"))
+            self.assertEqual(cache.get("file9"), {"data": "x" * 200})
+
+            # Touching a file does not invalidate a hash validated cache.
+            os.utime("file9", (0, 0))
+            self.assertIsNotNone(cache.get("file9"))
+            with open("file9", "w") as f:
+                f.write("changed")
+            self.assertIsNone(cache.get("file9"))
+            cache.invalidate()
+            self.assertEqual(len(cache), 0)
+            cache.close()
+
 
 class SimpleVaspToComputedEntryDroneTest(unittest.TestCase):
     def setUp(self):
@@ -16,9 +16,12 @@ __email__ = "shyue@mit.edu"
 __date__ = "Mar 18, 2012"
 
 import os
+import shutil
 import unittest
 import warnings
 
+from monty.tempfile import ScratchDir
+
 from pymatgen.apps.borg.hive import VaspToComputedEntryDrone
 from pymatgen.apps.borg.queen import BorgQueen
 from pymatgen.util.testing import PymatgenTest
@@ -37,12 +40,77 @@ class BorgQueenTest(unittest.TestCase):
         data = self.queen.get_data()
         self.assertEqual(len(data), 12)
 
+    def test_missing_rootpath(self):
+        queen = BorgQueen(VaspToComputedEntryDrone())
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            queen.serial_assimilate(os.path.join(PymatgenTest.TEST_FILES_DIR, "nonexistent_dir"))
+        self.assertIn("not a readable directory", str(w[0].message))
+        self.assertEqual(queen.get_data(), [])
+        self.assertEqual(queen.get_stats()["total"], 0)
+
     def test_load_data(self):
         drone = VaspToComputedEntryDrone()
         queen = BorgQueen(drone)
         queen.load_data(os.path.join(PymatgenTest.TEST_FILES_DIR, "assimilated.json"))
         self.assertEqual(len(queen.get_data()), 1)
 
+    def _make_tree(self):
+        for i, f in enumerate(["vasprun.xml.xe", "vasprun.xml.LiF", "vasprun.xml.Al", "vasprun.xml.scan"]):
+            os.makedirs(os.path.join("calcs", "batch{}".format(i % 2), "run{}".format(i)))
+            shutil.copy(
+                os.path.join(PymatgenTest.TEST_FILES_DIR, f),
+                os.path.join("calcs", "batch{}".format(i % 2), "run{}".format(i), "vasprun.xml"),
+            )
+
+    def test_store_dir(self):
+        drone = VaspToComputedEntryDrone()
+        with ScratchDir("."):
+            self._make_tree()
+            queen = BorgQueen(drone, "calcs", 1)
+            energies = sorted(e.energy for e in queen.get_data())
+            self.assertEqual(len(energies), 4)
+
+            queen = BorgQueen(drone, number_of_drones=2)
+            queen.parallel_assimilate("calcs", store_dir="store", chunksize=2)
+            self.assertEqual(queen.get_data(), [])
+            stats = queen.get_stats()
+            self.assertEqual(stats["total"], 4)
+            self.assertEqual(stats["assimilated"], 4)
+            self.assertEqual(sum(d["count"] for d in stats["drones"].values()), 4)
+            self.assertEqual(sorted(e.energy for e in BorgQueen.iter_store("store")), energies)
+
+            # Nothing left to assimilate on a second run.
+            queen.serial_assimilate("calcs", store_dir="store", compress=False)
+            self.assertEqual(queen.get_stats()["skipped"], 4)
+            self.assertEqual(queen.get_stats()["assimilated"], 0)
+            queen.load_data("store")
+            self.assertEqual(sorted(e.energy for e in queen.get_data()), energies)
+
+    def test_resume(self):
+        drone = VaspToComputedEntryDrone()
+        with ScratchDir("."):
+            self._make_tree()
+            queen = BorgQueen(drone)
+            queen.serial_assimilate("calcs", store_dir="store")
+            energies = sorted(e.energy for e in queen.iter_store("store"))
+
+            # Simulate a run interrupted after two paths, while writing the
+            # data of the third one.
+            with open(os.path.join("store", "checkpoint.txt")) as f:
+                done = f.readlines()
+            with open(os.path.join("store", "checkpoint.txt"), "w") as f:
+                f.writelines(done[:2])
+            with open(os.path.join("store", "data-1.jsonl"), "w") as f:
+                f.write('{"path": "calcs/batch0", "data": {"@module"')
+
+            queen.serial_assimilate("calcs", store_dir="store")
+            stats = queen.get_stats()
+            self.assertEqual(stats["skipped"], 2)
+            self.assertEqual(stats["assimilated"], 2)
+            self.assertTrue(os.path.exists(os.path.join("store", "data-2.jsonl.gz")))
+            self.assertEqual(sorted(e.energy for e in queen.iter_store("store")), energies)
+
 
 if __name__ == "__main__":
     unittest.main()
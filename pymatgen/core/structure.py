@@ -1361,6 +1361,72 @@ class IStructure(SiteCollection, MSONable):
                 )
             )
 
+    def get_neighbor_list_cells(
+        self,
+        r: float,
+        sites: List[PeriodicSite] = None,
+        numerical_tol: float = 1e-8,
+        exclude_self: bool = True,
+        nthreads: int = None,
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Same as get_neighbor_list, but using a linked-cell search which does
+        not generate periodic images of the atoms and processes the centers
+        in chunks. Memory usage is therefore bounded, which makes this method
+        suited to supercells of 10^5 - 10^6 atoms. See
+        :func:`pymatgen.optimization.neighbor_list.find_points_in_cells`.
+
+        Args:
+            r (float): Radius of sphere
+            sites (list of Sites or None): sites for getting all neighbors,
+                default is None, which means neighbors will be obtained for all
+                sites.
+            numerical_tol (float): This is a numerical tolerance for distances.
+                Sites which are < numerical_tol are determined to be conincident
+                with the site. Sites which are r + numerical_tol away is deemed
+                to be within r from the site.
+            exclude_self (bool): whether to exclude atom neighboring with itself within
+                numerical tolerance distance, default to True
+            nthreads (int): Number of threads to search the neighbors with.
+                Defaults to None, i.e., serial.
+        Returns: (center_indices, points_indices, offset_vectors, distances)
+        """
+        from pymatgen.optimization.neighbor_list import find_points_in_cells
+
+        return find_points_in_cells(
+            self.lattice.matrix,
+            self.frac_coords,
+            r,
+            center_frac_coords=None if sites is None else [site.frac_coords for site in sites],
+            numerical_tol=numerical_tol,
+            exclude_self=exclude_self,
+            nthreads=nthreads,
+        )
+
+    def get_verlet_neighbor_list(self, r: float, skin: float = 0.0, nthreads: int = None):
+        """
+        Get a Verlet neighbor list built for this structure, which can be
+        reused for slightly perturbed versions of it (e.g., subsequent
+        frames of a molecular dynamics run) as long as no atom moves by more
+        than skin / 2.
+
+        Args:
+            r (float): Radius of sphere.
+            skin (float): Skin distance added to r for the candidate pairs.
+            nthreads (int): Number of threads used to build the candidate
+                pairs. Defaults to None, i.e., serial.
+
+        Returns:
+            :class:`pymatgen.optimization.neighbor_list.VerletNeighborList`.
+            Call its update method with a structure to get its
+            (center_indices, points_indices, offset_vectors, distances).
+        """
+        from pymatgen.optimization.neighbor_list import VerletNeighborList
+
+        neighbor_list = VerletNeighborList(r, skin=skin, nthreads=nthreads)
+        neighbor_list.build(self.frac_coords, self.lattice.matrix)
+        return neighbor_list
+
     def get_all_neighbors(
         self,
         r: float,
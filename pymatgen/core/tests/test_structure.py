@@ -477,6 +477,22 @@ class IStructureTest(PymatgenTest):
         p_indices1, p_indices2, p_offsets, p_distances = s._get_neighbor_list_py(3)
         self.assertArrayAlmostEqual(sorted(c_distances), sorted(p_distances))
 
+    def test_get_neighbor_list_cells(self):
+        s = Structure.from_sites(self.struct * (3, 3, 3))
+        for r in [2, 4, 8]:
+            c_indices1, c_indices2, c_offsets, c_distances = s.get_neighbor_list(r)
+            l_indices1, l_indices2, l_offsets, l_distances = s.get_neighbor_list_cells(r)
+            self.assertEqual(
+                sorted(zip(c_indices1, c_indices2, map(tuple, c_offsets))),
+                sorted(zip(l_indices1, l_indices2, map(tuple, l_offsets))),
+            )
+            self.assertArrayAlmostEqual(sorted(c_distances), sorted(l_distances))
+        nl = s.get_verlet_neighbor_list(4, skin=0.5)
+        s.perturb(0.1)
+        l_indices1, l_indices2, l_offsets, l_distances = nl.update(s)
+        self.assertEqual(nl.nbuilds, 1)
+        self.assertArrayAlmostEqual(sorted(s.get_neighbor_list(4)[3]), sorted(l_distances))
+
     # @unittest.skipIf(not os.environ.get("CI"), "Only run this in CI tests.")
     # def test_get_all_neighbors_crosscheck_old(self):
     #     warnings.simplefilter("ignore")
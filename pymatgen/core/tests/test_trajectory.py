@@ -1,10 +1,11 @@
 import os
 
 import numpy as np
+from monty.tempfile import ScratchDir
 
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Structure
-from pymatgen.core.trajectory import Trajectory
+from pymatgen.core.trajectory import DiskTrajectory, Trajectory
 from pymatgen.io.vasp.inputs import Poscar
 from pymatgen.io.vasp.outputs import Xdatcar
 from pymatgen.util.testing import PymatgenTest
@@ -481,6 +482,22 @@ class TrajectoryTest(PymatgenTest):
 
         self.assertTrue(np.allclose(traj.frac_coords, displacements))
 
+    def test_iter_neighbor_lists(self):
+        from pymatgen.optimization.neighbor_list import VerletNeighborList
+
+        neighbor_list = VerletNeighborList(3.0, skin=0.5)
+        traj = self.traj[:20]
+        for structure, (center_indices, points_indices, images, distances) in zip(
+            traj, traj.iter_neighbor_lists(3.0, neighbor_list=neighbor_list)
+        ):
+            self.assertArrayAlmostEqual(sorted(distances), sorted(structure.get_neighbor_list(3.0)[3]))
+        self.assertLess(neighbor_list.nbuilds, 20)
+
+        structure = traj[19]
+        traj.to_displacements()
+        *_, (center_indices, points_indices, images, distances) = traj.iter_neighbor_lists(3.0)
+        self.assertArrayAlmostEqual(sorted(distances), sorted(structure.get_neighbor_list(3.0)[3]))
+
     def test_variable_lattice(self):
         structure = self.structures[0]
 
@@ -512,6 +529,63 @@ class TrajectoryTest(PymatgenTest):
         os.remove("traj_test_XDATCAR")
 
 
+class DiskTrajectoryTest(PymatgenTest):
+    def setUp(self):
+        self.traj = Trajectory.from_file(os.path.join(PymatgenTest.TEST_FILES_DIR, "Traj_XDATCAR"))
+
+    def test_from_trajectory(self):
+        with ScratchDir("."):
+            traj = DiskTrajectory.from_trajectory("traj", self.traj, chunk_size=7)
+            self.assertIsInstance(traj.frac_coords, np.memmap)
+            self.assertEqual(len(traj), len(self.traj))
+            self.assertEqual(traj[42], self.traj[42])
+            self.assertEqual(traj.get_structure(-1), self.traj.get_structure(-1))
+            self.assertEqual(list(traj[10:20:3]), list(self.traj[10:20:3]))
+
+            traj = DiskTrajectory.from_dict(traj.as_dict())
+            self.assertEqual(traj[99], self.traj[99])
+
+            traj.to_displacements()
+            self.traj.to_displacements()
+            self.assertArrayAlmostEqual(traj.frac_coords, self.traj.frac_coords)
+            self.assertArrayAlmostEqual(traj[5], self.traj[5])
+            traj.to_positions()
+            self.assertEqual(traj[5], DiskTrajectory("traj")[5])
+
+    def test_extend(self):
+        with ScratchDir("."):
+            first = self.traj[0]
+            traj = DiskTrajectory.from_trajectory("traj", self.traj[:30], chunk_size=8)
+            traj.to_displacements()
+            traj.extend(self.traj[30:])
+            self.assertTrue(traj.coords_are_displacement)
+            self.traj.to_displacements()
+            self.assertArrayAlmostEqual(traj.frac_coords, self.traj.frac_coords)
+            traj.to_positions()
+            self.assertEqual(len(DiskTrajectory("traj")), 100)
+            self.assertEqual(os.path.getsize(os.path.join("traj", "frac_coords.f8")), traj.frac_coords.nbytes)
+            self.assertTrue(traj.constant_lattice)
+
+            # Extending with another lattice switches to a variable lattice.
+            structure = first.copy()
+            structure.scale_lattice(structure.volume * 1.1)
+            traj.extend(Trajectory.from_structures([structure]))
+            self.assertFalse(traj.constant_lattice)
+            self.assertEqual(len(traj), 101)
+            self.assertEqual(traj[100], structure)
+            self.assertEqual(traj[0], first)
+
+            with self.assertRaises(ValueError):
+                traj.extend(Trajectory.from_structures([structure], time_step=1))
+
+    def test_from_structures(self):
+        structures = list(self.traj[:5])
+        with ScratchDir("."):
+            traj = DiskTrajectory.from_structures(structures, dirname="traj", constant_lattice=False)
+            self.assertEqual(list(traj), structures)
+            self.assertRaises(ValueError, DiskTrajectory.from_structures, structures)
+
+
 if __name__ == "__main__":
     import unittest
 
@@ -7,6 +7,7 @@ This module provides classes used to define a MD trajectory.
 """
 
 import itertools
+import json
 import os
 import warnings
 from fnmatch import fnmatch
@@ -14,7 +15,7 @@ from typing import List, Sequence, Union
 
 import numpy as np
 from monty.io import zopen
-from monty.json import MSONable
+from monty.json import MontyDecoder, MontyEncoder, MSONable
 
 from pymatgen.core.structure import (
     Composition,
@@ -182,6 +183,39 @@ class Trajectory(MSONable):
             np.shape(trajectory.frac_coords)[0],
         )
 
+    def iter_neighbor_lists(self, r, skin=0.3, neighbor_list=None):
+        """
+        Iterate over the neighbor lists of all frames, reusing a single
+        Verlet neighbor list which is only rebuilt when an atom moved by more
+        than skin / 2 since the last build, or when the lattice changes. For
+        typical MD time steps, the per frame cost is then O(number of
+        neighbor pairs) and no Structure is created.
+
+        Args:
+            r (float): Radius of sphere.
+            skin (float): Skin distance of the Verlet neighbor list.
+            neighbor_list (VerletNeighborList): Neighbor list to use instead
+                of a new one built with r and skin, e.g., to inspect its
+                number of builds or to continue from another trajectory.
+
+        Yields:
+            (center_indices, points_indices, offset_vectors, distances) of
+            each frame, with the same conventions as
+            IStructure.get_neighbor_list.
+        """
+        from pymatgen.optimization.neighbor_list import VerletNeighborList
+
+        if neighbor_list is None:
+            neighbor_list = VerletNeighborList(r, skin=skin)
+        frac_coords = self.base_positions
+        for i in range(len(self)):
+            if self.coords_are_displacement:
+                frac_coords = frac_coords + self.frac_coords[i]
+            else:
+                frac_coords = self.frac_coords[i]
+            lattice = self.lattice if self.constant_lattice else self.lattice[i]
+            yield neighbor_list.update_coords(frac_coords, lattice)
+
     def __iter__(self):
         for i in range(np.shape(self.frac_coords)[0]):
             yield self[i]
@@ -527,3 +561,315 @@ class Trajectory(MSONable):
 
         with zopen(filename, "wt") as f:
             f.write(xdatcar_string)
+
+
+class DiskTrajectory(Trajectory):
+    """
+    Trajectory stored on disk in a directory, for MD runs too long to be held
+    in memory. The fractional coordinates (and lattices, for a variable
+    lattice) are stored as raw float64 arrays which are memory-mapped, so
+    that indexing, get_structure and iteration only read the requested
+    frames, and extend appends the new frames to the files without rewriting
+    them. The species and site and frame properties are stored in a
+    metadata.json file.
+
+    to_displacements writes the displacements to a separate file, in
+    chunks, and only computes those of frames appended since the last call.
+    to_positions switches back to the stored positions, which are never
+    modified, i.e., unlike for Trajectory, positions are not unwrapped by a
+    round trip through displacements.
+
+    Usage::
+
+        traj = DiskTrajectory.from_trajectory("traj_dir", Trajectory.from_file("XDATCAR"))
+        traj.extend(Trajectory.from_file("XDATCAR.2"))
+        structure = DiskTrajectory("traj_dir")[1000]
+    """
+
+    METADATA_FILE = "metadata.json"
+    POSITIONS_FILE = "frac_coords.f8"
+    LATTICE_FILE = "lattice.f8"
+    DISPLACEMENTS_FILE = "displacements.f8"
+
+    def __init__(self, dirname: str, chunk_size: int = 1000):
+        """
+        Open a trajectory previously stored with DiskTrajectory.create or
+        DiskTrajectory.from_trajectory.
+
+        Args:
+            dirname (str): Directory of the trajectory.
+            chunk_size (int): Number of frames processed at once when
+                converting to displacements or appending frames.
+        """
+        self.dirname = dirname
+        self.chunk_size = chunk_size
+        self.coords_are_displacement = False
+        self._load()
+
+    def _load(self):
+        """
+        (Re)load the metadata and memory maps.
+        """
+        with open(os.path.join(self.dirname, self.METADATA_FILE), "rt") as f:
+            metadata = json.load(f, cls=MontyDecoder)
+        self.species = metadata["species"]
+        self.time_step = metadata["time_step"]
+        self.site_properties = metadata["site_properties"]
+        self.frame_properties = metadata["frame_properties"]
+        self.constant_lattice = metadata["constant_lattice"]
+        shape = (metadata["nframes"], len(self.species), 3)
+        self._positions = np.memmap(
+            os.path.join(self.dirname, self.POSITIONS_FILE), dtype=np.float64, mode="r", shape=shape
+        )
+        if self.constant_lattice:
+            self.lattice = np.array(metadata["lattice"])
+        else:
+            self.lattice = np.memmap(
+                os.path.join(self.dirname, self.LATTICE_FILE), dtype=np.float64, mode="r", shape=(shape[0], 3, 3)
+            )
+        self.base_positions = self._positions[0]
+        if self.coords_are_displacement:
+            self.coords_are_displacement = False
+            self.to_displacements()
+        else:
+            self.frac_coords = self._positions
+
+    def _write_metadata(self, nframes, lattice=None):
+        metadata = {
+            "species": self.species,
+            "time_step": self.time_step,
+            "site_properties": self.site_properties,
+            "frame_properties": self.frame_properties,
+            "constant_lattice": self.constant_lattice,
+            "lattice": lattice,
+            "nframes": nframes,
+        }
+        with open(os.path.join(self.dirname, self.METADATA_FILE), "wt") as f:
+            json.dump(metadata, f, cls=MontyEncoder)
+
+    @classmethod
+    def create(
+        cls,
+        dirname: str,
+        lattice: Union[Sequence[Sequence[float]], np.ndarray, Lattice],
+        species: List[Union[str, Element, Species, DummySpecies, Composition]],
+        frac_coords: Union[List[Sequence[Sequence[float]]], np.ndarray],
+        time_step: float = 2,
+        site_properties: dict = None,
+        frame_properties: dict = None,
+        constant_lattice: bool = True,
+        chunk_size: int = 1000,
+    ):
+        """
+        Create a trajectory on disk. The arguments are the same as for
+        Trajectory, except for coords_are_displacement and base_positions, as
+        positions are always stored.
+
+        Args:
+            dirname (str): Directory to store the trajectory in. Created if it
+                does not exist. Any trajectory already stored in it is
+                overwritten.
+            lattice: Lattice, or list of lattices of each frame if
+                constant_lattice is False.
+            species: List of species on each site.
+            frac_coords (MxNx3 array): Fractional coordinates of each frame.
+                Can be a memory-mapped array, which is copied in chunks.
+            time_step (int, float): Timestep of simulation in femtoseconds.
+            site_properties (list): Site properties of each frame, see
+                Trajectory.
+            frame_properties (dict): Frame properties, see Trajectory.
+            constant_lattice (bool): Whether the lattice is constant.
+            chunk_size (int): Number of frames processed at once.
+
+        Returns:
+            DiskTrajectory
+        """
+        os.makedirs(dirname, exist_ok=True)
+        if isinstance(lattice, Lattice):
+            lattice = lattice.matrix
+        traj = cls.__new__(cls)
+        traj.dirname = dirname
+        traj.chunk_size = chunk_size
+        traj.species = species
+        traj.time_step = time_step
+        traj.site_properties = site_properties
+        traj.frame_properties = frame_properties
+        traj.constant_lattice = constant_lattice or np.shape(lattice) == (3, 3)
+        for filename in [cls.POSITIONS_FILE, cls.LATTICE_FILE, cls.DISPLACEMENTS_FILE]:
+            if os.path.exists(os.path.join(dirname, filename)):
+                os.remove(os.path.join(dirname, filename))
+        traj._append_arrays(frac_coords, None if traj.constant_lattice else lattice)
+        traj._write_metadata(len(frac_coords), np.array(lattice).tolist() if traj.constant_lattice else None)
+        traj.coords_are_displacement = False
+        traj._load()
+        return traj
+
+    @classmethod
+    def from_trajectory(cls, dirname: str, trajectory: Trajectory, chunk_size: int = 1000):
+        """
+        Store a trajectory on disk.
+
+        Args:
+            dirname (str): Directory to store the trajectory in.
+            trajectory (Trajectory): Trajectory to store. Converted to
+                positions if it is in displacement mode.
+            chunk_size (int): Number of frames processed at once.
+
+        Returns:
+            DiskTrajectory
+        """
+        trajectory.to_positions()
+        return cls.create(
+            dirname,
+            trajectory.lattice,
+            trajectory.species,
+            trajectory.frac_coords,
+            time_step=trajectory.time_step,
+            site_properties=trajectory.site_properties,
+            frame_properties=trajectory.frame_properties,
+            constant_lattice=trajectory.constant_lattice,
+            chunk_size=chunk_size,
+        )
+
+    @classmethod
+    def from_structures(cls, structures, constant_lattice=True, dirname=None, **kwargs):
+        """
+        Store a list of structures as a trajectory on disk.
+
+        Args:
+            structures (list): list of pymatgen Structure objects.
+            constant_lattice (bool): Whether the lattice changes during the
+                simulation.
+            dirname (str): Directory to store the trajectory in.
+            **kwargs: Passed to Trajectory.
+
+        Returns:
+            DiskTrajectory
+        """
+        if dirname is None:
+            raise ValueError("dirname is required for a DiskTrajectory")
+        return cls.from_trajectory(dirname, Trajectory.from_structures(structures, constant_lattice, **kwargs))
+
+    @classmethod
+    def from_file(cls, filename, constant_lattice=True, dirname=None, **kwargs):
+        """
+        Store the trajectory in a XDATCAR or vasprun.xml file on disk.
+
+        Args:
+            filename (str): The filename to read from.
+            constant_lattice (bool): Whether the lattice changes during the
+                simulation.
+            dirname (str): Directory to store the trajectory in.
+            **kwargs: Passed to Trajectory.
+
+        Returns:
+            DiskTrajectory
+        """
+        if dirname is None:
+            raise ValueError("dirname is required for a DiskTrajectory")
+        return cls.from_trajectory(dirname, Trajectory.from_file(filename, constant_lattice, **kwargs))
+
+    def _append_arrays(self, frac_coords=None, lattices=None):
+        """
+        Append frames to the coordinate and/or lattice files, in chunks.
+        """
+        for filename, array in [(self.POSITIONS_FILE, frac_coords), (self.LATTICE_FILE, lattices)]:
+            if array is None:
+                continue
+            with open(os.path.join(self.dirname, filename), "ab") as f:
+                for i in range(0, len(array), self.chunk_size):
+                    f.write(np.ascontiguousarray(array[i : i + self.chunk_size], dtype=np.float64).tobytes())
+
+    def to_positions(self):
+        """
+        Switch back to the stored positions.
+        """
+        if self.coords_are_displacement:
+            self.frac_coords = self._positions
+            self.coords_are_displacement = False
+
+    def to_displacements(self):
+        """
+        Converts position coordinates of trajectory into displacements between
+        consecutive frames, stored in a separate memory-mapped file.
+        """
+        if self.coords_are_displacement:
+            return
+        filename = os.path.join(self.dirname, self.DISPLACEMENTS_FILE)
+        frame_size = len(self.species) * 3 * 8
+        start = os.path.getsize(filename) // frame_size if os.path.exists(filename) else 0
+        with open(filename, "r+b" if start else "wb") as f:
+            f.seek(start * frame_size)
+            for i in range(start, len(self._positions), self.chunk_size):
+                positions = self._positions[max(i - 1, 0) : i + self.chunk_size]
+                displacements = np.diff(positions, axis=0)
+                displacements -= np.round(displacements)
+                if i == 0:
+                    displacements = np.concatenate([np.zeros((1,) + positions.shape[1:]), displacements])
+                f.write(np.ascontiguousarray(displacements, dtype=np.float64).tobytes())
+        self.frac_coords = np.memmap(filename, dtype=np.float64, mode="r", shape=self._positions.shape)
+        self.coords_are_displacement = True
+
+    def extend(self, trajectory):
+        """
+        Append the frames of another trajectory to the files, without
+        rewriting the stored frames.
+
+        Args:
+            trajectory (Trajectory): Trajectory to add
+        """
+        if self.time_step != trajectory.time_step:
+            raise ValueError("Trajectory not extended: Time steps of trajectories is incompatible")
+
+        if len(self.species) != len(trajectory.species) and self.species != trajectory.species:
+            raise ValueError("Trajectory not extended: species in trajectory do not match")
+
+        trajectory.to_positions()
+        len_1, len_2 = len(self), len(trajectory)
+
+        # Drop frames written by an interrupted extend but not recorded in
+        # the metadata.
+        os.truncate(os.path.join(self.dirname, self.POSITIONS_FILE), self._positions.nbytes)
+        if not self.constant_lattice:
+            os.truncate(os.path.join(self.dirname, self.LATTICE_FILE), self.lattice.nbytes)
+
+        lattice = self.lattice.tolist() if self.constant_lattice else None
+        lattices = None
+        if not (
+            self.constant_lattice and trajectory.constant_lattice and np.allclose(self.lattice, trajectory.lattice)
+        ):
+            if self.constant_lattice:
+                # Write out the lattice of every stored frame.
+                for i in range(0, len_1, self.chunk_size):
+                    self._append_arrays(lattices=np.tile(self.lattice, (min(self.chunk_size, len_1 - i), 1, 1)))
+                self.constant_lattice = False
+                lattice = None
+            if trajectory.constant_lattice:
+                lattices = np.tile(trajectory.lattice, (len_2, 1, 1))
+            else:
+                lattices = trajectory.lattice
+
+        self.site_properties = self._combine_site_props(self.site_properties, trajectory.site_properties, len_1, len_2)
+        self.frame_properties = self._combine_frame_props(
+            self.frame_properties, trajectory.frame_properties, len_1, len_2
+        )
+        self._append_arrays(trajectory.frac_coords, lattices)
+        self._write_metadata(len_1 + len_2, lattice)
+        self._load()
+
+    def copy(self):
+        """
+        :return: DiskTrajectory of the same directory. The data is not copied.
+        """
+        return DiskTrajectory(self.dirname, chunk_size=self.chunk_size)
+
+    def as_dict(self):
+        """
+        :return: MSONAble dict. Only the directory is serialized.
+        """
+        return {
+            "@module": self.__class__.__module__,
+            "@class": self.__class__.__name__,
+            "dirname": self.dirname,
+            "chunk_size": self.chunk_size,
+        }
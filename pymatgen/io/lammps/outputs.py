@@ -60,15 +60,7 @@ class LammpsDump(MSONable):
         lines = string.split("\n")
         timestep = int(lines[1])
         natoms = int(lines[3])
-        box_arr = np.loadtxt(StringIO("\n".join(lines[5:8])))
-        bounds = box_arr[:, :2]
-        tilt = None
-        if "xy xz yz" in lines[4]:
-            tilt = box_arr[:, 2]
-            x = (0, tilt[0], tilt[1], tilt[0] + tilt[1])
-            y = (0, tilt[2])
-            bounds -= np.array([[min(x), max(x)], [min(y), max(y)], [0, 0]])
-        box = LammpsBox(bounds, tilt)
+        box = _parse_box(lines[4], lines[5:8])
         data_head = lines[8].replace("ITEM: ATOMS", "").split()
         data = pd.read_csv(StringIO("\n".join(lines[9:])), names=data_head, delim_whitespace=True)
         return cls(timestep, natoms, box, data)
@@ -114,13 +106,7 @@ def parse_lammps_dumps(file_pattern):
         LammpsDump for each available snapshot.
 
     """
-    files = glob.glob(file_pattern)
-    if len(files) > 1:
-        pattern = r"%s" % file_pattern.replace("*", "([0-9]+)")
-        pattern = pattern.replace("\\", "\\\\")
-        files = sorted(files, key=lambda f: int(re.match(pattern, f).group(1)))
-
-    for fname in files:
+    for fname in _get_dump_files(file_pattern):
         with zopen(fname, "rt") as f:
             dump_cache = []
             for line in f:
@@ -133,6 +119,160 @@ def parse_lammps_dumps(file_pattern):
             yield LammpsDump.from_string("".join(dump_cache))
 
 
+def _parse_box(header, lines):
+    """
+    Parses the simulation box of a dump snapshot.
+
+    Args:
+        header (str): "ITEM: BOX BOUNDS ..." line.
+        lines ([str]): The 3 following lines.
+
+    Returns:
+        LammpsBox
+    """
+    box_arr = np.loadtxt(StringIO("\n".join(lines)))
+    bounds = box_arr[:, :2]
+    tilt = None
+    if "xy xz yz" in header:
+        tilt = box_arr[:, 2]
+        x = (0, tilt[0], tilt[1], tilt[0] + tilt[1])
+        y = (0, tilt[2])
+        bounds -= np.array([[min(x), max(x)], [min(y), max(y)], [0, 0]])
+    return LammpsBox(bounds, tilt)
+
+
+def _get_dump_files(file_pattern):
+    """
+    Returns the dump files matching a pattern, sorted by timestep if the
+    pattern contains a wildcard.
+    """
+    files = glob.glob(file_pattern)
+    if len(files) > 1:
+        pattern = r"%s" % file_pattern.replace("*", "([0-9]+)")
+        pattern = pattern.replace("\\", "\\\\")
+        files = sorted(files, key=lambda f: int(re.match(pattern, f).group(1)))
+    return files
+
+
+def iter_lammps_dump_trajectories(
+    file_pattern, species_map=None, start=0, stop=None, step=1, block_size=1000, time_step=1
+):
+    """
+    Generator that parses dump file(s) directly into blocks of fractional
+    coordinates, without creating LammpsDump objects or DataFrames, nor
+    holding more than one block in memory. This is suited to feeding
+    Trajectory or DiffusionAnalyzer from very large dumps.
+
+    The coordinates are taken from the first available of the xs ys zs,
+    xsu ysu zsu, x y z or xu yu zu columns. Wrapped coordinates (xs ys zs or
+    x y z) are unwrapped with the ix iy iz image flags if present. Atoms are
+    sorted by id if an id column is present.
+
+    Args:
+        file_pattern (str): Filename to parse. The timestep wildcard
+            (e.g., dump.atom.'*') is supported and the files are parsed
+            in the sequence of timestep.
+        species_map (dict): Mapping of the atom types to species, e.g.,
+            {1: "Li", 2: "O"}. Not needed if the dump has an element column.
+        start (int): Index of the first snapshot to read, starting from 0.
+        stop (int): Index of the snapshot to stop at (excluded). Defaults to
+            reading all snapshots.
+        step (int): Read every step-th snapshot. The atomic data of the
+            skipped snapshots is not parsed.
+        block_size (int): Number of snapshots in each yielded Trajectory.
+        time_step (float): Time step between snapshots in fs. The yielded
+            trajectories have time_step * step, the time between their
+            frames.
+
+    Yields:
+        Trajectory of up to block_size snapshots, with their timesteps in the
+        "timestep" frame property. Its lattice is constant if the box is the
+        same for all snapshots of the block.
+    """
+    # pylint: disable=C0415
+    from pymatgen.core.trajectory import Trajectory
+
+    if start < 0 or (stop is not None and stop < 0) or step < 1:
+        raise ValueError("start and stop must be non-negative and step positive")
+
+    species = None
+    lattices, frac_coords, timesteps = [], [], []
+
+    def get_trajectory():
+        constant_lattice = np.allclose(lattices, lattices[0])
+        return Trajectory(
+            lattices[0] if constant_lattice else np.array(lattices),
+            species,
+            np.array(frac_coords),
+            time_step=time_step * step,
+            frame_properties={"timestep": timesteps},
+            constant_lattice=constant_lattice,
+        )
+
+    isnapshot = 0
+    for fname in _get_dump_files(file_pattern):
+        with zopen(fname, "rt") as f:
+            while stop is None or isnapshot < stop:
+                line = f.readline()
+                if not line:
+                    break
+                if not line.startswith("ITEM: TIMESTEP"):
+                    continue
+                timestep = int(f.readline())
+                f.readline()
+                natoms = int(f.readline())
+                box_header = f.readline()
+                box_lines = [f.readline() for i in range(3)]
+                columns = f.readline().replace("ITEM: ATOMS", "").split()
+                if isnapshot < start or (isnapshot - start) % step != 0:
+                    for i in range(natoms):
+                        f.readline()
+                    isnapshot += 1
+                    continue
+
+                data = np.array([f.readline().split() for i in range(natoms)])
+                if data.shape != (natoms, len(columns)):
+                    # Incomplete last snapshot.
+                    break
+                if "id" in columns:
+                    data = data[np.argsort(data[:, columns.index("id")].astype(int), kind="stable")]
+
+                box = _parse_box(box_header, box_lines)
+                lattice = box.to_lattice()
+                for labels, scaled, wrapped in [
+                    (("xs", "ys", "zs"), True, True),
+                    (("xsu", "ysu", "zsu"), True, False),
+                    (("x", "y", "z"), False, True),
+                    (("xu", "yu", "zu"), False, False),
+                ]:
+                    if all(label in columns for label in labels):
+                        coords = data[:, [columns.index(label) for label in labels]].astype(np.float64)
+                        if not scaled:
+                            coords = lattice.get_fractional_coords(coords - np.array(box.bounds)[:, 0])
+                        break
+                else:
+                    raise ValueError("No atomic coordinates found in the columns of {}".format(fname))
+                if wrapped and all(label in columns for label in ("ix", "iy", "iz")):
+                    coords += data[:, [columns.index(label) for label in ("ix", "iy", "iz")]].astype(np.float64)
+
+                if "element" in columns:
+                    species = list(data[:, columns.index("element")])
+                elif species_map is not None:
+                    species = [species_map[t] for t in data[:, columns.index("type")].astype(int)]
+                else:
+                    raise ValueError("species_map is required for dumps without an element column")
+
+                lattices.append(lattice.matrix)
+                frac_coords.append(coords)
+                timesteps.append(timestep)
+                if len(frac_coords) == block_size:
+                    yield get_trajectory()
+                    lattices, frac_coords, timesteps = [], [], []
+                isnapshot += 1
+    if frac_coords:
+        yield get_trajectory()
+
+
 def parse_lammps_log(filename="log.lammps"):
     """
     Parses log file with focus on thermo data. Both one and multi line
@@ -7,8 +7,15 @@ import unittest
 
 import numpy as np
 import pandas as pd
+from monty.tempfile import ScratchDir
 
-from pymatgen.io.lammps.outputs import LammpsDump, parse_lammps_dumps, parse_lammps_log
+from pymatgen.core.composition import Composition
+from pymatgen.io.lammps.outputs import (
+    LammpsDump,
+    iter_lammps_dump_trajectories,
+    parse_lammps_dumps,
+    parse_lammps_log,
+)
 from pymatgen.util.testing import PymatgenTest
 
 test_dir = os.path.join(PymatgenTest.TEST_FILES_DIR, "lammps")
@@ -69,6 +76,44 @@ class FuncTest(unittest.TestCase):
         np.testing.assert_array_equal(timesteps_25, np.arange(0, 101, 25))
         self.assertTupleEqual(rdx_25[-1].data.shape, (21, 5))
 
+    def test_iter_lammps_dump_trajectories(self):
+        species_map = {1: "C", 2: "H", 3: "N", 4: "O"}
+        rdx_pattern = os.path.join(test_dir, "dump.rdx.gz")
+        dumps = list(parse_lammps_dumps(rdx_pattern))
+        trajs = list(iter_lammps_dump_trajectories(rdx_pattern, species_map, start=1, step=2, block_size=2))
+        self.assertEqual([len(t) for t in trajs], [2, 2, 1])
+        timesteps = [ts for t in trajs for ts in t.frame_properties["timestep"]]
+        self.assertEqual(timesteps, [d.timestep for d in dumps[1::2]])
+        frac_coords = np.concatenate([t.frac_coords for t in trajs])
+        for d, fc in zip(dumps[1::2], frac_coords):
+            np.testing.assert_array_almost_equal(d.data.sort_values("id")[["xs", "ys", "zs"]], fc)
+        self.assertEqual(trajs[0][0].composition, Composition("C3H6N6O6"))
+        self.assertEqual(trajs[0].time_step, 2)
+        trajs = list(iter_lammps_dump_trajectories(os.path.join(test_dir, "dump.rdx_wc.*"), species_map, stop=2))
+        self.assertEqual(trajs[0].frame_properties["timestep"], [0, 25])
+
+        tatb_file = os.path.join(test_dir, "dump.tatb")
+        tatb = list(parse_lammps_dumps(tatb_file))[0]
+        traj = list(iter_lammps_dump_trajectories(tatb_file, species_map))[0]
+        np.testing.assert_array_almost_equal(traj.lattice, tatb.box.to_lattice().matrix)
+        cart_coords = tatb.data.sort_values("id")[["x", "y", "z"]] - np.array(tatb.box.bounds)[:, 0]
+        np.testing.assert_array_almost_equal(traj.frac_coords[0], traj[0].lattice.get_fractional_coords(cart_coords))
+        self.assertRaises(ValueError, lambda: list(iter_lammps_dump_trajectories(tatb_file)))
+
+        # Image flags only unwrap the wrapped coordinates.
+        header = "ITEM: TIMESTEP\n0\nITEM: NUMBER OF ATOMS\n1\nITEM: BOX BOUNDS pp pp pp\n0 10\n0 10\n0 10\n"
+        with ScratchDir("."):
+            for columns, values, expected in [
+                ("xs ys zs", "0.1 0.2 0.3", [1.1, 0.2, -0.7]),
+                ("xsu ysu zsu", "1.1 0.2 -0.7", [1.1, 0.2, -0.7]),
+                ("x y z", "1 2 3", [1.1, 0.2, -0.7]),
+                ("xu yu zu", "11 2 -7", [1.1, 0.2, -0.7]),
+            ]:
+                with open("dump.test", "w") as f:
+                    f.write(header + "ITEM: ATOMS id type {} ix iy iz\n1 1 {} 1 0 -1\n".format(columns, values))
+                traj = list(iter_lammps_dump_trajectories("dump.test", species_map))[0]
+                np.testing.assert_array_almost_equal(traj.frac_coords[0], [expected])
+
     def test_parse_lammps_log(self):
         comb_file = "log.5Oct16.comb.Si.elastic.g++.1"
         comb = parse_lammps_log(filename=os.path.join(test_dir, comb_file))
@@ -15,7 +15,6 @@ import os
 import re
 import warnings
 import xml.etree.cElementTree as ET
-from io import StringIO
 from collections import defaultdict
 from typing import Optional, Tuple, List, Union, DefaultDict
 from pathlib import Path
@@ -117,6 +116,25 @@ def _parse_varray(elem):
     return m
 
 
+def _parse_rows(rows):
+    """
+    Bulk parser for a sequence of <r> or <v> elements containing only floats.
+    All values are converted in a single NumPy call, which is much faster than
+    _parse_varray for the large eigenvalue and projected eigenvalue blocks.
+
+    Args:
+        rows: Iterable of xml elements.
+
+    Returns:
+        Flat numpy array of all the values in rows.
+    """
+    tokens = " ".join([r.text for r in rows]).split()
+    try:
+        return np.array(tokens, dtype=np.float64)
+    except ValueError:
+        return np.array([_vasprun_float(t) for t in tokens])
+
+
 def _parse_from_incar(filename, key):
     """
     Helper function to parse a parameter from the INCAR.
@@ -280,6 +298,7 @@ class Vasprun(MSONable):
         parse_potcar_file=True,
         occu_tol=1e-8,
         exception_on_bad_xml=True,
+        parse_ionic_steps=True,
     ):
         """
         Args:
@@ -322,6 +341,16 @@ class Vasprun(MSONable):
                 proper vasprun.xml are parsed. You can set to False if you want
                 partial results (e.g., if you are monitoring a calculation during a
                 run), but use the results with care. A warning is issued.
+            parse_ionic_steps (bool/str): Which ionic steps to keep in memory.
+                Defaults to True, which keeps every (selected) ionic step in
+                ionic_steps. If set to "final", only the last ionic step is
+                kept while the file is streamed, so that parsing very long
+                AIMD runs uses constant memory. Properties that only need the
+                final step (final_energy, final_structure, converged, etc.)
+                are unaffected. Combine with parse_dos=False and
+                parse_eigen=False to read only the final structure and
+                energies. Use Vasprun.iter_ionic_steps to process all
+                ionic steps one at a time instead.
         """
         self.filename = filename
         self.ionic_step_skip = ionic_step_skip
@@ -329,35 +358,19 @@ class Vasprun(MSONable):
         self.occu_tol = occu_tol
         self.exception_on_bad_xml = exception_on_bad_xml
 
+        if parse_ionic_steps not in (True, "final"):
+            raise ValueError("parse_ionic_steps must be True or 'final', got %s." % parse_ionic_steps)
+
         with zopen(filename, "rt") as f:
-            if ionic_step_skip or ionic_step_offset:
-                # remove parts of the xml file and parse the string
-                run = f.read()
-                steps = run.split("<calculation>")
-                # The text before the first <calculation> is the preamble!
-                preamble = steps.pop(0)
-                self.nionic_steps = len(steps)
-                new_steps = steps[ionic_step_offset :: int(ionic_step_skip)]
-                # add the tailing informat in the last step from the run
-                to_parse = "<calculation>".join(new_steps)
-                if steps[-1] != new_steps[-1]:
-                    to_parse = "{}<calculation>{}{}".format(preamble, to_parse, steps[-1].split("</calculation>")[-1])
-                else:
-                    to_parse = "{}<calculation>{}".format(preamble, to_parse)
-                self._parse(
-                    StringIO(to_parse),
-                    parse_dos=parse_dos,
-                    parse_eigen=parse_eigen,
-                    parse_projected_eigen=parse_projected_eigen,
-                )
-            else:
-                self._parse(
-                    f,
-                    parse_dos=parse_dos,
-                    parse_eigen=parse_eigen,
-                    parse_projected_eigen=parse_projected_eigen,
-                )
-                self.nionic_steps = len(self.ionic_steps)
+            self._parse(
+                f,
+                parse_dos=parse_dos,
+                parse_eigen=parse_eigen,
+                parse_projected_eigen=parse_projected_eigen,
+                parse_ionic_steps=parse_ionic_steps,
+                ionic_step_skip=ionic_step_skip,
+                ionic_step_offset=ionic_step_offset,
+            )
 
             if parse_potcar_file:
                 self.update_potcar_spec(parse_potcar_file)
@@ -369,17 +382,118 @@ class Vasprun(MSONable):
             msg += "Ionic convergence reached: %s." % self.converged_ionic
             warnings.warn(msg, UnconvergedVASPWarning)
 
-    def _parse(self, stream, parse_dos, parse_eigen, parse_projected_eigen):
+    @classmethod
+    def iter_ionic_steps(cls, filename, ionic_step_skip=None, ionic_step_offset=0, exception_on_bad_xml=True):
+        """
+        Generator that streams the ionic steps of a vasprun.xml file one at a
+        time. Only the header (parameters, atomic symbols) and the current
+        ionic step are held in memory, which makes it suitable for iterating
+        over multi-GB AIMD runs.
+
+        Args:
+            filename (str): Filename to parse.
+            ionic_step_skip (int): If > 1, only every ionic_step_skip ionic
+                steps are parsed. Same meaning as in Vasprun.
+            ionic_step_offset (int): Index of the first ionic step parsed.
+                Same meaning as in Vasprun.
+            exception_on_bad_xml (bool): Whether to raise a ParseError if a
+                malformed XML is detected. If False, iteration stops at the
+                last complete ionic step with a warning.
+
+        Yields:
+            Ionic step as a dict, in the same format as the items of
+            Vasprun.ionic_steps.
+        """
+        vrun = cls.__new__(cls)
+        vrun.filename = filename
+        vrun.exception_on_bad_xml = exception_on_bad_xml
+        with zopen(filename, "rt") as f:
+            yield from vrun._iterparse(
+                f,
+                parse_dos=False,
+                parse_eigen=False,
+                parse_projected_eigen=False,
+                ionic_step_skip=ionic_step_skip,
+                ionic_step_offset=ionic_step_offset,
+            )
+
+    def _parse(
+        self,
+        stream,
+        parse_dos,
+        parse_eigen,
+        parse_projected_eigen,
+        parse_ionic_steps=True,
+        ionic_step_skip=None,
+        ionic_step_offset=0,
+    ):
+        ionic_steps = []
+        for step in self._iterparse(
+            stream,
+            parse_dos=parse_dos,
+            parse_eigen=parse_eigen,
+            parse_projected_eigen=parse_projected_eigen,
+            ionic_step_skip=ionic_step_skip,
+            ionic_step_offset=ionic_step_offset,
+        ):
+            if parse_ionic_steps == "final":
+                ionic_steps = [step]
+            else:
+                ionic_steps.append(step)
+        self.ionic_steps = ionic_steps
+        self.vasp_version = self.generator["version"]
+
+    def _iterparse(
+        self,
+        stream,
+        parse_dos,
+        parse_eigen,
+        parse_projected_eigen,
+        ionic_step_skip=None,
+        ionic_step_offset=0,
+    ):
+        """
+        Walks the xml stream, setting header and final run data as attributes
+        and yielding the selected ionic steps as they are parsed. Top-level
+        elements are dropped from the tree once processed, so memory use does
+        not grow with the number of ionic steps. Ionic steps that are not
+        selected by ionic_step_skip/ionic_step_offset are skipped without
+        being parsed, together with any data (dos, eigenvalues, ...) they
+        contain.
+        """
         self.efermi = None
         self.eigenvalues = None
         self.projected_eigenvalues = None
         self.dielectric_data = {}
         self.other_dielectric = {}
-        ionic_steps = []
+        self.nionic_steps = 0
+        step_skip = int(ionic_step_skip) if ionic_step_skip else 1
         parsed_header = False
+        root = None
+        depth = 0
+        icalc = -1
+        skip_calc = False
         try:
-            for event, elem in ET.iterparse(stream):
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
                 tag = elem.tag
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    elif tag == "calculation":
+                        icalc += 1
+                        skip_calc = icalc < ionic_step_offset or (icalc - ionic_step_offset) % step_skip != 0
+                    depth += 1
+                    continue
+                depth -= 1
+                if skip_calc:
+                    if tag == "calculation":
+                        parsed_header = True
+                        skip_calc = False
+                        self.nionic_steps += 1
+                        elem.clear()
+                        if depth == 1:
+                            root.remove(elem)
+                    continue
                 if not parsed_header:
                     if tag == "generator":
                         self.generator = self._parse_params(elem)
@@ -402,10 +516,15 @@ class Vasprun(MSONable):
                 if tag == "calculation":
                     parsed_header = True
                     if not self.parameters.get("LCHIMAG", False):
-                        ionic_steps.append(self._parse_calculation(elem))
+                        steps = [self._parse_calculation(elem)]
                     else:
-                        ionic_steps.extend(self._parse_chemical_shielding_calculation(elem))
-                elif parse_dos and tag == "dos":
+                        steps = self._parse_chemical_shielding_calculation(elem)
+                    self.nionic_steps += len(steps)
+                    if depth == 1:
+                        root.remove(elem)
+                    yield from steps
+                    continue
+                if parse_dos and tag == "dos":
                     try:
                         self.tdos, self.idos, self.pdos = self._parse_dos(elem)
                         self.efermi = self.tdos.efermi
@@ -458,6 +577,8 @@ class Vasprun(MSONable):
                         phonon_eigenvectors.append(np.array(ev).reshape(natoms, 3))
                     self.normalmode_eigenvals = np.array(eigenvalues)
                     self.normalmode_eigenvecs = np.array(phonon_eigenvectors)
+                if depth == 1:
+                    root.remove(elem)
         except ET.ParseError as ex:
             if self.exception_on_bad_xml:
                 raise ex
@@ -465,8 +586,6 @@ class Vasprun(MSONable):
                 "XML is malformed. Parsing has stopped but partial data" "is available.",
                 UserWarning,
             )
-        self.ionic_steps = ionic_steps
-        self.vasp_version = self.generator["version"]
 
     @property
     def structures(self):
@@ -1364,31 +1483,34 @@ class Vasprun(MSONable):
 
     @staticmethod
     def _parse_eigen(elem):
-        eigenvalues = defaultdict(list)
+        eigenvalues = {}
         for s in elem.find("array").find("set").findall("set"):
             spin = Spin.up if s.attrib["comment"] == "spin 1" else Spin.down
-            for ss in s.findall("set"):
-                eigenvalues[spin].append(_parse_varray(ss))
-        eigenvalues = {spin: np.array(v) for spin, v in eigenvalues.items()}
+            kpt_sets = s.findall("set")
+            nbands = len(kpt_sets[0].findall("r"))
+            eigenvalues[spin] = _parse_rows(s.iter("r")).reshape(len(kpt_sets), nbands, -1)
         elem.clear()
         return eigenvalues
 
     @staticmethod
     def _parse_projected_eigen(elem):
         root = elem.find("array").find("set")
-        proj_eigen = defaultdict(list)
+        proj_eigen = {}
         for s in root.findall("set"):
             spin = int(re.match(r"spin(\d+)", s.attrib["comment"]).group(1))
 
             # Force spin to be +1 or -1
             spin = Spin.up if spin == 1 else Spin.down
-            for kpt, ss in enumerate(s.findall("set")):
-                dk = []
-                for band, sss in enumerate(ss.findall("set")):
-                    db = _parse_varray(sss)
-                    dk.append(db)
-                proj_eigen[spin].append(dk)
-        proj_eigen = {spin: np.array(v) for spin, v in proj_eigen.items()}
+            kpt_sets = s.findall("set")
+            band_sets = kpt_sets[0].findall("set")
+            first_band = band_sets[0].findall("r")
+            shape = (len(band_sets), len(first_band), len(first_band[0].text.split()))
+            # Fill a preallocated buffer one k-point at a time, which keeps
+            # the intermediate string buffers small for dense k-meshes.
+            data = np.empty((len(kpt_sets),) + shape)
+            for kpt, ss in enumerate(kpt_sets):
+                data[kpt] = _parse_rows(ss.iter("r")).reshape(shape)
+            proj_eigen[spin] = data
         elem.clear()
         return proj_eigen
 
@@ -4306,6 +4428,97 @@ class Xdatcar:
         self.structures = structures
         self.comment = comment or self.structures[0].formula
 
+    @staticmethod
+    def iter_trajectories(filename, start=0, stop=None, step=1, block_size=1000, time_step=2):
+        """
+        Generator that parses an XDATCAR in blocks of frames, without creating
+        Structure objects or holding more than one block in memory. This
+        is suited to feeding Trajectory or DiffusionAnalyzer from very large
+        files. The lattice may change between frames, as in NPT runs.
+
+        Args:
+            filename (str): Filename of input XDATCAR file.
+            start (int): Index of the first frame to read, starting from 0.
+            stop (int): Index of the frame to stop at (excluded). Defaults to
+                reading all frames.
+            step (int): Read every step-th frame. The coordinates of the
+                skipped frames are not parsed.
+            block_size (int): Number of frames in each yielded Trajectory.
+            time_step (float): Time step between frames in fs. The yielded
+                trajectories have time_step * step, the time between their
+                frames.
+
+        Yields:
+            Trajectory of up to block_size frames. Its lattice is constant if
+            it is the same for all frames of the block.
+
+        Returns:
+            The number of frames in the file, or stop if smaller, as the value
+            of the generator, e.g., nframes = yield from iter_trajectories(...).
+        """
+        # pylint: disable=C0415
+        from pymatgen.core.trajectory import Trajectory
+
+        if start < 0 or (stop is not None and stop < 0) or step < 1:
+            raise ValueError("start and stop must be non-negative and step positive")
+
+        species = natoms = lattice = None
+        lattices, frac_coords = [], []
+
+        def get_trajectory():
+            constant_lattice = all(l is lattices[0] for l in lattices)
+            return Trajectory(
+                lattices[0] if constant_lattice else np.array(lattices),
+                species,
+                np.array(frac_coords),
+                time_step=time_step * step,
+                constant_lattice=constant_lattice,
+            )
+
+        iframe = 0
+        with zopen(filename, "rt") as f:
+            while stop is None or iframe < stop:
+                line = f.readline()
+                if not line:
+                    break
+                if species is not None and (not line.strip() or "configuration" in line.lower()):
+                    if iframe >= start and (iframe - start) % step == 0:
+                        # Coordinates may be followed by the species symbol.
+                        tokens = [f.readline().split()[:3] for i in range(natoms)]
+                        if any(len(t) < 3 for t in tokens):
+                            # Incomplete last frame, or trailing blank line.
+                            break
+                        coords = np.array(tokens, dtype=np.float64)
+                        if "cart" in line.lower():
+                            coords = np.linalg.solve(lattice.T, coords.T).T
+                        lattices.append(lattice)
+                        frac_coords.append(coords)
+                        if len(frac_coords) == block_size:
+                            yield get_trajectory()
+                            lattices, frac_coords = [], []
+                    else:
+                        for i in range(natoms):
+                            f.readline()
+                    iframe += 1
+                elif line.strip():
+                    header = [line] + [f.readline() for i in range(6)]
+                    scale = float(header[1].split()[0])
+                    lattice = np.array([l.split()[:3] for l in header[2:5]], dtype=np.float64)
+                    if scale < 0:
+                        lattice *= (-scale / abs(np.linalg.det(lattice))) ** (1 / 3)
+                    else:
+                        lattice *= scale
+                    symbols = [sym.split("_")[0].split("/")[0] for sym in header[5].split()]
+                    try:
+                        counts = [int(n) for n in header[6].split()]
+                    except ValueError:
+                        raise ValueError("Only XDATCAR files with a species line (VASP 5+) can be streamed")
+                    species = [sym for sym, n in zip(symbols, counts) for i in range(n)]
+                    natoms = len(species)
+        if frac_coords:
+            yield get_trajectory()
+        return iframe
+
     @property
     def site_symbols(self):
         """
@@ -282,6 +282,26 @@ class VasprunTest(PymatgenTest):
         self.assertIsNotNone(vasprun_no_pdos.complete_dos)
         self.assertFalse(vasprun_no_pdos.dos_has_errors)
 
+    def test_projected_eigen(self):
+        vasprun = Vasprun(
+            self.TEST_FILES_DIR / "vasprun_Si_bands.xml",
+            parse_projected_eigen=True,
+            parse_potcar_file=False,
+        )
+        self.assertEqual(vasprun.eigenvalues[Spin.up].shape, (160, 13, 2))
+        self.assertArrayAlmostEqual(vasprun.eigenvalues[Spin.up][0][1], [5.6157, 1.0])
+        self.assertEqual(vasprun.projected_eigenvalues[Spin.up].shape, (160, 13, 2, 9))
+        self.assertAlmostEqual(vasprun.projected_eigenvalues[Spin.up][0][0][0][0], 0.2119)
+
+        # Overflowed values are still parsed as nan by the bulk parser.
+        elem = ET.fromstring(
+            '<eigenvalues><array><set><set comment="spin 1"><set comment="kpoint 1">'
+            "<r> 1.0 ******* </r><r> -2.5 3.0 </r></set></set></set></array></eigenvalues>"
+        )
+        eigen = Vasprun._parse_eigen(elem)
+        self.assertTrue(np.isnan(eigen[Spin.up][0][0][1]))
+        self.assertArrayAlmostEqual(eigen[Spin.up][0][1], [-2.5, 3.0])
+
     def test_dielectric(self):
         vasprun_diel = Vasprun(self.TEST_FILES_DIR / "vasprun.xml.dielectric", parse_potcar_file=False)
         self.assertAlmostEqual(0.4294, vasprun_diel.dielectric[0][10])
@@ -381,6 +401,39 @@ class VasprunTest(PymatgenTest):
         vr = Vasprun(self.TEST_FILES_DIR / "vasprun.xml.xe", parse_potcar_file=False)
         self.assertEqual(vr.atomic_symbols, ["Xe"])
 
+    def test_parse_ionic_steps_final(self):
+        filepath = self.TEST_FILES_DIR / "vasprun.xml.xe"
+        vr = Vasprun(filepath, parse_potcar_file=False)
+        vr_final = Vasprun(
+            filepath,
+            parse_dos=False,
+            parse_eigen=False,
+            parse_potcar_file=False,
+            parse_ionic_steps="final",
+        )
+        self.assertEqual(len(vr_final.ionic_steps), 1)
+        self.assertEqual(vr_final.nionic_steps, vr.nionic_steps)
+        self.assertEqual(vr_final.final_energy, vr.final_energy)
+        self.assertEqual(vr_final.final_structure, vr.final_structure)
+        self.assertEqual(vr_final.ionic_steps[0]["structure"], vr.ionic_steps[-1]["structure"])
+        self.assertEqual(vr_final.converged, vr.converged)
+        self.assertRaises(ValueError, Vasprun, filepath, parse_ionic_steps=False)
+
+    def test_iter_ionic_steps(self):
+        filepath = self.TEST_FILES_DIR / "vasprun.xml.xe"
+        vr = Vasprun(filepath, parse_potcar_file=False)
+        steps = list(Vasprun.iter_ionic_steps(filepath))
+        self.assertEqual(len(steps), 7)
+        for step, ref in zip(steps, vr.ionic_steps):
+            self.assertEqual(step["structure"], ref["structure"])
+            self.assertEqual(step["e_fr_energy"], ref["e_fr_energy"])
+            self.assertEqual(len(step["electronic_steps"]), len(ref["electronic_steps"]))
+
+        vr_skip = Vasprun(filepath, 3, 1, parse_potcar_file=False)
+        steps = list(Vasprun.iter_ionic_steps(filepath, ionic_step_skip=3, ionic_step_offset=1))
+        self.assertEqual(len(steps), 2)
+        self.assertEqual([s["structure"] for s in steps], vr_skip.structures)
+
     def test_invalid_element(self):
         self.assertRaises(ValueError, Vasprun, self.TEST_FILES_DIR / "vasprun.xml.wrong_sp")
 
@@ -1645,6 +1698,35 @@ class XdatcarTest(PymatgenTest):
         self.assertEqual(len(x.structures), 8)
         self.assertIsNotNone(x.get_string())
 
+    def test_iter_trajectories(self):
+        filepath = self.TEST_FILES_DIR / "Traj_XDATCAR"
+        structures = Xdatcar(filepath).structures
+        trajs = list(Xdatcar.iter_trajectories(filepath, start=3, stop=90, step=4, block_size=10))
+        self.assertEqual([len(t) for t in trajs], [10, 10, 2])
+        self.assertTrue(all(t.constant_lattice for t in trajs))
+        self.assertEqual([s for t in trajs for s in t], structures[3:90:4])
+        self.assertEqual(trajs[0].time_step, 8)
+
+        for filename in ["XDATCAR_4", "XDATCAR_5"]:
+            trajs = list(Xdatcar.iter_trajectories(self.TEST_FILES_DIR / filename))
+            self.assertEqual(list(trajs[0]), Xdatcar(self.TEST_FILES_DIR / filename).structures)
+
+        # Variable cell, with a header before each frame.
+        with ScratchDir("."):
+            with open("XDATCAR", "w") as f:
+                for i, s in enumerate(structures[:3]):
+                    s = s.copy()
+                    s.scale_lattice(s.volume * (1 + i / 10))
+                    p = Poscar(s).get_string().split("\n")
+                    f.write("\n".join(p[:7] + ["Direct configuration=     {}".format(i + 1)] + p[8:]))
+            trajs = list(Xdatcar.iter_trajectories("XDATCAR", block_size=2))
+            self.assertEqual([len(t) for t in trajs], [2, 1])
+            self.assertFalse(trajs[0].constant_lattice)
+            self.assertAlmostEqual(trajs[0][1].volume, structures[1].volume * 1.1, 3)
+            self.assertArrayAlmostEqual(trajs[1][0].frac_coords, structures[2].frac_coords)
+
+        self.assertRaises(ValueError, lambda: list(Xdatcar.iter_trajectories(filepath, step=0)))
+
 
 class DynmatTest(PymatgenTest):
     def test_init(self):
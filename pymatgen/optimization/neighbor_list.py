@@ -0,0 +1,278 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+
+"""
+This module implements a linked-cell neighbor search for very large periodic
+structures, and Verlet neighbor lists that are reused over slightly
+perturbed configurations, e.g., successive frames of a molecular dynamics
+run. Unlike find_points_in_spheres in neighbors.pyx, no periodic images of
+the atoms are generated: the atoms are binned once in cells at least as wide
+as the cutoff radius, and periodic images are handled through the cell
+indices. Centers are processed in chunks so that memory is bounded by the
+chunk size rather than the number of atoms.
+"""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def find_points_in_cells(
+    lattice_matrix,
+    frac_coords,
+    r,
+    center_frac_coords=None,
+    numerical_tol=1e-8,
+    exclude_self=True,
+    chunk_size=10000,
+    nthreads=None,
+):
+    """
+    Find all points within a distance r of centers in a periodic lattice,
+    using a linked-cell list.
+
+    Args:
+        lattice_matrix (np.ndarray): 3x3 lattice matrix, one lattice vector
+            per row.
+        frac_coords (np.ndarray): Fractional coordinates of the points,
+            shape (npoints, 3).
+        r (float): Cutoff radius.
+        center_frac_coords (np.ndarray): Fractional coordinates of the
+            centers, shape (ncenters, 3). Defaults to the points themselves.
+        numerical_tol (float): Points r + numerical_tol away from a center are
+            deemed to be within r.
+        exclude_self (bool): Whether to exclude pairs where the index of the
+            center is the same as the index of the point, and the distance is
+            below numerical_tol.
+        chunk_size (int): Number of centers processed at once. Memory usage
+            scales with chunk_size times the number of points per cell.
+        nthreads (int): Number of threads to process the chunks with. NumPy
+            releases the GIL in most of the work. Defaults to None, i.e.,
+            serial.
+
+    Returns:
+        (center_indices, points_indices, images, distances), sorted by
+        center index. Point points_indices[i] translated by images[i]
+        lattice vectors is at distances[i] from center center_indices[i].
+        As with IStructure.get_neighbor_list, the images are relative to the
+        input fractional coordinates.
+    """
+    lattice_matrix = np.array(lattice_matrix, dtype=float)
+    frac_coords = np.reshape(np.array(frac_coords, dtype=float), (-1, 3))
+    centers = (
+        frac_coords if center_frac_coords is None else np.reshape(np.array(center_frac_coords, dtype=float), (-1, 3))
+    )
+    r = float(r)
+
+    # Perpendicular widths of the unit cell, and cells at least r wide. The
+    # number of cells is capped to the number of points, so that empty cells
+    # do not dominate for small cutoffs.
+    widths = 1 / np.linalg.norm(np.linalg.inv(lattice_matrix), axis=0)
+    ncells = np.maximum(1, np.floor(widths / max(r, numerical_tol))).astype(int)
+    if np.prod(ncells) > max(len(frac_coords), 1):
+        scale = (max(len(frac_coords), 1) / np.prod(ncells)) ** (1 / 3)
+        ncells = np.maximum(1, np.floor(ncells * scale)).astype(int)
+    nrange = np.ceil((r + numerical_tol) * ncells / widths).astype(int)
+    offsets = np.array(list(itertools.product(*[range(-n, n + 1) for n in nrange])))
+
+    point_shifts = np.floor(frac_coords)
+    point_cells = _get_cells(frac_coords - point_shifts, ncells)
+    cell_ids = np.ravel_multi_index(point_cells.T, ncells)
+    order = np.argsort(cell_ids, kind="stable")
+    counts = np.bincount(cell_ids, minlength=np.prod(ncells))
+    starts = np.cumsum(counts) - counts
+    cart_coords = np.dot(frac_coords - point_shifts, lattice_matrix)
+
+    center_shifts = np.floor(centers)
+    center_cells = _get_cells(centers - center_shifts, ncells)
+    center_carts = np.dot(centers - center_shifts, lattice_matrix)
+
+    def process(chunk):
+        results = []
+        for offset in offsets:
+            cells = center_cells[chunk] + offset
+            cell_images = np.floor_divide(cells, ncells)
+            ids = np.ravel_multi_index((cells - cell_images * ncells).T, ncells)
+            n = counts[ids]
+            total = n.sum()
+            if total == 0:
+                continue
+            cindices = np.repeat(chunk, n)
+            pindices = order[np.repeat(starts[ids] - np.cumsum(n) + n, n) + np.arange(total)]
+            images = np.repeat(cell_images, n, axis=0)
+            vectors = cart_coords[pindices] + np.dot(images, lattice_matrix) - center_carts[cindices]
+            distances = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+            cond = distances <= r + numerical_tol
+            if exclude_self:
+                cond &= ~((cindices == pindices) & (distances <= numerical_tol))
+            cindices, pindices = cindices[cond], pindices[cond]
+            images = images[cond] - point_shifts[pindices] + center_shifts[cindices]
+            results.append((cindices, pindices, images, distances[cond]))
+        return results
+
+    chunks = [np.arange(i, min(i + chunk_size, len(centers))) for i in range(0, len(centers), chunk_size)]
+    if nthreads is None:
+        results = [process(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(nthreads) as executor:
+            results = list(executor.map(process, chunks))
+    results = [res for chunk_results in results for res in chunk_results]
+    if not results:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros((0, 3)), np.zeros(0)
+
+    center_indices, points_indices, images, distances = [np.concatenate(a) for a in zip(*results)]
+    sort = np.argsort(center_indices, kind="stable")
+    return center_indices[sort], points_indices[sort], images[sort], distances[sort]
+
+
+def _get_cells(frac_coords, ncells):
+    """
+    Returns the cell indices of fractional coordinates in [0, 1).
+    """
+    return np.clip(np.floor(frac_coords * ncells).astype(int), 0, ncells - 1)
+
+
+class VerletNeighborList:
+    """
+    Verlet neighbor list, i.e., a list of candidate pairs within r + skin
+    built with find_points_in_cells, from which the pairs within r are
+    filtered at each update. The candidate pairs are only rebuilt when an
+    atom moved by more than skin / 2 since the last build, or when the
+    lattice or number of atoms changed, so that repeated queries on slightly
+    perturbed configurations only cost O(number of pairs).
+
+    Usage::
+
+        nl = VerletNeighborList(r=3.0, skin=0.5)
+        for structure in structures:
+            center_indices, points_indices, images, distances = nl.update(structure)
+
+    .. attribute:: nbuilds
+
+        Number of times the candidate pairs were built.
+    """
+
+    def __init__(self, r, skin=0.0, numerical_tol=1e-8, exclude_self=True, chunk_size=10000, nthreads=None):
+        """
+        Args:
+            r (float): Cutoff radius.
+            skin (float): Skin distance added to r when building the
+                candidate pairs. Larger values allow larger displacements
+                before a rebuild, at the cost of more candidate pairs.
+            numerical_tol (float): Numerical tolerance on distances. See
+                find_points_in_cells.
+            exclude_self (bool): Whether to exclude an atom neighboring with
+                itself within numerical tolerance distance.
+            chunk_size (int): Number of centers processed at once when
+                building the candidate pairs.
+            nthreads (int): Number of threads used when building the
+                candidate pairs. Defaults to None, i.e., serial.
+        """
+        self.r = r
+        self.skin = skin
+        self.numerical_tol = numerical_tol
+        self.exclude_self = exclude_self
+        self.chunk_size = chunk_size
+        self.nthreads = nthreads
+        self.nbuilds = 0
+        self._lattice_matrix = None
+        self._frac_coords = None
+        self._pairs = None
+
+    def build(self, frac_coords, lattice_matrix):
+        """
+        Build the candidate pairs within r + skin.
+
+        Args:
+            frac_coords (np.ndarray): Fractional coordinates, shape (n, 3).
+            lattice_matrix (np.ndarray): 3x3 lattice matrix.
+        """
+        self._lattice_matrix = np.array(lattice_matrix, dtype=float)
+        self._frac_coords = np.array(frac_coords, dtype=float)
+        center_indices, points_indices, images, _ = find_points_in_cells(
+            self._lattice_matrix,
+            self._frac_coords,
+            self.r + self.skin,
+            numerical_tol=self.numerical_tol,
+            exclude_self=False,
+            chunk_size=self.chunk_size,
+            nthreads=self.nthreads,
+        )
+        self._pairs = center_indices, points_indices, images
+        self.nbuilds += 1
+
+    def needs_rebuild(self, frac_coords, lattice_matrix=None):
+        """
+        Args:
+            frac_coords (np.ndarray): Fractional coordinates, shape (n, 3).
+            lattice_matrix (np.ndarray): 3x3 lattice matrix. Defaults to the
+                lattice of the last build.
+
+        Returns:
+            Whether the candidate pairs have to be rebuilt for these
+            coordinates.
+        """
+        if self._pairs is None or np.shape(frac_coords) != self._frac_coords.shape:
+            return True
+        if lattice_matrix is not None and not np.allclose(lattice_matrix, self._lattice_matrix):
+            return True
+        displacements = np.dot(self._get_displacements(frac_coords)[0], self._lattice_matrix)
+        max_displacement = np.sqrt(np.max(np.einsum("ij,ij->i", displacements, displacements), initial=0))
+        return 2 * max_displacement > self.skin
+
+    def _get_displacements(self, frac_coords):
+        """
+        Returns the fractional displacements since the last build, with the
+        lattice vector jumps of atoms wrapped back in the cell removed, and
+        these jumps.
+        """
+        displacements = np.array(frac_coords, dtype=float) - self._frac_coords
+        jumps = np.round(displacements)
+        return displacements - jumps, jumps
+
+    def update_coords(self, frac_coords, lattice_matrix=None):
+        """
+        Get the neighbor list for new coordinates, rebuilding the candidate
+        pairs only if needed.
+
+        Args:
+            frac_coords (np.ndarray): Fractional coordinates, shape (n, 3).
+            lattice_matrix (np.ndarray): 3x3 lattice matrix. Defaults to the
+                lattice of the last build.
+
+        Returns:
+            (center_indices, points_indices, images, distances), with the
+            same conventions as IStructure.get_neighbor_list.
+        """
+        frac_coords = np.array(frac_coords, dtype=float)
+        if lattice_matrix is None:
+            lattice_matrix = self._lattice_matrix
+        if self.needs_rebuild(frac_coords, lattice_matrix):
+            self.build(frac_coords, lattice_matrix)
+        center_indices, points_indices, images = self._pairs
+        _, jumps = self._get_displacements(frac_coords)
+        images = images - jumps[points_indices] + jumps[center_indices]
+        vectors = np.dot(frac_coords[points_indices] + images - frac_coords[center_indices], self._lattice_matrix)
+        distances = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+        cond = distances <= self.r + self.numerical_tol
+        if self.exclude_self:
+            cond &= ~((center_indices == points_indices) & (distances <= self.numerical_tol))
+        return center_indices[cond], points_indices[cond], images[cond], distances[cond]
+
+    def update(self, structure):
+        """
+        Get the neighbor list of a structure, rebuilding the candidate pairs
+        only if needed.
+
+        Args:
+            structure (Structure): Structure with the same number of sites
+                as the previous ones for the pairs to be reused.
+
+        Returns:
+            (center_indices, points_indices, images, distances), with the
+            same conventions as IStructure.get_neighbor_list.
+        """
+        return self.update_coords(structure.frac_coords, structure.lattice.matrix)
@@ -0,0 +1,90 @@
+import itertools
+
+import numpy as np
+
+from pymatgen.core.lattice import Lattice
+from pymatgen.optimization.neighbor_list import VerletNeighborList, find_points_in_cells
+from pymatgen.util.testing import PymatgenTest
+
+
+def _brute_force(lattice, frac_coords, r):
+    images = np.array(list(itertools.product(range(-8, 9), repeat=3)))
+    pairs = set()
+    for i, j in itertools.product(range(len(frac_coords)), repeat=2):
+        distances = lattice.get_cartesian_coords(frac_coords[j] + images - frac_coords[i])
+        distances = np.linalg.norm(distances, axis=1)
+        for image, d in zip(images, distances):
+            if 1e-8 < d <= r + 1e-8:
+                pairs.add((i, j) + tuple(image))
+    return pairs
+
+
+class NeighborListTestCase(PymatgenTest):
+    def setUp(self):
+        self.lattices = [
+            Lattice.cubic(5.0),
+            Lattice.monoclinic(3, 4, 5, 70),
+            Lattice.rhombohedral(4, 30),
+            Lattice.hexagonal(3, 9),
+        ]
+        # Coordinates out of the unit cell on purpose.
+        self.frac_coords = np.random.RandomState(0).uniform(-1, 2, size=(5, 3))
+
+    def test_find_points_in_cells(self):
+        for lattice in self.lattices:
+            for r in [1.5, 3.0, 7.0]:
+                center_indices, points_indices, images, distances = find_points_in_cells(
+                    lattice.matrix, self.frac_coords, r
+                )
+                pairs = set(zip(center_indices, points_indices, *np.round(images).astype(int).T))
+                self.assertEqual(len(pairs), len(center_indices))
+                self.assertEqual(pairs, _brute_force(lattice, self.frac_coords, r))
+                self.assertTrue(np.all(np.diff(center_indices) >= 0))
+                vectors = lattice.get_cartesian_coords(
+                    self.frac_coords[points_indices] + images - self.frac_coords[center_indices]
+                )
+                self.assertArrayAlmostEqual(np.linalg.norm(vectors, axis=1), distances)
+
+    def test_chunks_and_threads(self):
+        lattice = self.lattices[1]
+        ref = find_points_in_cells(lattice.matrix, self.frac_coords, 4.0)
+        for chunk_size, nthreads in [(1, None), (2, 3)]:
+            res = find_points_in_cells(lattice.matrix, self.frac_coords, 4.0, chunk_size=chunk_size, nthreads=nthreads)
+            for a, b in zip(ref, res):
+                self.assertArrayAlmostEqual(a, b)
+
+    def test_centers(self):
+        lattice = self.lattices[0]
+        center_indices, points_indices, images, distances = find_points_in_cells(
+            lattice.matrix, self.frac_coords, 3.0, center_frac_coords=[[0.5, 0.5, 0.5]], exclude_self=False
+        )
+        self.assertTrue(np.all(center_indices == 0))
+        vectors = lattice.get_cartesian_coords(self.frac_coords[points_indices] + images - 0.5)
+        self.assertArrayAlmostEqual(np.linalg.norm(vectors, axis=1), distances)
+
+        res = find_points_in_cells(lattice.matrix, self.frac_coords, 0.1, center_frac_coords=[[0.5, 0.5, 0.5]])
+        self.assertEqual([len(a) for a in res], [0] * 4)
+
+    def test_verlet_neighbor_list(self):
+        lattice = self.lattices[2]
+        nl = VerletNeighborList(3.0, skin=0.4)
+        rng = np.random.RandomState(1)
+        frac_coords = self.frac_coords.copy()
+        for step in range(10):
+            center_indices, points_indices, images, distances = nl.update_coords(frac_coords, lattice.matrix)
+            pairs = set(zip(center_indices, points_indices, *np.round(images).astype(int).T))
+            self.assertEqual(pairs, _brute_force(lattice, frac_coords, 3.0))
+            # Small displacements, with atoms wrapped back in the cell.
+            frac_coords = frac_coords + lattice.get_fractional_coords(rng.uniform(-0.05, 0.05, size=(5, 3)))
+            frac_coords[step % 5] -= np.floor(frac_coords[step % 5])
+        self.assertLess(nl.nbuilds, 10)
+        nl.update_coords(frac_coords)
+        self.assertFalse(nl.needs_rebuild(frac_coords, lattice.matrix))
+        self.assertTrue(nl.needs_rebuild(frac_coords, lattice.matrix * 1.1))
+        self.assertTrue(nl.needs_rebuild(frac_coords[:4]))
+
+
+if __name__ == "__main__":
+    import unittest
+
+    unittest.main()
@@ -0,0 +1,124 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+This module provides a process pool to stream tasks which share a state,
+e.g., a sequence of transformations or a configured analyzer, with a bounded
+number of tasks in flight.
+"""
+
+import collections
+from multiprocessing import Pool
+
+_STATE = None
+
+
+def _init_worker(state):
+    """
+    Sets the state of a worker process once, rather than sending it with
+    every task.
+    """
+    global _STATE  # pylint: disable=W0603
+    _STATE = state
+
+
+def _call_with_state(func, args):
+    """
+    Calls func with the state of the worker process.
+    """
+    return func(_STATE, *args)
+
+
+class StatefulPool:
+    """
+    Pool calling func(state, \\*args) for each submitted task, either in
+    worker processes, to which the state is sent once, or serially in the
+    calling process, where the state is passed directly, so that several
+    pools with different states can be used at once. Results are collected
+    in the order the tasks were submitted, and at most max_pending tasks are
+    submitted and not yet collected, which bounds the number of inputs and
+    outputs held in memory::
+
+        with StatefulPool(func, state, ncores=4) as pool:
+            for result in pool.imap(tasks):
+                ...
+    """
+
+    def __init__(self, func, state, ncores=None, max_pending=None):
+        """
+        Args:
+            func: Function of the state and of the arguments of a task. It
+                must be picklable, i.e., defined at the top level of a module.
+            state: State passed to func with every task.
+            ncores (int): Number of processes. Default is None, which implies
+                serial, with each task run as it is submitted.
+            max_pending (int): Maximum number of tasks submitted and not yet
+                collected in parallel. Defaults to twice ncores. It is always
+                1 in serial.
+        """
+        self.func = func
+        self.state = state
+        self.ncores = ncores
+        self.max_pending = (max_pending or 2 * ncores) if ncores else 1
+        self._pool = None
+        self._pending = collections.deque()
+
+    def __enter__(self):
+        if self.ncores:
+            self._pool = Pool(self.ncores, initializer=_init_worker, initargs=(self.state,))
+        return self
+
+    def __exit__(self, *args):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._pending.clear()
+
+    def __len__(self):
+        return len(self._pending)
+
+    @property
+    def full(self):
+        """
+        Whether max_pending tasks are submitted and not yet collected.
+        """
+        return len(self._pending) >= self.max_pending
+
+    def submit(self, *args):
+        """
+        Submit a task.
+
+        Args:
+            \\*args: Arguments of func after the state.
+        """
+        if self._pool is None:
+            self._pending.append(self.func(self.state, *args))
+        else:
+            self._pending.append(self._pool.apply_async(_call_with_state, (self.func, args)))
+
+    def get(self):
+        """
+        Returns the result of the oldest task not yet collected, waiting for
+        it if needed.
+        """
+        result = self._pending.popleft()
+        return result if self._pool is None else result.get()
+
+    def imap(self, tasks):
+        """
+        Run tasks.
+
+        Args:
+            tasks: Iterable of tuples of arguments of func after the state. It
+                is only consumed as the results are.
+
+        Yields:
+            Results of the tasks, in order.
+        """
+        for args in tasks:
+            if self.full:
+                yield self.get()
+            self.submit(*args)
+        while self._pending:
+            yield self.get()
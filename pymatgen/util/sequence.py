@@ -23,6 +23,27 @@ def get_chunks(sequence, size=1):
     return [sequence[i * size : (i + 1) * size] for i in range(chunks)]
 
 
+def iter_chunks(iterable, size=1):
+    """
+    Lazy version of get_chunks for iterables of unknown length.
+
+    Args:
+        iterable: Iterable to split. It is only consumed as the chunks are.
+        size (int): Maximum number of items per chunk.
+
+    Yields:
+        Lists of size items, except possibly the last one.
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 class PBarSafe:
     """
     Progress bar.
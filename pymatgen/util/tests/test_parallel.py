@@ -0,0 +1,40 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+
+import unittest
+
+from pymatgen.util.parallel import StatefulPool
+
+
+def add(state, x, y=0):
+    return state + x + y
+
+
+class StatefulPoolTest(unittest.TestCase):
+    def test_imap(self):
+        with StatefulPool(add, 10) as pool:
+            self.assertEqual(pool.max_pending, 1)
+            self.assertEqual(list(pool.imap((x,) for x in range(5))), [10, 11, 12, 13, 14])
+        with StatefulPool(add, 10, ncores=2, max_pending=3) as pool:
+            self.assertEqual(list(pool.imap((x, 1) for x in range(5))), [11, 12, 13, 14, 15])
+
+    def test_submit(self):
+        with StatefulPool(add, 1) as a, StatefulPool(add, 100) as b:
+            a.submit(1)
+            self.assertTrue(a.full)
+            b.submit(1)
+            self.assertEqual(a.get(), 2)
+            self.assertEqual(b.get(), 101)
+            self.assertFalse(a)
+        with StatefulPool(add, 1, ncores=2) as pool:
+            self.assertEqual(pool.max_pending, 4)
+            for x in range(4):
+                pool.submit(x)
+            self.assertTrue(pool.full)
+            self.assertEqual([pool.get() for x in range(4)], [1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
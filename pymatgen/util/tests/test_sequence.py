@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from pymatgen.util.sequence import PBarSafe, get_chunks
+from pymatgen.util.sequence import PBarSafe, get_chunks, iter_chunks
 
 
 class SequenceUtilsTest(TestCase):
@@ -12,6 +12,11 @@ class SequenceUtilsTest(TestCase):
         self.assertTrue(all(length == 30 for length in lengths[:-1]))
         self.assertEqual(lengths[-1], 10)
 
+    def test_iter_chunks(self):
+        chunks = list(iter_chunks(iter(self.sequence), 30))
+        self.assertEqual(chunks, get_chunks(self.sequence, 30))
+        self.assertEqual(list(iter_chunks([], 30)), [])
+
     def test_pbar_safe(self):
         pbar = PBarSafe(len(self.sequence))
         self.assertEqual(pbar.total, len(self.sequence))